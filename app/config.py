@@ -13,6 +13,16 @@ def getenv_bool(name: str, default: bool = False) -> bool:
     return str(val).strip().lower() in {"1", "true", "yes", "on"}
 
 
+def getenv_int(name: str, default: int = 0) -> int:
+    val = os.environ.get(name)
+    if val is None or not str(val).strip():
+        return default
+    try:
+        return int(str(val).strip())
+    except ValueError:
+        return default
+
+
 class Settings:
     # Data source selection
     data_source_default: str = getenv("DATA_SOURCE", "sheet").lower()  # sheet | gcs_json | bigquery
@@ -64,6 +74,62 @@ class Settings:
     # Enforce that a site must be specified (either via query `site_id` or via SITE_ID_FILTER_DEFAULT)
     require_site_id: bool = getenv_bool("REQUIRE_SITE_ID", False)
 
+    # Graph cache (process-wide, in front of load_graph). TTL 0 disables the cache.
+    graph_cache_ttl_s: int = getenv_int("GRAPH_CACHE_TTL_S", 60)
+    graph_cache_max_entries: int = getenv_int("GRAPH_CACHE_MAX_ENTRIES", 64)
+    graph_cache_max_bytes: int = getenv_int("GRAPH_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+    # Stale-while-revalidate: serve a graph up to this many seconds past its TTL while it is
+    # re-read in the background (0 = readers wait for the upstream read)
+    graph_cache_stale_s: int = getenv_int("GRAPH_CACHE_STALE_S", 0)
+    # Backend shared by the graph and plan overlay caches: "memory" (per process), "disk"
+    # (CACHE_DISK_DIR: the workers of a host or a mounted volume) or "redis" (CACHE_REDIS_URL:
+    # every instance). With a shared backend, saves broadcast an invalidation to the others.
+    cache_backend: str = getenv("CACHE_BACKEND", "memory")
+    cache_disk_dir: str = getenv("CACHE_DISK_DIR", "")
+    cache_redis_url: str = getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+    # Directory on a tmpfs (e.g. /dev/shm/editeur-reseau-graphs) where cached graphs are
+    # written once and memory-mapped by every worker of the host; empty keeps one parsed
+    # copy per worker
+    graph_shm_dir: str = getenv("GRAPH_SHM_DIR", "")
+    # Compare the Drive revision of a spreadsheet before re-reading an expired cached graph
+    sheets_revision_check: bool = getenv_bool("SHEETS_REVISION_CHECK", True)
+    # Upstream calls per minute the background scheduler may spend renewing hot Sheets graphs
+    # before their TTL runs out (0 disables the scheduler)
+    refresh_budget_per_min: int = getenv_int("REFRESH_BUDGET_PER_MIN", 0)
+
+    # With a site_id, Sheets writes only replace that site's Nodes/Edges rows (other sites are kept)
+    sheets_site_scoped_write: bool = getenv_bool("SHEETS_SITE_SCOPED_WRITE", True)
+
+    # Serve GET/POST /api/graph with the asyncio datasource layer (httpx) instead of worker threads
+    async_datasources: bool = getenv_bool("ASYNC_DATASOURCES", False)
+
+    # Graphs loaded into the cache at startup before /readyz reports ready: "sheet:site" or
+    # "sheet" items, comma/space separated (default SHEET_ID_DEFAULT:SITE_ID_FILTER_DEFAULT,
+    # "none" disables); readiness is not held back longer than WARMUP_TIMEOUT_S (0 = no limit)
+    warmup_sites: str = getenv("WARMUP_SITES", "")
+    warmup_timeout_s: int = getenv_int("WARMUP_TIMEOUT_S", 30)
+
+    # Coalesce POST /api/graph saves of the same sheet/site within this window (ms) into one
+    # write-behind Sheets write; 0 writes synchronously
+    write_behind_window_ms: int = getenv_int("WRITE_BEHIND_WINDOW_MS", 0)
+
+    # Admin endpoints (/api/admin/*) require this token in X-Admin-Token; empty disables them
+    admin_token: str = getenv("ADMIN_TOKEN", "")
+
+    # Per-site snapshot export: default destination prefix (gs://bucket/prefix or file:///dir)
+    # and process-pool size (0 = CPU count)
+    snapshot_export_uri: str = getenv("SNAPSHOT_EXPORT_URI", "")
+    snapshot_export_workers: int = getenv_int("SNAPSHOT_EXPORT_WORKERS", 0)
+
+    # Read snapshots: each Sheets save publishes the served JSON under READ_SNAPSHOT_URI
+    # (gs://bucket/prefix or file:///dir) and GET /api/graph?mode=ro is answered from it
+    read_snapshots: bool = getenv_bool("READ_SNAPSHOTS", False)
+    read_snapshot_uri: str = getenv("READ_SNAPSHOT_URI", "")
+    read_snapshot_gzip: bool = getenv_bool("READ_SNAPSHOT_GZIP", True)
+
+    # Base URL of a local Sheets/Drive stand-in (dev, benchmarks); requests are sent unauthenticated
+    google_api_emulator_host: str = getenv("GOOGLE_API_EMULATOR_HOST", "")
+
     # Static dirs
     static_root: str = os.path.join(os.path.dirname(__file__), "static")
     templates_root: str = os.path.join(os.path.dirname(__file__), "templates")
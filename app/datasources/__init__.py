@@ -1,24 +1,35 @@
 """Data source dispatch layer."""
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from fastapi import HTTPException
 
 from ..config import settings
 from ..models import Graph, PlanOverlayConfig, PlanOverlayUpdateRequest, PlanOverlayBounds
+from ..services.google_clients import counted_calls
+from ..services.graph_cache import CachedBody, GraphCacheKey, graph_cache
+from ..services.refresh_scheduler import Refresh, refresh_scheduler
+from ..services.single_flight import SingleFlight
 from ..services.graph_sanitizer import sanitize_graph_for_write
+from ..services import read_snapshots, write_behind
 from .sheets import (
+    _clean_sheet_id,
     load_sheet,
+    load_sheet_async,
     save_sheet,
+    sheet_revision,
+    sheet_revision_async,
     load_plan_overlay_config as load_sheet_plan_config,
     save_plan_overlay_bounds as save_sheet_plan_bounds,
     write_plan_overlay_media,
     clear_plan_overlay_media as clear_sheet_plan_media,
 )
-from .gcs_json import load_json, save_json
-from .bigquery import load_bigquery, save_bigquery
+from .gcs_json import load_json, load_json_async, save_json
+from .bigquery import load_bigquery, load_bigquery_async, save_bigquery
 from ..services.plan_overlay_import import (
     list_drive_media_files as drive_list_media,
     store_plan_media_from_drive,
@@ -26,38 +37,385 @@ from ..services.plan_overlay_import import (
 )
 
 
+_SHEET_KINDS = {"sheet", "sheets", "google_sheets"}
+_GCS_KINDS = {"gcs", "gcs_json", "json"}
+_BQ_KINDS = {"bq", "bigquery"}
+
+
 def _normalise_source(source: Optional[str]) -> str:
     return (source or settings.data_source_default or "sheet").lower()
 
 
-def load_graph(source: Optional[str] = None, **kwargs: Any) -> Graph:
-    kind = _normalise_source(source)
-    if kind in {"sheet", "sheets", "google_sheets"}:
+def _graph_cache_key(kind: str, *, site: Optional[str], normalize: bool, **kwargs: Any) -> GraphCacheKey:
+    """Resolve defaults so that explicit and implicit parameters share one cache entry."""
+    if kind in _SHEET_KINDS:
+        return GraphCacheKey(
+            source="sheet",
+            document=_clean_sheet_id(kwargs.get("sheet_id") or settings.sheet_id_default),
+            tabs=(
+                kwargs.get("nodes_tab") or settings.sheet_nodes_tab,
+                kwargs.get("edges_tab") or settings.sheet_edges_tab,
+            ),
+            site_id=site or "",
+            normalize=normalize,
+        )
+    if kind in _GCS_KINDS:
+        return GraphCacheKey(
+            source="gcs_json",
+            document=kwargs.get("gcs_uri") or settings.gcs_json_uri_default,
+            tabs=(),
+            site_id="",
+            normalize=normalize,
+        )
+    project = kwargs.get("bq_project") or settings.bq_project_id or settings.gcp_project_id
+    return GraphCacheKey(
+        source="bigquery",
+        document=f"{project}.{kwargs.get('bq_dataset') or settings.bq_dataset}",
+        tabs=(
+            kwargs.get("bq_nodes") or settings.bq_nodes_table,
+            kwargs.get("bq_edges") or settings.bq_edges_table,
+        ),
+        site_id="",
+        normalize=normalize,
+    )
+
+
+def _forget_graph_loads(source: Optional[str], document: Optional[str]) -> None:
+    # a load started before the write must not be joined by callers arriving after it
+    _graph_flights.forget(lambda key: source is None or (key.source == source and key.document == document))
+
+
+def _invalidate_graphs(source: str, document: str) -> None:
+    graph_cache.invalidate(source, document)
+    _forget_graph_loads(source, document)
+
+
+def _forget_remote_write(source: Optional[str], document: Optional[str]) -> None:
+    _forget_graph_loads(source, document)
+    if source in (None, "sheet"):
+        # the writer withdrew the sheet's read snapshots: stop answering from memory
+        read_snapshots.forget(document)
+
+
+def start_invalidation_listener() -> None:
+    """Drop cached graphs when another instance saves them (shared ``CACHE_BACKEND`` only)."""
+    graph_cache.listen(_forget_remote_write)
+
+
+def _invalidate_sheet_graphs(sheet_id: Optional[str]) -> None:
+    document = _clean_sheet_id(sheet_id or settings.sheet_id_default)
+    _invalidate_graphs("sheet", document)
+    if read_snapshots.enabled() and document:
+        # every write may change what any site's snapshot holds (plan overlay, shared branches)
+        read_snapshots.withdraw_sheet(document)
+
+
+# Concurrent loads of one cache key share a single upstream read (dashboards open many embeds at once)
+_graph_flights: SingleFlight[Graph] = SingleFlight(share=lambda graph: graph.model_copy(deep=True))
+
+
+def graph_flight_stats() -> Dict[str, int]:
+    return _graph_flights.stats()
+
+
+# Stale-while-revalidate refreshes (GRAPH_CACHE_STALE_S); one per key thanks to the flight group
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="graph-refresh")
+_refresh_tasks: "set[asyncio.Task[Graph]]" = set()
+
+
+def _refresh(key: GraphCacheKey, fetch: Callable[[], Graph]) -> None:
+    try:
+        _graph_flights.do(key, fetch)
+    except Exception:  # the stale copy keeps being served until GRAPH_CACHE_STALE_S runs out
+        pass
+
+
+def _refresh_done(task: "asyncio.Task[Graph]") -> None:
+    _refresh_tasks.discard(task)
+    if not task.cancelled():
+        task.exception()
+
+
+def _refresh_params(*, site: Optional[str], normalize: bool, **kwargs: Any) -> Dict[str, Any]:
+    return {
+        "sheet_id": kwargs.get("sheet_id"),
+        "nodes_tab": kwargs.get("nodes_tab"),
+        "edges_tab": kwargs.get("edges_tab"),
+        "site_id": site,
+        "normalize": normalize,
+    }
+
+
+def refresh_sheet_graph(
+    *,
+    sheet_id: Optional[str] = None,
+    nodes_tab: Optional[str] = None,
+    edges_tab: Optional[str] = None,
+    site_id: Optional[str] = None,
+    normalize: bool = False,
+) -> Refresh:
+    """Renew a cached Sheets graph ahead of its expiry; reports what it did and the calls made.
+
+    With ``SHEETS_REVISION_CHECK``, the Drive revision is checked first: an unchanged
+    document only has its entry renewed (one call). Otherwise the tabs are re-read
+    through the flight group, at no cost when a load of the key is already running.
+    The calls are the requests actually sent (tab listing, header probe, retries).
+    """
+    key = _graph_cache_key("sheet", site=site_id, normalize=normalize, sheet_id=sheet_id, nodes_tab=nodes_tab, edges_tab=edges_tab)
+    revision: Optional[str] = None
+    with counted_calls() as calls:
+        if settings.sheets_revision_check:
+            revision = sheet_revision(sheet_id)
+            if graph_cache.renew(key, revision):
+                return Refresh("renewed", calls())
+        led = False
+
+        def fetch() -> Graph:
+            nonlocal led
+            led = True
+            generation = graph_cache.generation(key.source, key.document)
+            graph = load_sheet(sheet_id=sheet_id, nodes_tab=nodes_tab, edges_tab=edges_tab, site_id=site_id, revision=revision)
+            if normalize:
+                graph = sanitize_graph_for_write(graph, strict=False)
+            graph_cache.put(key, graph, revision=revision, generation=generation)
+            return graph
+
+        _graph_flights.do(key, fetch)
+        return Refresh("reread" if led else "joined", calls())
+
+
+def _pending_write(key: GraphCacheKey) -> Optional[Graph]:
+    """Graph saved through write-behind and not written yet: a read right after the save sees it."""
+    graph = write_behind.pending_graph(key._replace(normalize=False))
+    if graph is not None and key.normalize:
+        graph = sanitize_graph_for_write(graph, strict=False)
+    return graph
+
+
+def _graph_target(kind: str, *, normalize: bool, **kwargs: Any) -> tuple[Optional[str], GraphCacheKey]:
+    """``(site, cache key)`` of a graph read; 400 for an unknown source or a missing site."""
+    if kind in _SHEET_KINDS:
         site = kwargs.get("site_id") or settings.site_id_filter_default or None
         if settings.require_site_id and not site:
             raise HTTPException(
                 status_code=400,
                 detail="site_id required (set query param site_id or SITE_ID_FILTER_DEFAULT)",
             )
-        return load_sheet(
+        return site, _graph_cache_key(kind, site=site, normalize=normalize, **kwargs)
+    if kind in _GCS_KINDS or kind in _BQ_KINDS:
+        return None, _graph_cache_key(kind, site=None, normalize=normalize, **kwargs)
+    raise HTTPException(status_code=400, detail=f"unknown data source: {kind}")
+
+
+def load_cached_graph_body(
+    source: Optional[str] = None, *, matches: Callable[[str], bool], **kwargs: Any
+) -> Optional[CachedBody]:
+    """Fresh cache hit served without parsing a Graph (see ``GraphCache.get_body``).
+
+    None when ``load_graph`` has to answer: miss, expired entry, pending write-behind
+    graph, or an in-process entry the client does not already hold.
+    """
+    kind = _normalise_source(source)
+    normalize = bool(kwargs.pop("normalize", False))
+    site, key = _graph_target(kind, normalize=normalize, **kwargs)
+    if kind in _SHEET_KINDS and write_behind.pending_graph(key._replace(normalize=False)) is not None:
+        return None
+    cached = graph_cache.get_body(key, matches)
+    if cached is not None and kind in _SHEET_KINDS:
+        refresh_scheduler.record(key, _refresh_params(site=site, normalize=normalize, **kwargs))
+    return cached
+
+
+def load_graph(source: Optional[str] = None, **kwargs: Any) -> Graph:
+    kind = _normalise_source(source)
+    normalize = bool(kwargs.pop("normalize", False))
+    site, key = _graph_target(kind, normalize=normalize, **kwargs)
+    if kind in _SHEET_KINDS:
+        refresh_scheduler.record(key, _refresh_params(site=site, normalize=normalize, **kwargs))
+        pending = _pending_write(key)
+        if pending is not None:
+            return pending
+    cached = graph_cache.get(key)
+    if cached is not None:
+        return cached
+
+    def fetch() -> Graph:
+        # a save landing during the read must not be overwritten by what was read before it
+        generation = graph_cache.generation(key.source, key.document)
+        revision: Optional[str] = None
+        if kind in _SHEET_KINDS:
+            # Read the revision *before* the tabs so an edit racing the read is seen next time
+            if graph_cache.enabled and settings.sheets_revision_check:
+                revision = sheet_revision(kwargs.get("sheet_id"))
+                cached = graph_cache.revalidate(key, revision)
+                if cached is not None:
+                    return cached
+            graph = load_sheet(
+                sheet_id=kwargs.get("sheet_id"),
+                nodes_tab=kwargs.get("nodes_tab"),
+                edges_tab=kwargs.get("edges_tab"),
+                site_id=site,
+                revision=revision,
+            )
+        elif kind in _GCS_KINDS:
+            graph = load_json(gcs_uri=kwargs.get("gcs_uri"))
+        else:
+            graph = load_bigquery(
+                dataset=kwargs.get("bq_dataset"),
+                nodes_table=kwargs.get("bq_nodes"),
+                edges_table=kwargs.get("bq_edges"),
+                project_id=kwargs.get("bq_project"),
+            )
+        if normalize:
+            graph = sanitize_graph_for_write(graph, strict=False)
+        graph_cache.put(key, graph, revision=revision, generation=generation)
+        return graph
+
+    stale = graph_cache.get_stale(key)
+    if stale is not None:
+        if not _graph_flights.in_flight(key):
+            _refresh_pool.submit(_refresh, key, fetch)
+        return stale
+    return _graph_flights.do(key, fetch)
+
+
+async def load_graph_async(source: Optional[str] = None, **kwargs: Any) -> Graph:
+    """Async ``load_graph`` sharing the same cache.
+
+    Sheets: the Drive revision is read before the tabs, so a save landing during the read
+    leaves a revision older than the data (re-read next time) rather than a stale graph
+    renewed under a newer one; an unchanged document costs a single small request.
+    """
+    kind = _normalise_source(source)
+    normalize = bool(kwargs.pop("normalize", False))
+    site, key = _graph_target(kind, normalize=normalize, **kwargs)
+    if kind in _SHEET_KINDS:
+        refresh_scheduler.record(key, _refresh_params(site=site, normalize=normalize, **kwargs))
+        pending = _pending_write(key)
+        if pending is not None:
+            return pending
+    cached = graph_cache.get(key)
+    if cached is not None:
+        return cached
+
+    def read(revision: Optional[str] = None):
+        return load_sheet_async(
             sheet_id=kwargs.get("sheet_id"),
             nodes_tab=kwargs.get("nodes_tab"),
             edges_tab=kwargs.get("edges_tab"),
             site_id=site,
+            revision=revision,
         )
-    if kind in {"gcs", "gcs_json", "json"}:
-        return load_json(gcs_uri=kwargs.get("gcs_uri"))
-    if kind in {"bq", "bigquery"}:
-        return load_bigquery(
-            dataset=kwargs.get("bq_dataset"),
-            nodes_table=kwargs.get("bq_nodes"),
-            edges_table=kwargs.get("bq_edges"),
-            project_id=kwargs.get("bq_project"),
+
+    async def fetch() -> Graph:
+        generation = graph_cache.generation(key.source, key.document)
+        revision: Optional[str] = None
+        if kind in _SHEET_KINDS:
+            # Read the revision *before* the tabs so an edit racing the read is seen next time
+            if graph_cache.enabled and settings.sheets_revision_check:
+                revision = await sheet_revision_async(kwargs.get("sheet_id"))
+                cached = graph_cache.revalidate(key, revision)
+                if cached is not None:
+                    return cached
+            graph = await read(revision)
+        elif kind in _GCS_KINDS:
+            graph = await load_json_async(gcs_uri=kwargs.get("gcs_uri"))
+        else:
+            graph = await load_bigquery_async(
+                dataset=kwargs.get("bq_dataset"),
+                nodes_table=kwargs.get("bq_nodes"),
+                edges_table=kwargs.get("bq_edges"),
+                project_id=kwargs.get("bq_project"),
+            )
+        if normalize:
+            graph = await asyncio.to_thread(sanitize_graph_for_write, graph, strict=False)
+        graph_cache.put(key, graph, revision=revision, generation=generation)
+        return graph
+
+    stale = graph_cache.get_stale(key)
+    if stale is not None:
+        if not _graph_flights.in_flight(key):
+            task = asyncio.get_running_loop().create_task(_graph_flights.do_async(key, fetch))
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_done)
+        return stale
+    return await _graph_flights.do_async(key, fetch)
+
+
+def _read_snapshot_target(source: Optional[str], **kwargs: Any) -> Optional[tuple[str, Optional[str]]]:
+    """``(sheet_id, site)`` a read snapshot is published under, None when not applicable."""
+    if not read_snapshots.enabled() or _normalise_source(source) not in _SHEET_KINDS:
+        return None
+    sid = _clean_sheet_id(kwargs.get("sheet_id") or settings.sheet_id_default)
+    site = kwargs.get("site_id") or settings.site_id_filter_default or None
+    if not sid or (settings.require_site_id and not site):
+        return None
+    # snapshots are published for the configured tabs only
+    if (kwargs.get("nodes_tab") or settings.sheet_nodes_tab) != settings.sheet_nodes_tab:
+        return None
+    if (kwargs.get("edges_tab") or settings.sheet_edges_tab) != settings.sheet_edges_tab:
+        return None
+    return sid, site
+
+
+def _read_snapshot_pending(site: Optional[str], **kwargs: Any) -> bool:
+    """True while a write-behind save of the snapshot's graph is waiting (its snapshot is older)."""
+    key = _graph_cache_key("sheet", site=site, normalize=False, **kwargs)
+    return write_behind.pending_graph(key) is not None
+
+
+def load_read_snapshot(source: Optional[str] = None, **kwargs: Any) -> Optional[read_snapshots.ReadSnapshot]:
+    """Pre-serialised graph published by the last Sheets save, for read-only views."""
+    target = _read_snapshot_target(source, **kwargs)
+    if target is None or _read_snapshot_pending(target[1], **kwargs):
+        return None
+    return read_snapshots.load(sheet_id=target[0], site_id=target[1])
+
+
+async def load_read_snapshot_async(source: Optional[str] = None, **kwargs: Any) -> Optional[read_snapshots.ReadSnapshot]:
+    target = _read_snapshot_target(source, **kwargs)
+    if target is None or _read_snapshot_pending(target[1], **kwargs):
+        return None
+    return await read_snapshots.load_async(sheet_id=target[0], site_id=target[1])
+
+
+def republish_read_snapshot(source: Optional[str] = None, **kwargs: Any) -> None:
+    """Publish the snapshot a read-only GET missed (writes withdraw every site's, only the
+    saved one is republished), from the graph cache the GET just filled."""
+    target = _read_snapshot_target(source, **kwargs)
+    if target is None or _read_snapshot_pending(target[1], **kwargs):
+        return
+    _publish_read_snapshot(**kwargs)
+
+
+def _publish_read_snapshot(**kwargs: Any) -> None:
+    """Republish the saved sheet/site from a fresh read (what ``GET /api/graph`` now serves)."""
+    target = _read_snapshot_target("sheet", **kwargs)
+    if target is None:
+        return
+    generation = graph_cache.generation("sheet", target[0])
+    try:
+        graph = load_graph(
+            "sheet",
+            sheet_id=kwargs.get("sheet_id"),
+            nodes_tab=kwargs.get("nodes_tab"),
+            edges_tab=kwargs.get("edges_tab"),
+            site_id=target[1],
         )
-    raise HTTPException(status_code=400, detail=f"unknown data source: {kind}")
+        if graph._cache_age_s is not None:
+            # expired entry served while it is re-read: not what the sheet holds
+            return
+        read_snapshots.publish(graph, sheet_id=target[0], site_id=target[1])
+    except Exception:  # pragma: no cover - read/storage failures must not fail the save or the GET
+        # the write already withdrew the snapshots: read-only views fall back to Sheets
+        return
+    if graph_cache.generation("sheet", target[0]) != generation:
+        # another write landed during the read: its withdrawal must win
+        read_snapshots.withdraw(sheet_id=target[0], site_id=target[1])
 
 
-def save_graph(source: Optional[str] = None, graph: Graph | None = None, **kwargs: Any) -> None:
+def prepare_graph_write(source: Optional[str] = None, graph: Graph | None = None, **kwargs: Any) -> Graph:
+    """Validate and sanitise ``graph`` for ``write_prepared_graph`` (no upstream call)."""
     if graph is None:
         raise HTTPException(status_code=400, detail="graph payload required")
 
@@ -65,33 +423,71 @@ def save_graph(source: Optional[str] = None, graph: Graph | None = None, **kwarg
     graph = sanitize_graph_for_write(graph)
     graph.generated_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
-    if kind in {"sheet", "sheets", "google_sheets"}:
+    if kind in _SHEET_KINDS:
         site = kwargs.get("site_id") or settings.site_id_filter_default or None
         if settings.require_site_id and not site:
             raise HTTPException(
                 status_code=400,
                 detail="site_id required for write (set query param site_id or SITE_ID_FILTER_DEFAULT)",
             )
-        save_sheet(
-            graph,
-            sheet_id=kwargs.get("sheet_id"),
-            nodes_tab=kwargs.get("nodes_tab"),
-            edges_tab=kwargs.get("edges_tab"),
-            site_id=site,
-        )
+    elif kind not in _GCS_KINDS and kind not in _BQ_KINDS:
+        raise HTTPException(status_code=400, detail=f"unknown data source: {kind}")
+    return graph
+
+
+def write_prepared_graph(source: Optional[str] = None, graph: Graph | None = None, **kwargs: Any) -> None:
+    """Persist a graph returned by ``prepare_graph_write`` and drop the cached copies."""
+    kind = _normalise_source(source)
+    if kind in _SHEET_KINDS:
+        site = kwargs.get("site_id") or settings.site_id_filter_default or None
+        try:
+            save_sheet(
+                graph,
+                sheet_id=kwargs.get("sheet_id"),
+                nodes_tab=kwargs.get("nodes_tab"),
+                edges_tab=kwargs.get("edges_tab"),
+                site_id=site,
+            )
+        finally:
+            # A failed write may still have touched the tabs: never keep serving the old copy.
+            _invalidate_sheet_graphs(kwargs.get("sheet_id"))
+        _publish_read_snapshot(**kwargs)
         return
-    if kind in {"gcs", "gcs_json", "json"}:
-        save_json(graph, gcs_uri=kwargs.get("gcs_uri"))
+    if kind in _GCS_KINDS:
+        try:
+            save_json(graph, gcs_uri=kwargs.get("gcs_uri"))
+        finally:
+            key = _graph_cache_key(kind, site=None, normalize=False, **kwargs)
+            _invalidate_graphs(key.source, key.document)
         return
-    if kind in {"bq", "bigquery"}:
+    if kind in _BQ_KINDS:
         save_bigquery()
         return
     raise HTTPException(status_code=400, detail=f"unknown data source: {kind}")
 
 
+def save_graph(source: Optional[str] = None, graph: Graph | None = None, **kwargs: Any) -> None:
+    graph = prepare_graph_write(source, graph, **kwargs)
+    write_prepared_graph(source, graph, **kwargs)
+
+
+def graph_write_key(source: Optional[str] = None, **kwargs: Any) -> Optional[GraphCacheKey]:
+    """Document a Sheets save targets (saves with equal keys overwrite each other); None otherwise."""
+    kind = _normalise_source(source)
+    if kind not in _SHEET_KINDS:
+        return None
+    site = kwargs.get("site_id") or settings.site_id_filter_default or None
+    return _graph_cache_key(kind, site=site, normalize=False, **kwargs)
+
+
+async def save_graph_async(source: Optional[str] = None, graph: Graph | None = None, **kwargs: Any) -> None:
+    """Async ``save_graph``: the multi-step Sheets/GCS writes run in a worker thread."""
+    await asyncio.to_thread(save_graph, source, graph, **kwargs)
+
+
 def load_plan_overlay_config(source: Optional[str] = None, **kwargs: Any) -> Optional[PlanOverlayConfig]:
     kind = _normalise_source(source)
-    if kind in {"sheet", "sheets", "google_sheets"}:
+    if kind in _SHEET_KINDS:
         site = kwargs.get("site_id") or settings.site_id_filter_default or None
         if settings.require_site_id and not site:
             raise HTTPException(
@@ -112,7 +508,7 @@ def save_plan_overlay_bounds(
     **kwargs: Any,
 ) -> PlanOverlayConfig:
     kind = _normalise_source(source)
-    if kind in {"sheet", "sheets", "google_sheets"}:
+    if kind in _SHEET_KINDS:
         site = kwargs.get("site_id") or settings.site_id_filter_default or None
         if settings.require_site_id and not site:
             raise HTTPException(
@@ -122,11 +518,14 @@ def save_plan_overlay_bounds(
         sheet_id = kwargs.get("sheet_id")
         if not sheet_id:
             raise HTTPException(status_code=400, detail="sheet_id required for plan overlay save")
-        return save_sheet_plan_bounds(
-        sheet_id=sheet_id,
-        site_id=site,
-        payload=payload,
-    )
+        try:
+            return save_sheet_plan_bounds(
+                sheet_id=sheet_id,
+                site_id=site,
+                payload=payload,
+            )
+        finally:
+            _invalidate_sheet_graphs(sheet_id)
     raise HTTPException(status_code=400, detail=f"plan overlay unsupported for data source: {kind}")
 
 
@@ -140,7 +539,7 @@ def list_plan_overlay_drive_files(
     parent_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     kind = _normalise_source(source)
-    if kind not in {"sheet", "sheets", "google_sheets"}:
+    if kind not in _SHEET_KINDS:
         raise HTTPException(status_code=400, detail=f"plan overlay unsupported for data source: {kind}")
     page = drive_list_media(
         query=query,
@@ -164,7 +563,7 @@ def import_plan_overlay_media(
     display_name: Optional[str] = None,
 ) -> PlanOverlayConfig:
     kind = _normalise_source(source)
-    if kind not in {"sheet", "sheets", "google_sheets"}:
+    if kind not in _SHEET_KINDS:
         raise HTTPException(status_code=400, detail=f"plan overlay unsupported for data source: {kind}")
     sid = sheet_id or settings.sheet_id_default
     if not sid:
@@ -196,15 +595,18 @@ def import_plan_overlay_media(
     except HTTPException:
         fallback_bounds = None
 
-    return write_plan_overlay_media(
-        sheet_id=sid,
-        site_id=site,
-        display_name=stored.display_name,
-        source_drive_file_id=stored.source_drive_file_id,
-        png_original_id=stored.png_original_id,
-        png_transparent_id=stored.png_transparent_id,
-        fallback_bounds=fallback_bounds,
-    )
+    try:
+        return write_plan_overlay_media(
+            sheet_id=sid,
+            site_id=site,
+            display_name=stored.display_name,
+            source_drive_file_id=stored.source_drive_file_id,
+            png_original_id=stored.png_original_id,
+            png_transparent_id=stored.png_transparent_id,
+            fallback_bounds=fallback_bounds,
+        )
+    finally:
+        _invalidate_sheet_graphs(sid)
 
 
 def upload_plan_overlay_media(
@@ -219,7 +621,7 @@ def upload_plan_overlay_media(
     fallback_bounds: Optional[PlanOverlayBounds] = None,
 ) -> PlanOverlayConfig:
     kind = _normalise_source(source)
-    if kind not in {"sheet", "sheets", "google_sheets"}:
+    if kind not in _SHEET_KINDS:
         raise HTTPException(status_code=400, detail=f"plan overlay unsupported for data source: {kind}")
     sid = sheet_id or settings.sheet_id_default
     if not sid:
@@ -242,15 +644,18 @@ def upload_plan_overlay_media(
         display_name=display_name,
     )
 
-    return write_plan_overlay_media(
-        sheet_id=sid,
-        site_id=site,
-        display_name=stored.display_name,
-        source_drive_file_id=stored.source_drive_file_id,
-        png_original_id=stored.png_original_id,
-        png_transparent_id=stored.png_transparent_id,
-        fallback_bounds=fallback_bounds,
-    )
+    try:
+        return write_plan_overlay_media(
+            sheet_id=sid,
+            site_id=site,
+            display_name=stored.display_name,
+            source_drive_file_id=stored.source_drive_file_id,
+            png_original_id=stored.png_original_id,
+            png_transparent_id=stored.png_transparent_id,
+            fallback_bounds=fallback_bounds,
+        )
+    finally:
+        _invalidate_sheet_graphs(sid)
 
 
 def clear_plan_overlay_media(
@@ -260,7 +665,7 @@ def clear_plan_overlay_media(
     site_id: Optional[str] = None,
 ) -> None:
     kind = _normalise_source(source)
-    if kind not in {"sheet", "sheets", "google_sheets"}:
+    if kind not in _SHEET_KINDS:
         raise HTTPException(status_code=400, detail=f"plan overlay unsupported for data source: {kind}")
     sid = sheet_id or settings.sheet_id_default
     if not sid:
@@ -274,15 +679,29 @@ def clear_plan_overlay_media(
             detail="site_id required (set query param site_id or SITE_ID_FILTER_DEFAULT)",
         )
 
-    clear_sheet_plan_media(
-        sheet_id=sid,
-        site_id=site,
-    )
+    try:
+        clear_sheet_plan_media(
+            sheet_id=sid,
+            site_id=site,
+        )
+    finally:
+        _invalidate_sheet_graphs(sid)
 
 
 __all__ = [
+    "graph_flight_stats",
+    "load_cached_graph_body",
     "load_graph",
+    "load_graph_async",
+    "refresh_sheet_graph",
     "save_graph",
+    "save_graph_async",
+    "prepare_graph_write",
+    "write_prepared_graph",
+    "graph_write_key",
+    "load_read_snapshot",
+    "load_read_snapshot_async",
+    "republish_read_snapshot",
     "load_plan_overlay_config",
     "save_plan_overlay_bounds",
     "list_plan_overlay_drive_files",
@@ -1,6 +1,7 @@
 """BigQuery data source helpers."""
 from __future__ import annotations
 
+import asyncio
 from typing import Optional
 
 from fastapi import HTTPException
@@ -192,8 +193,28 @@ def load_bigquery(
         raise HTTPException(status_code=501, detail=f"bigquery_unavailable: {exc}")
 
 
+async def load_bigquery_async(
+    dataset: Optional[str] = None,
+    nodes_table: Optional[str] = None,
+    edges_table: Optional[str] = None,
+    project_id: Optional[str] = None,
+) -> Graph:
+    """Async ``load_bigquery``.
+
+    google-cloud-bigquery has no asyncio API (jobs are polled); the load runs in a worker
+    thread so the event loop keeps serving other requests meanwhile.
+    """
+    return await asyncio.to_thread(
+        load_bigquery,
+        dataset=dataset,
+        nodes_table=nodes_table,
+        edges_table=edges_table,
+        project_id=project_id,
+    )
+
+
 def save_bigquery(*_args, **_kwargs) -> None:
     raise HTTPException(status_code=501, detail="bigquery write not implemented")
 
 
-__all__ = ["load_bigquery", "save_bigquery"]
+__all__ = ["load_bigquery", "load_bigquery_async", "save_bigquery"]
@@ -1,6 +1,7 @@
 """Google Cloud Storage JSON data source helpers."""
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from typing import Optional, Tuple
@@ -10,6 +11,7 @@ from fastapi import HTTPException
 from ..config import settings
 from ..models import Graph
 from ..gcp_auth import get_credentials
+from ..services import google_async
 from ..services.graph_sanitizer import graph_to_persistable_payload
 
 
@@ -52,6 +54,27 @@ def load_json(gcs_uri: Optional[str] = None) -> Graph:
         raise HTTPException(status_code=501, detail=f"gcs_json_unavailable: {exc}")
 
 
+async def load_json_async(gcs_uri: Optional[str] = None) -> Graph:
+    """Async ``load_json``: objects are downloaded with the GCS JSON API (``alt=media``)."""
+    uri = gcs_uri or settings.gcs_json_uri_default
+    if not uri:
+        raise HTTPException(status_code=400, detail="gcs_uri required")
+    if uri.startswith("file://") or os.path.isabs(uri):
+        return await asyncio.to_thread(load_json, uri)
+
+    bucket_name, blob_path = _parse_gs_uri(uri)
+    try:
+        payload = await google_async.get_bytes(
+            google_async.STORAGE_ROOT,
+            f"b/{google_async.quote(bucket_name)}/o/{google_async.quote(blob_path)}",
+            scopes=["https://www.googleapis.com/auth/devstorage.read_only"],
+            params=[("alt", "media")],
+        )
+        return Graph.model_validate(json.loads(payload))
+    except Exception as exc:  # pragma: no cover - requires GCS
+        raise HTTPException(status_code=501, detail=f"gcs_json_unavailable: {exc}")
+
+
 def save_json(graph: Graph, gcs_uri: Optional[str] = None) -> None:
     uri = gcs_uri or settings.gcs_json_uri_default
     if not uri:
@@ -109,4 +132,4 @@ def save_json(graph: Graph, gcs_uri: Optional[str] = None) -> None:
         raise HTTPException(status_code=501, detail=f"gcs_write_unavailable: {exc}")
 
 
-__all__ = ["load_json", "save_json"]
+__all__ = ["load_json", "load_json_async", "save_json"]
@@ -25,6 +25,8 @@ def load_sheet(
     nodes_tab: Optional[str] = None,
     edges_tab: Optional[str] = None,
     site_id: Optional[str] = None,
+    *,
+    revision: Optional[str] = None,
 ) -> Graph:
     sid = _clean_sheet_id(sheet_id or settings.sheet_id_default)
     if not sid:
@@ -34,9 +36,44 @@ def load_sheet(
         nodes_tab or settings.sheet_nodes_tab,
         edges_tab or settings.sheet_edges_tab,
         site_id=site_id,
+        revision=revision,
     )
 
 
+async def load_sheet_async(
+    sheet_id: Optional[str] = None,
+    nodes_tab: Optional[str] = None,
+    edges_tab: Optional[str] = None,
+    site_id: Optional[str] = None,
+    *,
+    revision: Optional[str] = None,
+) -> Graph:
+    sid = _clean_sheet_id(sheet_id or settings.sheet_id_default)
+    if not sid:
+        raise HTTPException(status_code=400, detail="sheet_id required")
+    return await sheets_mod.read_nodes_edges_async(
+        sid,
+        nodes_tab or settings.sheet_nodes_tab,
+        edges_tab or settings.sheet_edges_tab,
+        site_id=site_id,
+        revision=revision,
+    )
+
+
+def sheet_revision(sheet_id: Optional[str] = None) -> Optional[str]:
+    sid = _clean_sheet_id(sheet_id or settings.sheet_id_default)
+    if not sid:
+        return None
+    return sheets_mod.read_spreadsheet_revision(sid)
+
+
+async def sheet_revision_async(sheet_id: Optional[str] = None) -> Optional[str]:
+    sid = _clean_sheet_id(sheet_id or settings.sheet_id_default)
+    if not sid:
+        return None
+    return await sheets_mod.read_spreadsheet_revision_async(sid)
+
+
 def save_sheet(
     graph: Graph,
     sheet_id: Optional[str] = None,
@@ -126,7 +163,10 @@ def clear_plan_overlay_media(
 
 __all__ = [
     "load_sheet",
+    "load_sheet_async",
     "save_sheet",
+    "sheet_revision",
+    "sheet_revision_async",
     "load_plan_overlay_config",
     "save_plan_overlay_bounds",
     "write_plan_overlay_media",
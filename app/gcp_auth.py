@@ -1,29 +1,43 @@
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
 
 from .config import settings
 
 
-def get_credentials(scopes: Sequence[str]):
-    """Return google-auth Credentials with proper scopes.
+# Refresh tokens this long before they expire, from a timer thread; google-auth only
+# refreshes inline within 3m45s of expiry, so pooled transports never wait on IAM
+_REFRESH_AHEAD = timedelta(minutes=5)
+# Delay before retrying a failed background refresh
+_RETRY_S = 30.0
 
-    - If IMPERSONATE_SERVICE_ACCOUNT is set, try to impersonate that SA.
-    - If the current ADC are already impersonating the same SA, reuse them directly
-      (avoid double-impersonation which can fail without self TokenCreator).
-    - Otherwise, return ADC with the requested scopes.
-    """
+
+@dataclass
+class _CachedCredentials:
+    credentials: Any = None
+    # serialises minting and every refresh of these credentials (timer and transports)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    timer: Optional[threading.Timer] = None
+    refresh_unlocked: Optional[Callable[[Any], None]] = None
+    closed: bool = False
+
+
+_cache: Dict[Tuple[Tuple[str, ...], str], _CachedCredentials] = {}
+_cache_lock = threading.Lock()
+
+
+def _mint_credentials(target_scopes: Sequence[str], imp_sa: str):
     try:
         import google.auth
         from google.auth.impersonated_credentials import Credentials as ImpersonatedCredentials
     except Exception as exc:
         raise RuntimeError(f"google-auth not available: {exc}")
 
-    target_scopes = list(scopes) if scopes else ["https://www.googleapis.com/auth/cloud-platform"]
-    imp_sa = (settings.impersonate_service_account or "").strip()
-
     # Always get base ADC with target scopes first
-    base_creds, _ = google.auth.default(scopes=target_scopes)
+    base_creds, _ = google.auth.default(scopes=list(target_scopes))
 
     if imp_sa:
         # If ADC are already impersonated for the same SA, reuse them
@@ -38,9 +52,115 @@ def get_credentials(scopes: Sequence[str]):
         return ImpersonatedCredentials(
             source_credentials=base_creds,
             target_principal=imp_sa,
-            target_scopes=target_scopes,
+            target_scopes=list(target_scopes),
             lifetime=3600,
         )
 
     # No impersonation requested: use ADC as-is
     return base_creds
+
+
+def _request():
+    from google.auth.transport.requests import Request
+
+    return Request()
+
+
+def _refresh_delay(creds: Any) -> Optional[float]:
+    """Seconds until ``creds`` should be refreshed ahead of expiry (None: never expires)."""
+    if getattr(creds, "token", None) is None:
+        return 0.0
+    expiry = getattr(creds, "expiry", None)
+    if expiry is None:
+        return None
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return max(0.0, (expiry - now - _REFRESH_AHEAD).total_seconds())
+
+
+def _guard_refresh(entry: _CachedCredentials) -> None:
+    """Route refreshes issued by transports through the entry lock.
+
+    Threads sharing the credentials (one pooled service per thread) would otherwise
+    refresh them concurrently; the first one refreshes, the others find a valid token.
+    """
+    creds = entry.credentials
+    original = creds.refresh
+
+    def refresh(request) -> None:
+        with entry.lock:
+            if getattr(creds, "valid", False):
+                return
+            original(request)
+
+    entry.refresh_unlocked = original
+    creds.refresh = refresh
+
+
+def _schedule_refresh(entry: _CachedCredentials, delay: Optional[float]) -> None:
+    if delay is None or entry.closed:
+        return
+    timer = threading.Timer(delay, _refresh_in_background, args=(entry,))
+    timer.name = "gcp-credentials-refresh"
+    timer.daemon = True
+    entry.timer = timer
+    timer.start()
+
+
+def _refresh_in_background(entry: _CachedCredentials) -> None:
+    try:
+        with entry.lock:
+            entry.refresh_unlocked(_request())
+    except Exception:
+        # the token stays usable until it expires; a transport refreshes it past that point
+        delay: Optional[float] = _RETRY_S
+    else:
+        delay = _refresh_delay(entry.credentials)
+    _schedule_refresh(entry, delay)
+
+
+def get_credentials(scopes: Sequence[str]):
+    """Return google-auth Credentials with proper scopes.
+
+    - If IMPERSONATE_SERVICE_ACCOUNT is set, try to impersonate that SA.
+    - If the current ADC are already impersonating the same SA, reuse them directly
+      (avoid double-impersonation which can fail without self TokenCreator).
+    - Otherwise, return ADC with the requested scopes.
+
+    Credentials are cached per scope set and refreshed by a timer five minutes ahead of
+    expiry, so pooled services (which keep the credentials object) always hold a valid
+    token and never refresh on the request path.
+    """
+    target_scopes = list(scopes) if scopes else ["https://www.googleapis.com/auth/cloud-platform"]
+    imp_sa = (settings.impersonate_service_account or "").strip()
+    key = (tuple(sorted(set(target_scopes))), imp_sa)
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            entry = _cache[key] = _CachedCredentials()
+    if entry.credentials is not None:
+        return entry.credentials
+    # minted outside _cache_lock: only callers of this scope set wait for it
+    with entry.lock:
+        if entry.credentials is None:
+            try:
+                creds = _mint_credentials(target_scopes, imp_sa)
+            except BaseException:
+                with _cache_lock:
+                    if _cache.get(key) is entry:
+                        del _cache[key]
+                raise
+            entry.credentials = creds
+            _guard_refresh(entry)
+            _schedule_refresh(entry, _refresh_delay(creds))
+    return entry.credentials
+
+
+def reset_credentials_cache() -> None:
+    with _cache_lock:
+        entries = list(_cache.values())
+        _cache.clear()
+    for entry in entries:
+        entry.closed = True
+        if entry.timer is not None:
+            entry.timer.cancel()
@@ -1,14 +1,27 @@
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.staticfiles import StaticFiles
 
 from .auth_embed import build_csp
 from .config import settings
+from .datasources import graph_flight_stats, start_invalidation_listener
+from .routers.admin import check_admin_token, router as admin_router
 from .routers.api import router as api_router
 from .routers.embed import router as embed_router
 from .routers.branch import router as branch_router
 from .routers.plan_overlay import router as plan_overlay_router
+from .services.cache_backend import cache_backend
+from .services.google_clients import pool_stats
+from .services.graph_cache import graph_cache
+from .services import write_behind
+from .services.refresh_scheduler import refresh_scheduler
+from .services.warmup import cache_warmup
 
 
 class CSPMiddleware(BaseHTTPMiddleware):
@@ -22,7 +35,21 @@ class CSPMiddleware(BaseHTTPMiddleware):
         return response
 
 
-app = FastAPI(title="Éditeur Réseau API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # saves handled by other instances invalidate our cached graphs (shared cache backends)
+    start_invalidation_listener()
+    # prefetch the configured graphs in the background; /readyz waits for it
+    cache_warmup.start()
+    refresh_scheduler.start()
+    yield
+    refresh_scheduler.stop()
+    # acknowledged write-behind saves must reach the sheet before the process exits
+    await run_in_threadpool(write_behind.flush_pending)
+    cache_backend().close()
+
+
+app = FastAPI(title="Éditeur Réseau API", version="0.1.0", lifespan=lifespan)
 app.add_middleware(CSPMiddleware)
 
 static_dir = settings.static_root
@@ -32,10 +59,35 @@ app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
 @app.get("/healthz")
 def healthz():
-    return {"ok": True}
+    """Liveness: the process answers (readiness is reported, not enforced)."""
+    return {"ok": True, "ready": cache_warmup.ready()}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 503 until the startup cache warmup is done (or timed out)."""
+    ready = cache_warmup.ready()
+    # warmup details (sheet ids, errors) are only reported by /metrics
+    return JSONResponse({"ready": ready}, status_code=200 if ready else 503)
+
+
+@app.get("/metrics")
+def metrics(x_admin_token: Optional[str] = Header(None)):
+    """Cache, pool and warmup counters (same ``X-Admin-Token`` as the admin routes)."""
+    check_admin_token(x_admin_token)
+    return {
+        "cache_backend": cache_backend().stats(),
+        "graph_cache": graph_cache.stats(),
+        "graph_loads": graph_flight_stats(),
+        "google_clients": pool_stats(),
+        "refresh_scheduler": refresh_scheduler.stats(),
+        "warmup": cache_warmup.status(),
+        "write_behind": write_behind.write_behind_queue().stats() if write_behind.enabled() else None,
+    }
 
 
 app.include_router(api_router, prefix="/api", tags=["graph"])
 app.include_router(branch_router, tags=["graph"])
 app.include_router(embed_router, prefix="/embed", tags=["embed"])
 app.include_router(plan_overlay_router)
+app.include_router(admin_router)
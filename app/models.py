@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
 from math import radians, sin, cos, sqrt, atan2
-from pydantic import BaseModel, Field, model_validator, ConfigDict
+from pydantic import BaseModel, Field, model_validator, ConfigDict, PrivateAttr
 
 
 def _haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
@@ -389,3 +389,8 @@ class Graph(BaseModel):
 
     nodes: List[Node] = Field(default_factory=list)
     edges: List[Edge] = Field(default_factory=list)
+
+    # Content hash of the graph as loaded (set by the graph cache, never serialised)
+    _etag: Optional[str] = PrivateAttr(default=None)
+    # Age in seconds of an expired cached copy served while it is refreshed (stale-while-revalidate)
+    _cache_age_s: Optional[float] = PrivateAttr(default=None)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import hmac
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..services.graph_snapshots import export_site_snapshots
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def check_admin_token(provided: Optional[str]) -> None:
+    expected = settings.admin_token
+    if not expected:
+        raise HTTPException(status_code=403, detail="admin endpoints disabled")
+    if not provided or not hmac.compare_digest(provided, expected):
+        raise HTTPException(status_code=403, detail="invalid admin token")
+
+
+@router.post("/snapshots")
+async def export_snapshots(
+    x_admin_token: Optional[str] = Header(None),
+    dest_uri: Optional[str] = Query(None, description="gs://bucket/prefix or file:///dir (default SNAPSHOT_EXPORT_URI)"),
+    sheet_id: Optional[str] = Query(None),
+    nodes_tab: Optional[str] = Query(None),
+    edges_tab: Optional[str] = Query(None),
+    site_id: Optional[List[str]] = Query(None, description="Restrict the export to these sites (repeatable)"),
+    workers: Optional[int] = Query(None, ge=1, le=64),
+):
+    check_admin_token(x_admin_token)
+    return await run_in_threadpool(
+        export_site_snapshots,
+        dest_uri=dest_uri,
+        sheet_id=sheet_id,
+        nodes_tab=nodes_tab,
+        edges_tab=edges_tab,
+        sites=site_id,
+        workers=workers,
+    )
@@ -1,16 +1,92 @@
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
 
 from ..config import settings
 from ..models import Graph
-from ..datasources import load_graph, save_graph
-from ..services.graph_sanitizer import sanitize_graph_for_write
+from ..datasources import (
+    graph_write_key,
+    load_cached_graph_body,
+    load_graph,
+    load_graph_async,
+    load_read_snapshot,
+    load_read_snapshot_async,
+    republish_read_snapshot,
+    prepare_graph_write,
+    save_graph,
+    save_graph_async,
+)
+from ..services.graph_cache import graph_etag
+from ..services import write_behind
+from ..services.read_snapshots import ReadSnapshot
 
 router = APIRouter()
 
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [token.strip() for token in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    # If-None-Match uses weak comparison (RFC 9110 §13.1.2)
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any((c[2:] if c.startswith("W/") else c) == bare for c in candidates)
+
+
+async def _load(**kwargs) -> Graph:
+    if settings.async_datasources:
+        return await load_graph_async(**kwargs)
+    return await run_in_threadpool(load_graph, **kwargs)
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for token in (accept_encoding or "").split(","):
+        coding, _, params = token.strip().partition(";")
+        if coding.strip().lower() in {"gzip", "*"}:
+            name, _, value = params.partition("=")
+            if name.strip().lower() != "q":
+                return True
+            try:
+                return float(value) > 0
+            except ValueError:
+                return False
+    return False
+
+
+async def _read_snapshot(**kwargs) -> Optional[ReadSnapshot]:
+    if settings.async_datasources:
+        return await load_read_snapshot_async(**kwargs)
+    return await run_in_threadpool(load_read_snapshot, **kwargs)
+
+
+def _snapshot_response(request: Request, snapshot: ReadSnapshot) -> Response:
+    """Serve the published bytes untouched (gzip ones as is when the client accepts them)."""
+    gzipped = snapshot.gzip_body is not None and _accepts_gzip(request.headers.get("accept-encoding"))
+    # the gzip representation differs byte-wise: advertise it with a weak validator
+    etag = f"W/{snapshot.etag}" if gzipped else snapshot.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding", "X-Graph-Snapshot": "hit"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+async def _save(**kwargs) -> None:
+    if settings.async_datasources:
+        await save_graph_async(**kwargs)
+        return
+    await run_in_threadpool(save_graph, **kwargs)
+
+
 @router.get("/graph", response_model=Graph)
-def get_graph(
+async def get_graph(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     source: Optional[str] = Query(None, description="sheet | gcs_json | bigquery"),
     sheet_id: Optional[str] = Query(None),
     nodes_tab: Optional[str] = Query(None),
@@ -21,10 +97,21 @@ def get_graph(
     bq_nodes: Optional[str] = Query(None),
     bq_edges: Optional[str] = Query(None),
     site_id: Optional[str] = Query(None, description="Optional site filter (matches column idSite1 when present in Sheets)"),
-    normalize: Optional[bool] = Query(False, description="If true, returns v1.5 normalized graph (branch_id on edges, diameters filled, lengths computed)")
+    normalize: Optional[bool] = Query(False, description="If true, returns v1.5 normalized graph (branch_id on edges, diameters filled, lengths computed)"),
+    mode: Optional[str] = Query(None, description="ro: answer from the read snapshot of the last save when READ_SNAPSHOTS is on"),
 ):
-    g = load_graph(
+    if mode == "ro" and not normalize:
+        target = dict(source=source, sheet_id=sheet_id, nodes_tab=nodes_tab, edges_tab=edges_tab, site_id=site_id)
+        snapshot = await _read_snapshot(**target)
+        if snapshot is not None:
+            return _snapshot_response(request, snapshot)
+        # withdrawn by a write to the sheet (or never published): the next ones are served from it
+        background_tasks.add_task(republish_read_snapshot, **target)
+    if_none_match = request.headers.get("if-none-match")
+    cached = await run_in_threadpool(
+        load_cached_graph_body,
         source=source,
+        matches=lambda etag: _etag_matches(if_none_match, etag),
         sheet_id=sheet_id,
         nodes_tab=nodes_tab,
         edges_tab=edges_tab,
@@ -34,13 +121,42 @@ def get_graph(
         bq_nodes=bq_nodes,
         bq_edges=bq_edges,
         site_id=site_id,
+        normalize=normalize,
     )
-    return sanitize_graph_for_write(g, strict=False) if normalize else g
+    if cached is not None:
+        # fresh mapped entry: answered from its stored ETag and JSON, no Graph is parsed
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+        if cached.body is None:
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+    g = await _load(
+        source=source,
+        sheet_id=sheet_id,
+        nodes_tab=nodes_tab,
+        edges_tab=edges_tab,
+        gcs_uri=gcs_uri,
+        bq_project=bq_project,
+        bq_dataset=bq_dataset,
+        bq_nodes=bq_nodes,
+        bq_edges=bq_edges,
+        site_id=site_id,
+        normalize=normalize,
+    )
+    etag = graph_etag(g)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if g._cache_age_s is not None:
+        # served from an expired cache entry while it is being re-read
+        headers.update({"X-Graph-Stale": "1", "Age": str(int(g._cache_age_s))})
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return g
 
 
 @router.post("/graph")
-def post_graph(
+async def post_graph(
     graph: Graph,
+    response: Response,
     source: Optional[str] = Query(None, description="sheet | gcs_json | bigquery"),
     sheet_id: Optional[str] = Query(None),
     nodes_tab: Optional[str] = Query(None),
@@ -52,9 +168,8 @@ def post_graph(
     bq_edges: Optional[str] = Query(None),
     site_id: Optional[str] = Query(None, description="Optional site filter (matches column idSite1 when present in Sheets)"),
 ):
-    save_graph(
+    target = dict(
         source=source,
-        graph=graph,
         sheet_id=sheet_id,
         nodes_tab=nodes_tab,
         edges_tab=edges_tab,
@@ -65,4 +180,19 @@ def post_graph(
         bq_edges=bq_edges,
         site_id=site_id,
     )
+    key = graph_write_key(**target) if write_behind.enabled() else None
+    if key is not None:
+        prepared = await run_in_threadpool(prepare_graph_write, graph=graph, **target)
+        write_id = write_behind.write_behind_queue().submit(key, prepared, **target)
+        response.status_code = 202
+        return {"ok": True, "write_id": write_id, "durable": False}
+    await _save(graph=graph, **target)
     return {"ok": True}
+
+
+@router.get("/graph/writes/{write_id}")
+async def get_graph_write(write_id: str):
+    """State of a write-behind save: pending, durable (this or a later save landed) or failed."""
+    if not write_behind.enabled():
+        raise HTTPException(status_code=404, detail="write-behind disabled")
+    return write_behind.write_behind_queue().status(write_id)
@@ -0,0 +1,625 @@
+"""Key/value backends behind the graph and plan overlay caches.
+
+``CACHE_BACKEND`` selects one of:
+
+* ``memory``: a dict in the process (the default, nothing is shared);
+* ``disk``: one file per entry under ``CACHE_DISK_DIR``, shared by the workers of a
+  host or by instances mounting the same volume;
+* ``redis``: any server speaking the Redis protocol at ``CACHE_REDIS_URL``, shared by
+  every instance. The client is a minimal RESP implementation over a small pool of
+  sockets (GET, SET PX, SCAN/DEL, PUBLISH/SUBSCRIBE); ``scripts/redis_standin.py``
+  serves the same subset locally for tests.
+
+Besides entries, a backend carries invalidation events: ``publish`` reaches the
+``subscribe`` handlers of every process using the same backend (an event log file for
+``disk``, pub/sub for ``redis``). A handler called with ``None`` must assume events were
+missed (the subscription was lost) and drop what it cached.
+
+Backends never raise on storage errors: a failing shared cache degrades to misses and
+the errors are counted in ``stats``.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+Handler = Callable[[Optional[str]], None]
+
+_NAMESPACE = "editeur-reseau:"
+_DISK_POLL_S = 0.5
+# events.log is replaced by an empty file once it grows past this size
+_DISK_EVENTS_MAX_BYTES = 1 << 20
+_REDIS_TIMEOUT_S = 2.0
+_REDIS_RETRY_S = (0.5, 30.0)
+# idle command connections kept open; busier moments open more and close the extras
+_REDIS_POOL_SIZE = 8
+_SCAN_COUNT = 200
+
+
+class CacheBackend(ABC):
+    """Interface of the cache backends (see the module docstring)."""
+
+    name = "base"
+    # True when other processes see the entries and events of this backend
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_s: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """Drop every entry whose key starts with ``prefix``; returns how many were dropped."""
+
+    @abstractmethod
+    def publish(self, channel: str, message: str) -> None:
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        ...
+
+    def close(self) -> None:
+        """Drop the subscriptions; entries stay usable (connections reopen on demand)."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class _Handlers:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_channel: Dict[str, List[Handler]] = {}
+
+    def add(self, channel: str, handler: Handler) -> bool:
+        """Register ``handler``; True when ``channel`` had no handler yet."""
+        with self._lock:
+            handlers = self._by_channel.setdefault(channel, [])
+            handlers.append(handler)
+            return len(handlers) == 1
+
+    def channels(self) -> List[str]:
+        with self._lock:
+            return list(self._by_channel)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_channel.clear()
+
+    def dispatch(self, channel: Optional[str], message: Optional[str]) -> None:
+        """Call the handlers of ``channel`` (of every channel when None)."""
+        with self._lock:
+            if channel is None:
+                handlers = [h for hs in self._by_channel.values() for h in hs]
+            else:
+                handlers = list(self._by_channel.get(channel, ()))
+        for handler in handlers:
+            try:
+                handler(message)
+            except Exception:  # pragma: no cover - one bad handler must not stop the others
+                pass
+
+
+class MemoryBackend(CacheBackend):
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[bytes, float]] = {}
+        self._handlers = _Handlers()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for stale in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+                del self._entries[stale]
+            self._entries[key] = (value, now + ttl_s)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def publish(self, channel: str, message: str) -> None:
+        self._handlers.dispatch(channel, message)
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.add(channel, handler)
+
+    def close(self) -> None:
+        self._handlers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": self.name, "entries": len(self._entries)}
+
+
+class DiskBackend(CacheBackend):
+    """Entries are ``<sha256(key)>.entry`` files (a JSON header line, then the value).
+
+    Events are appended to ``events.log`` in the same directory and picked up by a
+    thread polling it every ``_DISK_POLL_S`` seconds. Past ``_DISK_EVENTS_MAX_BYTES``
+    the log is replaced by an empty one; followers that notice the new file call
+    their handlers with ``None``, as events written to the old one may have been missed.
+    """
+
+    name = "disk"
+    shared = True
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._events_path = os.path.join(directory, "events.log")
+        self._handlers = _Handlers()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._errors = 0
+        self._rotations = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                header = json.loads(fh.readline())
+                if header.get("key") != key:
+                    return None
+                if header["expires_at"] <= time.time():
+                    os.unlink(path)
+                    return None
+                return fh.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            self._error()
+            return None
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> None:
+        header = json.dumps({"key": key, "expires_at": time.time() + ttl_s}).encode("utf-8")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(header + b"\n" + value)
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError:
+            self._error()
+
+    def delete_prefix(self, prefix: str) -> int:
+        dropped = 0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            if not name.endswith(".entry"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as fh:
+                    key = json.loads(fh.readline()).get("key", "")
+                if key.startswith(prefix):
+                    os.unlink(path)
+                    dropped += 1
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError):
+                self._error()
+        return dropped
+
+    def publish(self, channel: str, message: str) -> None:
+        line = json.dumps({"channel": channel, "message": message}, ensure_ascii=False) + "\n"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # one O_APPEND write per event: concurrent writers never interleave lines
+            with open(self._events_path, "ab") as fh:
+                fh.write(line.encode("utf-8"))
+                size = fh.tell()
+            if size > _DISK_EVENTS_MAX_BYTES:
+                self._rotate_events()
+        except OSError:
+            self._error()
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.add(channel, handler)
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._follow, args=self._log_position(), name="cache-disk-events", daemon=True
+            )
+            self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        self._handlers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "directory": self.directory,
+            "errors": self._errors,
+            "log_rotations": self._rotations,
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".entry")
+
+    def _log_position(self) -> Tuple[Optional[int], int]:
+        """Inode and size of the event log, created if needed (followers start at its end)."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._events_path, "ab") as fh:
+                stat = os.fstat(fh.fileno())
+        except OSError:  # called under self._lock: the follower reports the errors
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    def _rotate_events(self) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            os.replace(tmp, self._events_path)
+        except OSError:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            self._rotations += 1
+
+    def _follow(self, inode: Optional[int], offset: int) -> None:
+        while not self._stop.wait(_DISK_POLL_S):
+            try:
+                fh = open(self._events_path, "rb")
+            except FileNotFoundError:
+                continue
+            except OSError:
+                self._error()
+                continue
+            with fh:
+                stat = os.fstat(fh.fileno())
+                if stat.st_ino != inode or stat.st_size < offset:
+                    if inode is not None:
+                        # rotated or truncated: what was appended before may never be read
+                        self._handlers.dispatch(None, None)
+                    inode, offset = stat.st_ino, 0
+                if stat.st_size == offset:
+                    continue
+                try:
+                    fh.seek(offset)
+                    chunk = fh.read(stat.st_size - offset)
+                except OSError:
+                    self._error()
+                    continue
+            complete = chunk.rfind(b"\n") + 1  # a line still being written is read next time
+            offset += complete
+            for line in chunk[:complete].splitlines():
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                self._handlers.dispatch(event.get("channel"), event.get("message"))
+
+    def _error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+
+class RedisError(Exception):
+    """Error reply of a Redis-protocol server."""
+
+
+def _encode_command(args: Tuple[Any, ...]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+class _RespConnection:
+    def __init__(self, host: str, port: int, *, timeout: Optional[float]) -> None:
+        self._sock = socket.create_connection((host, port), timeout=_REDIS_TIMEOUT_S)
+        self._sock.settimeout(timeout)
+        self._reader = self._sock.makefile("rb")
+
+    def send(self, *args: Any) -> None:
+        self._sock.sendall(_encode_command(args))
+
+    def read(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by the cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            return RedisError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            if len(data) != size + 2:
+                raise ConnectionError("connection closed by the cache server")
+            return data[:-2]
+        if kind == b"*":
+            size = int(body)
+            return None if size < 0 else [self.read() for _ in range(size)]
+        raise ConnectionError(f"unexpected RESP reply: {line[:32]!r}")
+
+    def command(self, *args: Any) -> Any:
+        self.send(*args)
+        reply = self.read()
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    def close(self) -> None:
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._reader.close()
+        self._sock.close()
+
+
+def _glob_escape(text: str) -> str:
+    return "".join("\\" + char if char in "*?[]\\" else char for char in text)
+
+
+class RedisBackend(CacheBackend):
+    """Redis-protocol backend: keys and channels are prefixed with ``editeur-reseau:``.
+
+    Each command takes an idle connection from a small pool (or opens one) and gives
+    it back once its reply is read, so a slow reply never holds up the other threads;
+    a failed command is retried once on a fresh connection. Subscriptions run on a
+    dedicated connection in a daemon thread that reconnects with backoff and, after an
+    interruption, calls the handlers with ``None``.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str, *, namespace: str = _NAMESPACE) -> None:
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme not in ("redis", ""):
+            raise ValueError(f"unsupported cache URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self._password = urllib.parse.unquote(parsed.password) if parsed.password else None
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._idle: List[_RespConnection] = []
+        self._handlers = _Handlers()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sub_conn: Optional[_RespConnection] = None
+        self._errors = 0
+        self._resubscribed = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call(None, "GET", self._namespace + key)
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> None:
+        self._call(None, "SET", self._namespace + key, value, "PX", max(1, int(ttl_s * 1000)))
+
+    def delete_prefix(self, prefix: str) -> int:
+        pattern = _glob_escape(self._namespace + prefix) + "*"
+        cursor, dropped = b"0", 0
+        while True:
+            reply = self._call(None, "SCAN", cursor, "MATCH", pattern, "COUNT", _SCAN_COUNT)
+            if reply is None:
+                return dropped
+            cursor, keys = reply
+            if keys:
+                dropped += self._call(0, "DEL", *keys)
+            if cursor in (b"0", "0"):
+                return dropped
+
+    def publish(self, channel: str, message: str) -> None:
+        self._call(None, "PUBLISH", self._namespace + channel, message)
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        first = self._handlers.add(channel, handler)
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._listen, name="cache-redis-events", daemon=True)
+                self._thread.start()
+                return
+            conn = self._sub_conn
+        if first and conn is not None:
+            try:
+                conn.send("SUBSCRIBE", self._namespace + channel)
+            except OSError:
+                pass  # the listener reconnects and subscribes to every channel
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+            conns = self._idle + ([self._sub_conn] if self._sub_conn is not None else [])
+            self._idle, self._sub_conn = [], None
+        for conn in conns:
+            conn.close()
+        if thread is not None:
+            thread.join()
+        self._handlers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "server": f"{self.host}:{self.port}",
+                "idle_connections": len(self._idle),
+                "subscribed": self._sub_conn is not None,
+                "errors": self._errors,
+                "resubscribed": self._resubscribed,
+            }
+
+    def _connect(self, *, timeout: Optional[float]) -> _RespConnection:
+        conn = _RespConnection(self.host, self.port, timeout=timeout)
+        try:
+            if self._password:
+                conn.command("AUTH", self._password)
+            if self._db:
+                conn.command("SELECT", self._db)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _call(self, default: Any, *args: Any) -> Any:
+        for attempt in range(2):
+            conn: Optional[_RespConnection] = None
+            try:
+                conn = self._checkout()
+                reply = conn.command(*args)
+            except RedisError:
+                self._checkin(conn)
+                self._error()
+                return default
+            except (OSError, ValueError):
+                if conn is not None:
+                    conn.close()
+                # the server went away: the other idle connections are dead as well
+                self._drop_idle()
+                if attempt:
+                    self._error()
+                continue
+            self._checkin(conn)
+            return reply
+        return default
+
+    def _checkout(self) -> _RespConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect(timeout=_REDIS_TIMEOUT_S)
+
+    def _checkin(self, conn: Optional[_RespConnection]) -> None:
+        if conn is None:
+            return
+        with self._lock:
+            if len(self._idle) < _REDIS_POOL_SIZE:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _drop_idle(self) -> None:
+        with self._lock:
+            conns, self._idle = self._idle, []
+        for conn in conns:
+            conn.close()
+
+    def _error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def _listen(self) -> None:
+        delay, interrupted = _REDIS_RETRY_S[0], False
+        while not self._stop.is_set():
+            conn: Optional[_RespConnection] = None
+            try:
+                conn = self._connect(timeout=None)
+                with self._lock:
+                    if self._stop.is_set():
+                        break
+                    self._sub_conn = conn
+                conn.send("SUBSCRIBE", *[self._namespace + channel for channel in self._handlers.channels()])
+                if interrupted:
+                    with self._lock:
+                        self._resubscribed += 1
+                    self._handlers.dispatch(None, None)
+                    interrupted = False
+                delay = _REDIS_RETRY_S[0]
+                while True:
+                    reply = conn.read()
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        channel = reply[1].decode("utf-8")[len(self._namespace):]
+                        self._handlers.dispatch(channel, reply[2].decode("utf-8"))
+            except (OSError, ValueError):
+                if self._stop.is_set():
+                    break
+                self._error()
+                interrupted = True
+            finally:
+                with self._lock:
+                    if self._sub_conn is conn:
+                        self._sub_conn = None
+                if conn is not None:
+                    conn.close()
+            self._stop.wait(delay)
+            delay = min(delay * 2, _REDIS_RETRY_S[1])
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(kind: str) -> CacheBackend:
+    kind = (kind or "memory").lower()
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "disk":
+        return DiskBackend(settings.cache_disk_dir or os.path.join(tempfile.gettempdir(), "editeur-reseau-cache"))
+    if kind == "redis":
+        return RedisBackend(settings.cache_redis_url)
+    raise ValueError(f"unknown CACHE_BACKEND: {kind}")
+
+
+def cache_backend() -> CacheBackend:
+    """Process-wide backend selected by ``CACHE_BACKEND`` (created on first use)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(settings.cache_backend)
+        return _backend
+
+
+__all__ = [
+    "CacheBackend",
+    "DiskBackend",
+    "MemoryBackend",
+    "RedisBackend",
+    "RedisError",
+    "cache_backend",
+    "create_backend",
+]
@@ -1,16 +1,11 @@
 """Helpers for interacting with the Google Drive API."""
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from typing import Iterable
 
 from fastapi import HTTPException
 
-from ..gcp_auth import get_credentials
-
-try:
-    from googleapiclient.discovery import build
-except Exception:  # pragma: no cover - dependency loaded at runtime
-    build = None
+from .google_clients import get_service
 
 
 _READONLY_SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
@@ -18,15 +13,23 @@ _WRITE_SCOPES = ["https://www.googleapis.com/auth/drive"]
 
 
 def _ensure_client(scopes: Iterable[str]):
-    if not build:  # pragma: no cover - ensures meaningful error if dependency missing
-        raise HTTPException(status_code=500, detail="drive_client_unavailable")
-    creds = get_credentials(list(scopes))
-    return build("drive", "v3", credentials=creds, cache_discovery=False)
+    try:
+        return get_service("drive", "v3", scopes)
+    except ImportError as exc:  # pragma: no cover - ensures meaningful error if dependency missing
+        raise HTTPException(status_code=500, detail="drive_client_unavailable") from exc
 
 
 def get_drive_service(*, writable: bool = False):
-    """Return a Drive API client with the appropriate scope."""
+    """Return the calling thread's pooled Drive API client with the appropriate scope."""
 
     scopes = _WRITE_SCOPES if writable else _READONLY_SCOPES
     return _ensure_client(scopes)
 
+
+def media_io_classes():
+    """Return ``(MediaIoBaseDownload, MediaIoBaseUpload)``, imported on first use."""
+    try:
+        from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+    except ImportError as exc:  # pragma: no cover - ensures meaningful error if dependency missing
+        raise HTTPException(status_code=500, detail="drive_client_unavailable") from exc
+    return MediaIoBaseDownload, MediaIoBaseUpload
@@ -0,0 +1,131 @@
+"""Async HTTP access to the Google REST APIs (Sheets, Drive, Cloud Storage).
+
+Used by the async datasource variants: requests go through one ``httpx.AsyncClient``
+per event loop (HTTP/1.1 keep-alive pool), authorised with the cached credentials of
+``gcp_auth``. Token refreshes and the first credential lookup run in a worker thread
+so they never block the event loop. ``GOOGLE_API_EMULATOR_HOST`` redirects Sheets and
+Drive to a local stand-in, unauthenticated, as for the sync clients.
+"""
+from __future__ import annotations
+
+import asyncio
+import urllib.parse
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..config import settings
+from ..gcp_auth import get_credentials
+
+SHEETS_ROOT = "https://sheets.googleapis.com/"
+DRIVE_ROOT = "https://www.googleapis.com/drive/v3/"
+STORAGE_ROOT = "https://storage.googleapis.com/storage/v1/"
+
+_HTTP_TIMEOUT_S = 60.0
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+class GoogleAPIError(Exception):
+    """Non-2xx answer from a Google REST API."""
+
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+def _new_client():
+    import httpx
+
+    return httpx.AsyncClient(timeout=_HTTP_TIMEOUT_S, limits=httpx.Limits(max_keepalive_connections=20))
+
+
+def _client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _new_client()
+        _clients[loop] = client
+    return client
+
+
+def _emulated_url(root: str, path: str) -> Optional[str]:
+    emulator = settings.google_api_emulator_host.rstrip("/")
+    if not emulator or root == STORAGE_ROOT:
+        return None
+    service_path = urllib.parse.urlparse(root).path
+    return f"{emulator}{service_path}{path}"
+
+
+def _refresh(creds: Any) -> None:
+    from google.auth.transport.requests import Request
+
+    creds.refresh(Request())
+
+
+async def _auth_headers(scopes: Sequence[str]) -> Dict[str, str]:
+    creds = await asyncio.to_thread(get_credentials, list(scopes))
+    if not getattr(creds, "token", None) or getattr(creds, "expired", False):
+        await asyncio.to_thread(_refresh, creds)
+    return {"Authorization": f"Bearer {creds.token}"}
+
+
+def _error_message(response: Any) -> str:
+    try:
+        payload = response.json()
+        return str(payload.get("error", {}).get("message") or payload)
+    except Exception:
+        return response.text[:500]
+
+
+async def request(
+    method: str,
+    root: str,
+    path: str,
+    *,
+    scopes: Sequence[str],
+    params: Optional[Iterable[Tuple[str, Any]]] = None,
+    json_body: Any = None,
+) -> Any:
+    """Call ``root + path`` and return the raw ``httpx.Response`` (raises ``GoogleAPIError``)."""
+    url = _emulated_url(root, path)
+    headers: Dict[str, str] = {}
+    if url is None:
+        url = f"{root}{path}"
+        headers = await _auth_headers(scopes)
+    response = await _client().request(
+        method,
+        url,
+        params=list(params or []),
+        json=json_body,
+        headers=headers,
+    )
+    if response.status_code >= 400:
+        raise GoogleAPIError(response.status_code, _error_message(response))
+    return response
+
+
+async def get_json(root: str, path: str, *, scopes: Sequence[str], params: Optional[List[Tuple[str, Any]]] = None) -> Any:
+    response = await request("GET", root, path, scopes=scopes, params=params)
+    return response.json()
+
+
+async def get_bytes(root: str, path: str, *, scopes: Sequence[str], params: Optional[List[Tuple[str, Any]]] = None) -> bytes:
+    response = await request("GET", root, path, scopes=scopes, params=params)
+    return response.content
+
+
+def quote(segment: str) -> str:
+    return urllib.parse.quote(segment, safe="")
+
+
+__all__ = [
+    "DRIVE_ROOT",
+    "GoogleAPIError",
+    "SHEETS_ROOT",
+    "STORAGE_ROOT",
+    "get_bytes",
+    "get_json",
+    "quote",
+    "request",
+]
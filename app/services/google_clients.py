@@ -0,0 +1,167 @@
+"""Pooled Google API service objects (Sheets, Drive).
+
+``googleapiclient`` resources and their ``httplib2`` transports are not thread-safe,
+so the pool is per thread: each worker thread of the Starlette threadpool keeps one
+service per (api, version, scopes) with its own ``AuthorizedHttp`` whose TLS
+connections stay open across requests.
+
+Services are built from the discovery documents bundled with ``googleapiclient``
+(read once per process), never from the network: a cold instance does not pay a
+discovery round trip before its first Sheets/Drive call. ``GOOGLE_API_EMULATOR_HOST``
+points every service at a local stand-in (unauthenticated), for dev and benchmarks.
+
+Every request a service sends is counted for the calling thread: ``counted_calls``
+reports how many upstream calls a block of code really made (retries included), which
+is what quota budgets such as the refresh scheduler's have to be charged.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import urllib.parse
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from ..config import settings
+from ..gcp_auth import get_credentials
+
+SHEETS_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive.readonly",
+]
+
+_HTTP_TIMEOUT_S = 60
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _count(kind: str) -> None:
+    with _stats_lock:
+        _stats[kind] += 1
+
+
+def note_call() -> None:
+    """Count one upstream request for the calling thread's ``counted_calls`` blocks."""
+    counter: List[int] | None = getattr(_local, "calls", None)
+    if counter is not None:
+        counter[0] += 1
+
+
+@contextmanager
+def counted_calls() -> Iterator[Callable[[], int]]:
+    """Yield a function returning the requests the calling thread made in the block so far.
+
+    Blocks nest: an inner block's calls are also counted by the enclosing one.
+    """
+    outer: List[int] | None = getattr(_local, "calls", None)
+    counter = [0]
+    _local.calls = counter
+    try:
+        yield lambda: counter[0]
+    finally:
+        _local.calls = outer
+        if outer is not None:
+            outer[0] += counter[0]
+
+
+class _CountedHttp:
+    """Transport wrapper calling ``note_call`` for every request a service sends."""
+
+    def __init__(self, http: Any) -> None:
+        self._http = http
+
+    def request(self, *args: Any, **kwargs: Any) -> Any:
+        note_call()
+        return self._http.request(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._http, name)
+
+
+@lru_cache(maxsize=None)
+def _discovery_document(api: str, version: str) -> str:
+    """Raw JSON of the discovery document shipped with ``googleapiclient``."""
+    from googleapiclient.discovery_cache import get_static_doc
+
+    doc = get_static_doc(api, version)
+    if doc is None:
+        raise RuntimeError(f"no bundled discovery document for {api} {version}")
+    return doc
+
+
+def _build_service(api: str, version: str, scopes: Iterable[str]):
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+
+    # build_from_document mutates the parsed document, so each build parses its own copy
+    doc = _discovery_document(api, version)
+    emulator = settings.google_api_emulator_host.rstrip("/")
+    if emulator:
+        service_path = json.loads(doc).get("servicePath", "")
+        return build_from_document(
+            doc,
+            http=_CountedHttp(httplib2.Http(timeout=_HTTP_TIMEOUT_S)),
+            client_options={"api_endpoint": urllib.parse.urljoin(emulator + "/", service_path)},
+        )
+
+    import google_auth_httplib2
+
+    creds = get_credentials(list(scopes))
+    http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=_HTTP_TIMEOUT_S))
+    return build_from_document(doc, http=_CountedHttp(http))
+
+
+def get_service(api: str, version: str, scopes: Iterable[str]):
+    """Return the calling thread's service for ``api``/``version``, building it once."""
+    key: Tuple[str, str, Tuple[str, ...]] = (api, version, tuple(sorted(scopes)))
+    pool: Dict[Tuple[str, str, Tuple[str, ...]], Any] | None = getattr(_local, "services", None)
+    if pool is None:
+        pool = {}
+        _local.services = pool
+    service = pool.get(key)
+    if service is not None:
+        _count("hits")
+        return service
+    _count("misses")
+    service = _build_service(api, version, key[2])
+    pool[key] = service
+    return service
+
+
+def http_error_class() -> type:
+    """``googleapiclient.errors.HttpError``, imported on first use.
+
+    Meant for ``except http_error_class() as exc:``: the expression is only evaluated
+    once an exception is raised, so successful calls never import the module.
+    """
+    from googleapiclient.errors import HttpError
+
+    return HttpError
+
+
+def get_sheets_service():
+    return get_service("sheets", "v4", SHEETS_SCOPES)
+
+
+def reset_pool() -> None:
+    """Drop the calling thread's services (next call rebuilds them)."""
+    _local.services = {}
+
+
+def pool_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+__all__ = [
+    "counted_calls",
+    "get_service",
+    "get_sheets_service",
+    "http_error_class",
+    "note_call",
+    "reset_pool",
+    "pool_stats",
+]
@@ -0,0 +1,521 @@
+"""Process-wide cache placed in front of the graph datasources.
+
+With a shared ``CACHE_BACKEND`` (disk, redis), the in-process entries are backed by
+serialized copies in the backend: a miss here is looked up there before the datasource
+is read, so a graph loaded by one instance is warm for the others. ``invalidate``
+drops the document in the backend too and broadcasts an event; instances running
+``listen`` then drop their own copies.
+
+With ``GRAPH_SHM_DIR``, entries hold a read-only mapping of a snapshot file shared by
+the workers of the host instead of a parsed graph (see ``shared_graphs``). ``get_body``
+serves those as they are: revalidations are answered from the stored ETag and hits
+with the mapped JSON, so a Graph is only parsed when a caller really needs one.
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from ..config import settings
+from ..models import Graph
+from .cache_backend import CacheBackend, cache_backend
+from .graph_sanitizer import graph_to_persistable_payload
+from .shared_graphs import SharedGraph, SharedGraphStore
+
+_INVALIDATION_CHANNEL = "graph-invalidate"
+
+
+class GraphCacheKey(NamedTuple):
+    source: str
+    document: str
+    tabs: Tuple[str, ...]
+    site_id: str
+    normalize: bool
+
+
+class Generation(NamedTuple):
+    """Invalidation token of a document, read before a load and checked by ``put``."""
+
+    local: int
+    shared: Optional[str]  # epoch of the document's shared-memory snapshots (None without shm)
+
+
+class CachedBody(NamedTuple):
+    """Fresh hit answered without a Graph: ``body`` is None when the client's copy matches."""
+
+    etag: str
+    body: Optional[memoryview]
+
+
+@dataclass
+class _CacheEntry:
+    graph: Optional[Graph]  # None when the graph lives in ``shared``
+    etag: str
+    size_bytes: int
+    expires_at: float
+    stored_at: float
+    revision: Optional[str] = None
+    shared: Optional[SharedGraph] = None
+
+    def copy(self) -> Graph:
+        if self.shared is not None:
+            return self.shared.load()
+        return self.graph.model_copy(deep=True)
+
+
+def _graph_fingerprint(graph: Graph) -> bytes:
+    payload = graph_to_persistable_payload(graph)
+    # plan_overlay is served with the graph but is not part of the persisted whitelist
+    overlay = graph.plan_overlay.model_dump(mode="json") if graph.plan_overlay else None
+    payload["plan_overlay"] = overlay
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _etag_from_fingerprint(fingerprint: bytes) -> str:
+    return f'"{hashlib.sha256(fingerprint).hexdigest()[:32]}"'
+
+
+def _shared_prefix(source: str, document: str) -> str:
+    return "graph:" + json.dumps([source, document], separators=(",", ":"))[:-1] + ","
+
+
+def _shared_key(key: GraphCacheKey) -> str:
+    return "graph:" + json.dumps(
+        [key.source, key.document, list(key.tabs), key.site_id, key.normalize], separators=(",", ":")
+    )
+
+
+def compute_graph_etag(graph: Graph) -> str:
+    """Strong ETag over the persisted payload of ``graph``."""
+    return _etag_from_fingerprint(_graph_fingerprint(graph))
+
+
+def graph_etag(graph: Graph) -> str:
+    """Return the ETag attached by the cache, computing it when the graph was not cached."""
+    cached = graph._etag
+    if cached:
+        return cached
+    etag = compute_graph_etag(graph)
+    graph._etag = etag
+    return etag
+
+
+class GraphCache:
+    """TTL + LRU cache of loaded graphs, bounded by entry count and serialized size.
+
+    Stored graphs are private copies: callers always receive a deep copy so that
+    sanitisation or UI-side mutations never leak back into the cache.
+
+    Entries stored with an upstream ``revision`` outlive their TTL (until LRU eviction)
+    so that ``revalidate`` can renew them without re-reading the document. Other entries
+    are kept ``stale_s`` seconds past their TTL for ``get_stale``.
+
+    A load racing a save must not store the pre-save graph after the invalidation:
+    loaders read ``generation`` before querying the datasource and pass it to ``put``,
+    which skips the store when the document was invalidated in between, in this process
+    or, through the snapshot epoch, in another worker sharing ``shm``.
+
+    With ``shm``, evicted and expired entries delete their snapshot and every store
+    sweeps the directory down to ``max_entries`` / ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_s: int,
+        max_entries: int,
+        max_bytes: int,
+        stale_s: int = 0,
+        backend: Optional[CacheBackend] = None,
+        shm: Optional[SharedGraphStore] = None,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.stale_s = stale_s
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[GraphCacheKey, _CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._revalidations = 0
+        self._stale_hits = 0
+        # a process-local backend would only duplicate the entries kept here
+        self.backend = backend if backend is not None and backend.shared else None
+        self._origin = uuid.uuid4().hex
+        self._shared_hits = 0
+        self._remote_invalidations = 0
+        self.shm = shm
+        self._counter = itertools.count(1)
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._cleared_at = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_s > 0 and self.max_entries > 0
+
+    def get(self, key: GraphCacheKey) -> Optional[Graph]:
+        entry = self._fresh(key, lambda entry: True)
+        if entry is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        return entry.copy()
+
+    def get_body(self, key: GraphCacheKey, matches: Callable[[str], bool]) -> Optional[CachedBody]:
+        """Fresh hit answered without parsing: not modified when ``matches(etag)``, else the
+        mapped JSON. None (and nothing counted) on a miss or for an entry held as a Graph."""
+        entry = self._fresh(key, lambda entry: entry.shared is not None or matches(entry.etag))
+        if entry is None:
+            return None
+        if matches(entry.etag):
+            return CachedBody(entry.etag, None)
+        return CachedBody(entry.etag, entry.shared.body)
+
+    def _fresh(self, key: GraphCacheKey, usable: Callable[[_CacheEntry], bool]) -> Optional[_CacheEntry]:
+        """Unexpired entry of ``key`` accepted by ``usable``; hits are counted, misses are not."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._current(key)
+            if entry is not None and entry.expires_at > now:
+                if not usable(entry):
+                    return None
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            if entry is not None and entry.revision is None and entry.expires_at + self.stale_s <= now:
+                self._drop(key, discard=True)
+        # stored by another worker (shared memory) or another instance (shared backend)
+        entry = self._load_mapped(key, now) or self._load_shared(key, now)
+        if entry is None:
+            return None
+        with self._lock:
+            self._store(key, entry)
+            self._shared_hits += 1
+        return entry if usable(entry) else None
+
+    def get_stale(self, key: GraphCacheKey) -> Optional[Graph]:
+        """Expired copy still within ``stale_s`` of its TTL, tagged with its age (``_cache_age_s``).
+
+        Meant for stale-while-revalidate: the caller serves it and refreshes the key.
+        """
+        if not self.enabled or self.stale_s <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._current(key)
+            if entry is None or not entry.expires_at <= now < entry.expires_at + self.stale_s:
+                return None
+            self._entries.move_to_end(key)
+            self._stale_hits += 1
+        copy = entry.copy()
+        copy._cache_age_s = now - entry.stored_at
+        return copy
+
+    def revalidate(self, key: GraphCacheKey, revision: Optional[str]) -> Optional[Graph]:
+        """Renew an entry whose upstream revision did not move since it was stored."""
+        with self._lock:
+            if not self._renew(key, revision):
+                return None
+            entry = self._entries[key]
+        return entry.copy()
+
+    def renew(self, key: GraphCacheKey, revision: Optional[str]) -> bool:
+        """``revalidate`` without handing out a copy (background refreshes)."""
+        with self._lock:
+            return self._renew(key, revision)
+
+    def expires_at(self, key: GraphCacheKey) -> Optional[float]:
+        """``time.monotonic()`` deadline of the fresh copy of ``key`` (None when absent)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.expires_at if entry is not None else None
+
+    def revision_of(self, key: GraphCacheKey) -> Optional[str]:
+        """Upstream revision stored with ``key`` (None when absent or stored without one)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.revision if entry is not None else None
+
+    def generation(self, source: str, document: str) -> Generation:
+        """Token that changes whenever ``document`` is invalidated (or the cache cleared)."""
+        with self._lock:
+            local = self._generation(source, document)
+        epoch = self.shm.epoch(_shared_prefix(source, document)) if self.shm is not None else None
+        return Generation(local, epoch)
+
+    def put(
+        self,
+        key: GraphCacheKey,
+        graph: Graph,
+        *,
+        revision: Optional[str] = None,
+        generation: Optional[Generation] = None,
+    ) -> bool:
+        """Store ``graph`` and stamp its ETag (also on the caller's instance).
+
+        With ``generation`` (read before the datasource was queried), nothing is stored
+        when the document has been invalidated since; returns whether it was stored.
+        """
+        if not self.enabled:
+            return False
+        fingerprint = _graph_fingerprint(graph)
+        size = len(fingerprint)
+        etag = _etag_from_fingerprint(fingerprint)
+        graph._etag = etag
+        if self.max_bytes > 0 and size > self.max_bytes:
+            return False
+        if generation is not None and self.generation(key.source, key.document) != generation:
+            return False
+        body = graph.model_dump_json(by_alias=True).encode("utf-8") if self.shm or self.backend else b""
+        shared = self._map(key, body, etag=etag, revision=revision, generation=generation)
+        now = time.monotonic()
+        entry = _CacheEntry(
+            graph=None if shared is not None else graph.model_copy(deep=True),
+            etag=etag,
+            size_bytes=size,
+            expires_at=now + self.ttl_s,
+            stored_at=now,
+            revision=revision,
+            shared=shared,
+        )
+        with self._lock:
+            stored = generation is None or self._generation(key.source, key.document) == generation.local
+            if stored:
+                self._store(key, entry)
+        if not stored:
+            # invalidated while the snapshot was being written
+            if shared is not None:
+                self.shm.discard(shared)
+            return False
+        if self.backend is not None:
+            self.backend.set(_shared_key(key), self._shared_payload(entry, body), self.ttl_s)
+            with self._lock:
+                moved = generation is not None and self._generation(key.source, key.document) != generation.local
+            if moved:
+                # invalidated between the check above and the set: take the pre-save graph back
+                # (a shared key is a closed JSON array, so it is the only key with this prefix)
+                self.backend.delete_prefix(_shared_key(key))
+                return False
+        return True
+
+    def invalidate(self, source: str, document: str, *, broadcast: bool = True) -> int:
+        """Drop every entry (all tabs, sites and normalize flags) of one document.
+
+        With a shared backend, the document is also dropped there and, unless
+        ``broadcast`` is False, the other instances are told to drop their copies.
+        Shared-memory snapshots are removed, which the other workers notice on their
+        next lookup.
+        """
+        with self._lock:
+            self._generations[(source, document)] = next(self._counter)
+            stale = [key for key in self._entries if key.source == source and key.document == document]
+            for key in stale:
+                self._drop(key)
+        if self.shm is not None:
+            self.shm.remove(_shared_prefix(source, document))
+        if self.backend is not None and broadcast:
+            self.backend.delete_prefix(_shared_prefix(source, document))
+            event = {"origin": self._origin, "source": source, "document": document}
+            self.backend.publish(_INVALIDATION_CHANNEL, json.dumps(event, ensure_ascii=False))
+        return len(stale)
+
+    def listen(self, on_invalidate: Optional[Callable[[Optional[str], Optional[str]], None]] = None) -> None:
+        """Apply the invalidations broadcast by other instances (no-op without a shared backend).
+
+        ``on_invalidate(source, document)`` is called after each one; ``(None, None)``
+        means events may have been missed and every entry was dropped.
+        """
+        if self.backend is None:
+            return
+
+        def handle(message: Optional[str]) -> None:
+            source: Optional[str] = None
+            document: Optional[str] = None
+            if message is None:
+                self.clear()
+            else:
+                event = json.loads(message)
+                if event.get("origin") == self._origin:
+                    return
+                source, document = event["source"], event["document"]
+                self.invalidate(source, document, broadcast=False)
+            with self._lock:
+                self._remote_invalidations += 1
+            if on_invalidate is not None:
+                on_invalidate(source, document)
+
+        self.backend.subscribe(_INVALIDATION_CHANNEL, handle)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cleared_at = next(self._counter)
+            self._generations.clear()
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "revalidations": self._revalidations,
+                "stale_hits": self._stale_hits,
+                "stale_s": self.stale_s,
+                "backend": self.backend.name if self.backend is not None else "memory",
+                "shared_hits": self._shared_hits,
+                "remote_invalidations": self._remote_invalidations,
+                "shm_dir": self.shm.directory if self.shm is not None else None,
+            }
+
+    def _renew(self, key: GraphCacheKey, revision: Optional[str]) -> bool:
+        if not self.enabled or not revision:
+            return False
+        entry = self._current(key)
+        if entry is None or entry.revision != revision:
+            return False
+        if entry.shared is not None and not entry.shared.touch():
+            self._drop(key)
+            return False
+        entry.stored_at = time.monotonic()
+        entry.expires_at = entry.stored_at + self.ttl_s
+        self._entries.move_to_end(key)
+        self._revalidations += 1
+        return True
+
+    def _store(self, key: GraphCacheKey, entry: _CacheEntry) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        self._total_bytes += entry.size_bytes
+        self._evict()
+
+    def _generation(self, source: str, document: str) -> int:
+        return max(self._generations.get((source, document), 0), self._cleared_at)
+
+    def _current(self, key: GraphCacheKey) -> Optional[_CacheEntry]:
+        """Entry of ``key``, dropped when its snapshot was replaced or removed by another worker."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.shared is not None and not entry.shared.current():
+            self._drop(key)
+            return None
+        return entry
+
+    def _map(
+        self,
+        key: GraphCacheKey,
+        body: bytes,
+        *,
+        etag: str,
+        revision: Optional[str],
+        generation: Optional[Generation] = None,
+    ) -> Optional[SharedGraph]:
+        if self.shm is None:
+            return None
+        shared = self.shm.write(
+            _shared_prefix(key.source, key.document),
+            _shared_key(key),
+            body,
+            etag=etag,
+            revision=revision,
+            epoch=generation.shared if generation is not None else None,
+        )
+        if shared is not None:
+            self.shm.sweep(max_bytes=self.max_bytes, max_files=self.max_entries)
+        return shared
+
+    def _load_mapped(self, key: GraphCacheKey, now: float) -> Optional[_CacheEntry]:
+        if self.shm is None:
+            return None
+        shared = self.shm.open(_shared_prefix(key.source, key.document), _shared_key(key))
+        if shared is None:
+            return None
+        age = max(0.0, time.time() - shared.stored_at)
+        if age >= self.ttl_s:
+            return None
+        return _CacheEntry(
+            graph=None,
+            etag=shared.etag,
+            size_bytes=len(shared.body),
+            expires_at=now + self.ttl_s - age,
+            stored_at=now - age,
+            revision=shared.revision,
+            shared=shared,
+        )
+
+    @staticmethod
+    def _shared_payload(entry: _CacheEntry, body: bytes) -> bytes:
+        header = {"etag": entry.etag, "revision": entry.revision, "stored_at": time.time()}
+        return json.dumps(header).encode("utf-8") + b"\n" + body
+
+    def _load_shared(self, key: GraphCacheKey, now: float) -> Optional[_CacheEntry]:
+        if self.backend is None:
+            return None
+        generation = self.generation(key.source, key.document)
+        raw = self.backend.get(_shared_key(key))
+        if raw is None:
+            return None
+        header, _, body = raw.partition(b"\n")
+        try:
+            meta = json.loads(header)
+            graph = Graph.model_validate_json(body)
+        except ValueError:  # written by an incompatible version: treat as a miss
+            return None
+        age = max(0.0, time.time() - meta["stored_at"])
+        if age >= self.ttl_s:
+            return None
+        graph._etag = meta["etag"]
+        shared = self._map(key, body, etag=meta["etag"], revision=meta.get("revision"), generation=generation)
+        return _CacheEntry(
+            graph=None if shared is not None else graph,
+            etag=meta["etag"],
+            size_bytes=len(body),
+            expires_at=now + self.ttl_s - age,
+            stored_at=now - age,
+            revision=meta.get("revision"),
+            shared=shared,
+        )
+
+    def _drop(self, key: GraphCacheKey, *, discard: bool = False) -> None:
+        """Forget ``key``; ``discard`` also deletes its snapshot (evicted or expired)."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size_bytes
+            if discard and entry.shared is not None:
+                self.shm.discard(entry.shared)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes > 0 and self._total_bytes > self.max_bytes)
+        ):
+            key, _ = next(iter(self._entries.items()))
+            self._drop(key, discard=True)
+            self._evictions += 1
+
+
+graph_cache = GraphCache(
+    ttl_s=settings.graph_cache_ttl_s,
+    max_entries=settings.graph_cache_max_entries,
+    max_bytes=settings.graph_cache_max_bytes,
+    stale_s=settings.graph_cache_stale_s,
+    backend=cache_backend(),
+    shm=SharedGraphStore(settings.graph_shm_dir) if settings.graph_shm_dir else None,
+)
+
+
+__all__ = ["CachedBody", "Generation", "GraphCache", "GraphCacheKey", "compute_graph_etag", "graph_etag", "graph_cache"]
@@ -0,0 +1,125 @@
+"""Per-site graph snapshots exported from a single spreadsheet read.
+
+Refreshing every site one ``load_graph(site_id=...)`` at a time re-reads the whole
+spreadsheet once per site. ``export_site_snapshots`` reads the graph tabs once, splits
+the rows by ``idSite1``, builds and sanitises each site's graph in a process pool and
+writes one JSON snapshot per site through the ``gcs_json`` datasource
+(``gs://bucket/prefix/<site>-<hash>.json`` or ``file:///dir/<site>-<hash>.json``).
+
+Used by ``scripts/export_site_snapshots.py`` and ``POST /api/admin/snapshots``.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..config import settings
+from ..models import Graph
+from .. import sheets as sheets_mod
+from ..datasources.gcs_json import save_json
+from ..datasources.sheets import _clean_sheet_id
+from .graph_sanitizer import sanitize_graph_for_write
+from .read_snapshots import snapshot_uri
+
+_WRITE_THREADS = 8
+
+
+def _site_graph(args: Tuple[str, Dict[str, List[List[Any]]], str, str]) -> Tuple[Optional[Graph], Optional[str]]:
+    """Process-pool task: build then sanitise one site's graph from its partition.
+
+    Returns ``(graph, None)`` or ``(None, error)``; HTTPException does not survive
+    pickling, and one invalid site must not abort the others.
+    """
+    site_id, site_values, nodes_tab, edges_tab = args
+    try:
+        graph = sheets_mod.graph_from_site_values(site_values, nodes_tab, edges_tab, site_id)
+        return sanitize_graph_for_write(graph, strict=False), None
+    except HTTPException as exc:
+        return None, f"{exc.status_code}: {exc.detail}"
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def _build_graphs(
+    tasks: List[Tuple[str, Dict[str, List[List[Any]]], str, str]], workers: int
+) -> List[Tuple[Optional[Graph], Optional[str]]]:
+    if workers <= 1 or len(tasks) <= 1:
+        return [_site_graph(task) for task in tasks]
+    # spawn: the API process holds threads (uvicorn, credential refresh) that fork would copy mid-flight
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+        return list(pool.map(_site_graph, tasks))
+
+
+def _write_snapshot(graph: Graph, uri: str) -> None:
+    if uri.startswith("file://") or os.path.isabs(uri):
+        os.makedirs(os.path.dirname(uri.replace("file://", "")) or ".", exist_ok=True)
+    save_json(graph, gcs_uri=uri)
+
+
+def export_site_snapshots(
+    *,
+    dest_uri: Optional[str] = None,
+    sheet_id: Optional[str] = None,
+    nodes_tab: Optional[str] = None,
+    edges_tab: Optional[str] = None,
+    sites: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Read the spreadsheet once and write one snapshot per site; returns a summary.
+
+    ``sites`` restricts the export (case-insensitive); ``workers`` defaults to
+    ``SNAPSHOT_EXPORT_WORKERS`` or the CPU count. A site whose graph cannot be built
+    is reported with an ``error`` entry and no snapshot is written for it.
+    """
+    dest = (dest_uri or settings.snapshot_export_uri).strip()
+    if not dest:
+        raise HTTPException(status_code=400, detail="dest_uri required (or SNAPSHOT_EXPORT_URI)")
+    sid = _clean_sheet_id(sheet_id or settings.sheet_id_default)
+    if not sid:
+        raise HTTPException(status_code=400, detail="sheet_id required")
+    nodes_tab = nodes_tab or settings.sheet_nodes_tab
+    edges_tab = edges_tab or settings.sheet_edges_tab
+    pool_size = workers or settings.snapshot_export_workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    partitions = sheets_mod.read_values_by_site(sid, nodes_tab, edges_tab)
+    read_ms = (time.perf_counter() - started) * 1000.0
+    if sites is not None:
+        wanted = {str(site).strip().lower() for site in sites}
+        partitions = {site: values for site, values in partitions.items() if site.lower() in wanted}
+
+    tasks = [(site, values, nodes_tab, edges_tab) for site, values in sorted(partitions.items())]
+    started = time.perf_counter()
+    graphs = _build_graphs(tasks, pool_size)
+    build_ms = (time.perf_counter() - started) * 1000.0
+
+    results: Dict[str, Dict[str, Any]] = {}
+    writes: List[Tuple[Graph, str]] = []
+    for (site, *_), (graph, error) in zip(tasks, graphs):
+        if graph is None:
+            results[site] = {"error": error}
+            continue
+        uri = snapshot_uri(dest, site)
+        results[site] = {"uri": uri, "nodes": len(graph.nodes), "edges": len(graph.edges)}
+        writes.append((graph, uri))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(_WRITE_THREADS, max(len(writes), 1))) as pool:
+        list(pool.map(lambda item: _write_snapshot(*item), writes))
+    write_ms = (time.perf_counter() - started) * 1000.0
+
+    return {
+        "sheet_id": sid,
+        "sites": results,
+        "read_ms": round(read_ms, 1),
+        "build_ms": round(build_ms, 1),
+        "write_ms": round(write_ms, 1),
+    }
+
+
+__all__ = ["export_site_snapshots", "snapshot_uri"]
@@ -2,42 +2,28 @@
 from __future__ import annotations
 
 import io
-import time
 import urllib.request
-from dataclasses import dataclass
-from threading import Lock
-from typing import Dict, Optional, Tuple
+from typing import Optional, Tuple
 
 from fastapi import HTTPException
 
-from ..gcp_auth import get_credentials
 from ..models import PlanOverlayConfig, PlanOverlayMedia
-from PIL import Image
-import pypdfium2 as pdfium
+from .cache_backend import CacheBackend, cache_backend
+from .drive_client import get_drive_service, media_io_classes
 
-try:
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaIoBaseDownload
-except Exception:  # pragma: no cover - optional dependency, handled at runtime
-    build = None
-    MediaIoBaseDownload = None
+# Pillow, pypdfium2 and googleapiclient.http are imported on first use: the graph
+# endpoints never need them and they weigh on every cold start.
 
 
 _DEFAULT_CACHE_TTL = 300  # seconds
 _MAX_MEDIA_SIZE_BYTES = 20 * 1024 * 1024  # 20 MB safety limit
 
 
-@dataclass
-class _CacheEntry:
-    payload: bytes
-    mime_type: str
-    expires_at: float
-
-
 class PlanOverlayMediaService:
-    def __init__(self) -> None:
-        self._cache: Dict[str, _CacheEntry] = {}
-        self._lock = Lock()
+    def __init__(self, backend: Optional[CacheBackend] = None) -> None:
+        # converted media (PDF page renders, transparent PNGs) are shared with the other
+        # instances when CACHE_BACKEND is; entries are keyed by Drive id / URL and only expire
+        self._backend = backend or cache_backend()
 
     def _cache_key(self, media: PlanOverlayMedia, transparent: bool) -> str:
         suffix = ':transparent' if transparent else ':raw'
@@ -57,12 +43,9 @@ class PlanOverlayMediaService:
         return _DEFAULT_CACHE_TTL
 
     def _download_drive(self, file_id: str, *, transparent: bool) -> Tuple[bytes, str]:
-        if not build or not MediaIoBaseDownload:
-            raise HTTPException(status_code=500, detail="drive_client_unavailable")
+        MediaIoBaseDownload, _ = media_io_classes()
         try:
-            scopes = ["https://www.googleapis.com/auth/drive.readonly"]
-            creds = get_credentials(scopes)
-            service = build("drive", "v3", credentials=creds, cache_discovery=False)
+            service = get_drive_service(writable=False)
             metadata = service.files().get(
                 fileId=file_id,
                 fields="mimeType, size",
@@ -125,12 +108,12 @@ class PlanOverlayMediaService:
     def fetch_media(self, media: PlanOverlayMedia, *, transparent: bool) -> Tuple[bytes, str, int]:
         key = self._cache_key(media, transparent)
         ttl = self._compute_ttl(media)
-        now = time.time()
-        if key != "unknown":
-            with self._lock:
-                entry = self._cache.get(key)
-                if entry and entry.expires_at > now:
-                    return entry.payload, entry.mime_type, ttl
+        cacheable = not key.startswith("unknown")
+        if cacheable:
+            cached = self._backend.get(f"plan-media:{key}")
+            if cached is not None:
+                mime_type, _, payload = cached.partition(b"\n")
+                return payload, mime_type.decode("utf-8"), ttl
 
         preferred_id = None
         apply_transparency = transparent
@@ -149,9 +132,8 @@ class PlanOverlayMediaService:
         else:
             raise HTTPException(status_code=404, detail="plan_overlay_media_missing")
 
-        if key != "unknown":
-            with self._lock:
-                self._cache[key] = _CacheEntry(payload=payload, mime_type=mime_type, expires_at=now + ttl)
+        if cacheable:
+            self._backend.set(f"plan-media:{key}", mime_type.encode("utf-8") + b"\n" + payload, ttl)
         return payload, mime_type, ttl
 
 
@@ -169,6 +151,8 @@ def ensure_plan_media(config: Optional[PlanOverlayConfig]) -> PlanOverlayConfig:
 
 
 def _pdf_first_page_to_png(data: bytes, *, transparent: bool) -> bytes:
+    import pypdfium2 as pdfium
+
     if not data:
         raise ValueError("empty pdf payload")
     doc = pdfium.PdfDocument(io.BytesIO(data))
@@ -186,6 +170,8 @@ def _pdf_first_page_to_png(data: bytes, *, transparent: bool) -> bytes:
 
 
 def _transparentize_image(data: bytes, mime_type: str, *, threshold: int = 250) -> Tuple[bytes, str]:
+    from PIL import Image
+
     img = Image.open(io.BytesIO(data))
     img = img.convert('RGBA')
     pixels = img.getdata()
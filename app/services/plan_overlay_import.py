@@ -11,18 +11,11 @@ from typing import List, Optional
 
 from fastapi import HTTPException
 
-from .drive_client import get_drive_service
+from .drive_client import get_drive_service, media_io_classes
+from .google_clients import http_error_class
 from .plan_overlay import _pdf_first_page_to_png, _transparentize_image
 from ..models import DriveFileItem
 
-try:  # pragma: no cover - optional dependency loaded at runtime
-    from googleapiclient.errors import HttpError
-    from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
-except Exception:  # pragma: no cover - handled at runtime with HTTP errors
-    HttpError = None
-    MediaIoBaseDownload = None
-    MediaIoBaseUpload = None
-
 
 _ALLOWED_MEDIA_MIME_TYPES = {"application/pdf", "image/png"}
 _FOLDER_MIME = "application/vnd.google-apps.folder"
@@ -97,6 +90,7 @@ def _store_png_variants(
 
 
 def _upload_binary_file(service, parent_id: str, name: str, payload: bytes, mime_type: str) -> str:
+    _, MediaIoBaseUpload = media_io_classes()
     media = MediaIoBaseUpload(io.BytesIO(payload), mimetype=mime_type, resumable=False)
     body = {
         "name": name,
@@ -109,7 +103,7 @@ def _upload_binary_file(service, parent_id: str, name: str, payload: bytes, mime
             .create(body=body, media_body=media, fields="id", supportsAllDrives=True)
             .execute()
         )
-    except HttpError as exc:  # pragma: no cover - network error path
+    except http_error_class() as exc:  # pragma: no cover - network error path
         _wrap_drive_error('drive_upload', exc)
         raise
     return created.get("id")
@@ -123,8 +117,7 @@ def list_drive_media_files(
     drive_id: Optional[str] = None,
     parent_id: Optional[str] = None,
 ) -> DriveFilesPage:
-    if not MediaIoBaseDownload:
-        raise HTTPException(status_code=500, detail="drive_client_unavailable")
+    media_io_classes()
 
     service = get_drive_service(writable=False)
     name_filter = query or ""
@@ -161,7 +154,7 @@ def list_drive_media_files(
 
     try:
         resp = service.files().list(**list_kwargs).execute()
-    except HttpError as exc:  # pragma: no cover - network error path
+    except http_error_class() as exc:  # pragma: no cover - network error path
         _wrap_drive_error('drive_list', exc)
 
     raw_files = resp.get("files", [])
@@ -176,8 +169,7 @@ def store_plan_media_from_drive(
     drive_file_id: str,
     display_name: Optional[str] = None,
 ) -> StoredPlanMedia:
-    if not MediaIoBaseDownload or not MediaIoBaseUpload:
-        raise HTTPException(status_code=500, detail="drive_client_unavailable")
+    media_io_classes()
     if not site_id:
         raise HTTPException(status_code=400, detail="site_id required for plan import")
 
@@ -228,8 +220,7 @@ def store_plan_media_from_upload(
     content_type: Optional[str] = None,
     display_name: Optional[str] = None,
 ) -> StoredPlanMedia:
-    if not MediaIoBaseUpload:
-        raise HTTPException(status_code=500, detail="drive_client_unavailable")
+    media_io_classes()
     if not site_id:
         raise HTTPException(status_code=400, detail="site_id required for plan import")
     if not content:
@@ -275,6 +266,7 @@ def store_plan_media_from_upload(
 
 
 def _download_drive_file(service, file_id: str) -> bytes:
+    MediaIoBaseDownload, _ = media_io_classes()
     try:
         request = service.files().get_media(fileId=file_id, supportsAllDrives=True)
         fh = io.BytesIO()
@@ -283,12 +275,13 @@ def _download_drive_file(service, file_id: str) -> bytes:
         while not done:
             _, done = downloader.next_chunk()
         return fh.getvalue()
-    except HttpError as exc:  # pragma: no cover - network error path
+    except http_error_class() as exc:  # pragma: no cover - network error path
         _wrap_drive_error('drive_download', exc)
         raise  # unreachable
 
 
 def _upload_png(service, parent_id: str, name: str, payload: bytes) -> str:
+    _, MediaIoBaseUpload = media_io_classes()
     media = MediaIoBaseUpload(io.BytesIO(payload), mimetype="image/png", resumable=False)
     body = {
         "name": name,
@@ -301,7 +294,7 @@ def _upload_png(service, parent_id: str, name: str, payload: bytes) -> str:
             .create(body=body, media_body=media, fields="id", supportsAllDrives=True)
             .execute()
         )
-    except HttpError as exc:  # pragma: no cover - network error path
+    except http_error_class() as exc:  # pragma: no cover - network error path
         _wrap_drive_error('drive_upload_png', exc)
         raise
     return created.get("id")
@@ -324,7 +317,7 @@ def _ensure_child_folder(service, parent_id: str, name: str) -> str:
     }
     try:
         existing = service.files().list(**list_kwargs).execute()
-    except HttpError as exc:  # pragma: no cover - network error path
+    except http_error_class() as exc:  # pragma: no cover - network error path
         _wrap_drive_error('drive_folder_lookup', exc)
         raise
     files = existing.get("files", [])
@@ -342,7 +335,7 @@ def _ensure_child_folder(service, parent_id: str, name: str) -> str:
             .create(body=metadata, fields="id", supportsAllDrives=True)
             .execute()
         )
-    except HttpError as exc:  # pragma: no cover - network error path
+    except http_error_class() as exc:  # pragma: no cover - network error path
         _wrap_drive_error('drive_folder_create', exc)
         raise
     return created.get("id")
@@ -355,7 +348,7 @@ def _get_file_metadata(service, file_id: str, *, fields: str) -> dict:
             .get(fileId=file_id, fields=fields, supportsAllDrives=True)
             .execute()
         )
-    except HttpError as exc:  # pragma: no cover - network error path
+    except http_error_class() as exc:  # pragma: no cover - network error path
         _wrap_drive_error('drive_metadata', exc)
         raise
 
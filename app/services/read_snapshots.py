@@ -0,0 +1,270 @@
+"""Pre-serialised graph snapshots for read-only views.
+
+With ``READ_SNAPSHOTS`` on, every successful Sheets ``save_graph`` re-reads the saved
+graph and publishes it as the exact JSON body ``GET /api/graph`` returns
+(gzip-compressed with ``READ_SNAPSHOT_GZIP``) to
+``<READ_SNAPSHOT_URI>/<sheet_id>/<site>-<hash>.json[.gz]``, or ``<sheet_id>.json[.gz]``
+without a site. Any write to the sheet (graph saves, plan overlay changes) first
+withdraws every snapshot of that sheet, per-site ones included (one listing and one
+batch delete on GCS).
+``GET /api/graph?mode=ro`` then answers with those bytes as they are; a miss is
+answered from Sheets (or the graph cache) and republishes the snapshot in the
+background, so the other sites of a sheet are read once after each write. Loaded snapshots (and misses) are kept in
+memory for ``GRAPH_CACHE_TTL_S`` seconds so other instances pick up a new
+publication within that delay.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from ..config import settings
+from ..gcp_auth import get_credentials
+from ..models import Graph
+from . import google_async
+
+_GZIP_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class ReadSnapshot:
+    body: bytes
+    gzip_body: Optional[bytes]
+    etag: str
+
+
+_memo: Dict[str, Tuple[float, Optional[ReadSnapshot]]] = {}
+_memo_lock = Lock()
+
+
+def snapshot_uri(dest_uri: str, site_id: str) -> str:
+    """``<dest_uri>/<site>-<hash>.json``: the site id reduced to a safe object/file name,
+    plus a short hash of the raw id so that ids reduced alike ("A/B", "A B") stay apart."""
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", site_id).strip("._") or "site"
+    digest = hashlib.sha256(site_id.encode("utf-8")).hexdigest()[:8]
+    return f"{dest_uri.rstrip('/')}/{name}-{digest}.json"
+
+
+def enabled() -> bool:
+    return settings.read_snapshots and bool(settings.read_snapshot_uri.strip())
+
+
+def snapshot_location(sheet_id: str, site_id: Optional[str]) -> str:
+    prefix = settings.read_snapshot_uri.strip().rstrip("/")
+    uri = snapshot_uri(f"{prefix}/{sheet_id}", site_id) if site_id else f"{prefix}/{sheet_id}.json"
+    return f"{uri}.gz" if settings.read_snapshot_gzip else uri
+
+
+def _is_local(uri: str) -> bool:
+    return uri.startswith("file://") or os.path.isabs(uri)
+
+
+def _split_gs(uri: str) -> Tuple[str, str]:
+    bucket, _, path = uri[len("gs://"):].partition("/")
+    return bucket, path
+
+
+def _snapshot(stored: bytes, compressed: bool) -> ReadSnapshot:
+    body = gzip.decompress(stored) if compressed else stored
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return ReadSnapshot(body=body, gzip_body=stored if compressed else None, etag=etag)
+
+
+def serialize(graph: Graph) -> bytes:
+    """JSON body of ``GET /api/graph`` for ``graph`` (``response_model=Graph``)."""
+    return graph.model_dump_json(by_alias=True).encode("utf-8")
+
+
+def _remember(uri: str, snapshot: Optional[ReadSnapshot]) -> Optional[ReadSnapshot]:
+    ttl = settings.graph_cache_ttl_s
+    with _memo_lock:
+        if ttl > 0:
+            _memo[uri] = (time.monotonic() + ttl, snapshot)
+        else:
+            _memo.pop(uri, None)
+    return snapshot
+
+
+def _remembered(uri: str) -> Tuple[bool, Optional[ReadSnapshot]]:
+    with _memo_lock:
+        entry = _memo.get(uri)
+    if entry is None or entry[0] <= time.monotonic():
+        return False, None
+    return True, entry[1]
+
+
+def reset() -> None:
+    with _memo_lock:
+        _memo.clear()
+
+
+def _sheet_prefix(sheet_id: str) -> str:
+    return f"{settings.read_snapshot_uri.strip().rstrip('/')}/{sheet_id}"
+
+
+def forget(sheet_id: Optional[str]) -> None:
+    """Drop the remembered snapshots of one sheet (every sheet with None)."""
+    if sheet_id is None:
+        reset()
+        return
+    sheet_uri = snapshot_location(sheet_id, None)
+    folder = f"{_sheet_prefix(sheet_id)}/"
+    with _memo_lock:
+        for uri in [uri for uri in _memo if uri == sheet_uri or uri.startswith(folder)]:
+            del _memo[uri]
+
+
+def publish(graph: Graph, *, sheet_id: str, site_id: Optional[str]) -> None:
+    """Serialise ``graph`` once and store it where read-only GETs will find it."""
+    uri = snapshot_location(sheet_id, site_id)
+    body = serialize(graph)
+    compressed = uri.endswith(".gz")
+    stored = gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0) if compressed else body
+    if _is_local(uri):
+        path = uri.replace("file://", "")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as handle:
+            handle.write(stored)
+        # readers never see a half-written snapshot
+        os.replace(tmp, path)
+    else:
+        from google.cloud import storage
+
+        creds = get_credentials(["https://www.googleapis.com/auth/devstorage.read_write"])
+        client = storage.Client(project=settings.gcp_project_id or None, credentials=creds)
+        bucket_name, blob_path = _split_gs(uri)
+        # no Content-Encoding on the object: GCS would otherwise transcode it on download
+        content_type = "application/gzip" if compressed else "application/json; charset=utf-8"
+        client.bucket(bucket_name).blob(blob_path).upload_from_string(stored, content_type=content_type)
+    _remember(uri, _snapshot(stored, compressed))
+
+
+def withdraw(*, sheet_id: str, site_id: Optional[str]) -> None:
+    """Delete a snapshot that no longer matches the sheet (best effort)."""
+    uri = snapshot_location(sheet_id, site_id)
+    _remember(uri, None)
+    try:
+        if _is_local(uri):
+            os.remove(uri.replace("file://", ""))
+            return
+        from google.cloud import storage
+
+        creds = get_credentials(["https://www.googleapis.com/auth/devstorage.read_write"])
+        client = storage.Client(project=settings.gcp_project_id or None, credentials=creds)
+        bucket_name, blob_path = _split_gs(uri)
+        client.bucket(bucket_name).blob(blob_path).delete()
+    except Exception:  # pragma: no cover - missing object or storage unavailable
+        pass
+
+
+def withdraw_sheet(sheet_id: str) -> None:
+    """Delete every snapshot of ``sheet_id``, with and without a site (best effort)."""
+    forget(sheet_id)
+    sheet_uri = snapshot_location(sheet_id, None)
+    folder = _sheet_prefix(sheet_id)
+    try:
+        if _is_local(sheet_uri):
+            try:
+                os.remove(sheet_uri.replace("file://", ""))
+            except FileNotFoundError:
+                pass
+            shutil.rmtree(folder.replace("file://", ""), ignore_errors=True)
+            return
+        from google.cloud import storage
+
+        creds = get_credentials(["https://www.googleapis.com/auth/devstorage.read_write"])
+        client = storage.Client(project=settings.gcp_project_id or None, credentials=creds)
+        bucket_name, blob_path = _split_gs(sheet_uri)
+        folder_path = f"{_split_gs(folder)[1]}/"
+        # one listing covers both layouts; other sheets sharing the id prefix are skipped
+        blobs = [
+            blob
+            for blob in client.list_blobs(bucket_name, prefix=_split_gs(folder)[1])
+            if blob.name == blob_path or blob.name.startswith(folder_path)
+        ]
+        if blobs:
+            # a single batch request, whatever the number of sites
+            with client.batch():
+                for blob in blobs:
+                    blob.delete()
+    except Exception:  # pragma: no cover - storage unavailable, or deleted concurrently
+        pass
+
+
+def load(*, sheet_id: str, site_id: Optional[str]) -> Optional[ReadSnapshot]:
+    """Published snapshot for this sheet/site, or None (read failures count as a miss)."""
+    uri = snapshot_location(sheet_id, site_id)
+    known, snapshot = _remembered(uri)
+    if known:
+        return snapshot
+    compressed = uri.endswith(".gz")
+    if _is_local(uri):
+        try:
+            with open(uri.replace("file://", ""), "rb") as handle:
+                stored = handle.read()
+        except FileNotFoundError:
+            return _remember(uri, None)
+        except OSError:  # pragma: no cover - IO errors
+            return None
+        return _remember(uri, _snapshot(stored, compressed))
+    try:
+        from google.api_core.exceptions import NotFound
+        from google.cloud import storage
+
+        creds = get_credentials(["https://www.googleapis.com/auth/devstorage.read_only"])
+        client = storage.Client(project=settings.gcp_project_id or None, credentials=creds)
+        bucket_name, blob_path = _split_gs(uri)
+        try:
+            stored = client.bucket(bucket_name).blob(blob_path).download_as_bytes()
+        except NotFound:
+            return _remember(uri, None)
+    except Exception:  # pragma: no cover - requires GCS
+        return None
+    return _remember(uri, _snapshot(stored, compressed))
+
+
+async def load_async(*, sheet_id: str, site_id: Optional[str]) -> Optional[ReadSnapshot]:
+    """Async ``load``: GCS objects are downloaded with the JSON API (``alt=media``)."""
+    uri = snapshot_location(sheet_id, site_id)
+    known, snapshot = _remembered(uri)
+    if known:
+        return snapshot
+    if _is_local(uri):
+        return await asyncio.to_thread(load, sheet_id=sheet_id, site_id=site_id)
+    bucket_name, blob_path = _split_gs(uri)
+    try:
+        stored = await google_async.get_bytes(
+            google_async.STORAGE_ROOT,
+            f"b/{google_async.quote(bucket_name)}/o/{google_async.quote(blob_path)}",
+            scopes=["https://www.googleapis.com/auth/devstorage.read_only"],
+            params=[("alt", "media")],
+        )
+    except google_async.GoogleAPIError as exc:
+        return _remember(uri, None) if exc.status_code == 404 else None
+    except Exception:  # pragma: no cover - requires GCS
+        return None
+    return _remember(uri, _snapshot(stored, uri.endswith(".gz")))
+
+
+__all__ = [
+    "ReadSnapshot",
+    "enabled",
+    "forget",
+    "load",
+    "load_async",
+    "publish",
+    "reset",
+    "serialize",
+    "snapshot_uri",
+    "withdraw",
+    "withdraw_sheet",
+]
@@ -0,0 +1,190 @@
+"""Background refresh of hot Sheets graphs before their cache entry expires.
+
+``load_graph`` records every Sheets access here. The scores decay with a half-life,
+so popularity tracks recent traffic. A daemon thread wakes every ``_TICK_S`` seconds
+and picks the tracked keys that are still warm and whose cache entry expires within
+the last quarter of ``GRAPH_CACHE_TTL_S``, hottest first. It renews each one through
+``refresh_sheet_graph``: with ``SHEETS_REVISION_CHECK``, the Drive revision is checked
+and the tabs are only re-read when it moved; without it, the tabs are re-read.
+
+Upstream calls are drawn from a token bucket of ``REFRESH_BUDGET_PER_MIN`` calls per
+minute. A refresh starts when the bucket holds ``_CALLS_PER_REFRESH`` tokens and is then
+charged the requests it actually sent (see ``google_clients.counted_calls``): a renewal
+costs one, a re-read three to five (revision, tab properties, header probe, batchGet,
+plus a listing and a retry when a tab is missing), joining a load already running for
+the key nothing. A costlier refresh leaves the bucket in debt, so later keys wait for
+the refill and background work never takes more than its share of the Sheets/Drive
+quota from interactive requests.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from ..config import settings
+from .google_clients import counted_calls
+from .graph_cache import GraphCache, GraphCacheKey, graph_cache
+
+_TICK_S = 2.0
+_HALF_LIFE_S = 300.0
+# below this decayed score a key is not hot: a single access decays under it at once
+_MIN_SCORE = 1.0
+_LEAD_FRACTION = 0.25
+_MAX_TRACKED = 256
+# tokens needed to start a refresh; what it really sent is charged afterwards
+_CALLS_PER_REFRESH = 2
+
+
+class Refresh(NamedTuple):
+    """Outcome of one refresh: ``renewed`` (revision unchanged), ``reread`` or ``joined``
+    (a load already running for the key re-read it), and the upstream calls it made."""
+
+    kind: str
+    calls: int
+
+
+Refresher = Callable[..., Refresh]
+
+
+@dataclass
+class _Access:
+    score: float
+    last_seen: float
+    params: Dict[str, Any]
+
+
+class RefreshScheduler:
+    def __init__(
+        self,
+        *,
+        budget_per_min: int,
+        cache: GraphCache,
+        refresher: Optional[Refresher] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budget_per_min = budget_per_min
+        self._cache = cache
+        self._refresher = refresher
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._access: Dict[GraphCacheKey, _Access] = {}
+        self._tokens = float(budget_per_min)
+        self._refilled_at = clock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"refreshes": 0, "renewed": 0, "reread": 0, "joined": 0, "failed": 0, "deferred": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_per_min > 0 and self._cache.enabled
+
+    def record(self, key: GraphCacheKey, params: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        now = self._clock()
+        with self._lock:
+            access = self._access.get(key)
+            if access is None:
+                if len(self._access) >= _MAX_TRACKED:
+                    coldest = min(self._access, key=lambda k: self._decayed(self._access[k], now))
+                    del self._access[coldest]
+                self._access[key] = _Access(score=1.0, last_seen=now, params=params)
+                return
+            access.score = self._decayed(access, now) + 1.0
+            access.last_seen = now
+
+    def due(self) -> List[GraphCacheKey]:
+        """Warm keys expiring within the lead window, hottest first."""
+        now = self._clock()
+        lead = self._cache.ttl_s * _LEAD_FRACTION
+        with self._lock:
+            scored = [(self._decayed(access, now), key) for key, access in self._access.items()]
+            for score, key in scored:
+                if score < _MIN_SCORE:
+                    del self._access[key]
+        hot = []
+        for score, key in sorted(scored, key=lambda item: item[0], reverse=True):
+            if score < _MIN_SCORE:
+                continue
+            expires_at = self._cache.expires_at(key)
+            if expires_at is not None and expires_at - now <= lead:
+                hot.append(key)
+        return hot
+
+    def run_once(self) -> int:
+        """Refresh the due keys the budget allows; returns the number refreshed."""
+        refreshed = 0
+        for key in self.due():
+            with self._lock:
+                self._refill()
+                if self._tokens < _CALLS_PER_REFRESH:
+                    self._stats["deferred"] += 1
+                    continue
+                params = self._access[key].params if key in self._access else None
+            if params is None:
+                continue
+            with counted_calls() as sent:
+                try:
+                    kind, calls = self._refresh(params)
+                except Exception:  # the key expires normally and the next reader re-reads it
+                    kind, calls = "failed", max(sent(), 1)
+            with self._lock:
+                if kind != "failed":
+                    refreshed += 1
+                    self._stats["refreshes"] += 1
+                self._stats[kind] += 1
+                self._tokens -= calls
+        return refreshed
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="graph-refresh-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill()
+            return {
+                **self._stats,
+                "enabled": self.enabled,
+                "tracked": len(self._access),
+                "tokens": round(self._tokens, 1),
+                "budget_per_min": self.budget_per_min,
+            }
+
+    def _loop(self) -> None:
+        while not self._stop.wait(_TICK_S):
+            self.run_once()
+
+    def _refresh(self, params: Dict[str, Any]) -> Refresh:
+        refresher = self._refresher
+        if refresher is None:
+            from ..datasources import refresh_sheet_graph
+
+            refresher = refresh_sheet_graph
+        return refresher(**params)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed, self._refilled_at = now - self._refilled_at, now
+        self._tokens = min(float(self.budget_per_min), self._tokens + elapsed * self.budget_per_min / 60.0)
+
+    @staticmethod
+    def _decayed(access: _Access, now: float) -> float:
+        return access.score * 0.5 ** ((now - access.last_seen) / _HALF_LIFE_S)
+
+
+refresh_scheduler = RefreshScheduler(budget_per_min=settings.refresh_budget_per_min, cache=graph_cache)
+
+
+__all__ = ["Refresh", "RefreshScheduler", "refresh_scheduler"]
@@ -0,0 +1,254 @@
+"""Cached graphs shared by the workers of one host through memory-mapped files.
+
+With several uvicorn/gunicorn workers, each one would otherwise parse and hold its own
+copy of every cached graph. With ``GRAPH_SHM_DIR`` (a tmpfs such as ``/dev/shm``), the
+graph cache writes each sanitized graph once, as its served JSON, to
+``<dir>/<document hash>/<key hash>.graph`` and keeps only a read-only mapping of that
+file: the pages are shared by every worker, so memory stays flat as workers are added,
+and a graph loaded by one worker is a hit for all the others. ``GET /api/graph`` serves
+``body`` as it is and answers revalidations from ``etag``; ``load`` parses the mapped JSON
+only for callers that need a Graph, which still costs less than the deep copy handed out
+by an in-process entry.
+
+Files are written to a temporary name and renamed, so a mapping never sees a partial
+write. A file's inode and mtime identify the version a mapping was made from:
+``SharedGraph.current`` tells a worker that the file was replaced or removed (another
+worker stored a newer graph or invalidated the document). The mtime is the store time,
+and renewing an unchanged graph only touches the file.
+
+Each document folder holds an ``epoch`` file that ``remove`` replaces before deleting
+the snapshots. A worker reads the epoch before querying the datasource and ``write``
+drops the snapshot when it moved, so a graph read before a save made in another worker
+is never published after that save. ``sweep`` keeps the directory (charged to the
+container's memory on tmpfs) within the cache budgets, oldest store first.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models import Graph
+
+_MAGIC = b"ERG1"
+_HEADER = struct.Struct("<4sI")  # magic, length of the JSON metadata that follows
+_EPOCH = "epoch"
+
+Stamp = Tuple[int, int]
+
+
+def _stamp(stat: os.stat_result) -> Stamp:
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class SharedGraph:
+    """Read-only mapping of one snapshot file."""
+
+    __slots__ = ("path", "stamp", "meta", "body", "_map")
+
+    def __init__(self, path: str, fd: int) -> None:
+        self.path = path
+        self.stamp = _stamp(os.fstat(fd))
+        self._map = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        magic, meta_len = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            raise ValueError(f"not a graph snapshot: {path}")
+        start = _HEADER.size + meta_len
+        self.meta: Dict[str, Any] = json.loads(self._map[_HEADER.size:start])
+        self.body = memoryview(self._map)[start:]
+
+    @property
+    def etag(self) -> str:
+        return self.meta["etag"]
+
+    @property
+    def revision(self) -> Optional[str]:
+        return self.meta.get("revision")
+
+    @property
+    def stored_at(self) -> float:
+        """Wall-clock store (or last renewal) time."""
+        return self.stamp[1] / 1e9
+
+    def current(self) -> bool:
+        try:
+            return _stamp(os.stat(self.path)) == self.stamp
+        except OSError:
+            return False
+
+    def touch(self) -> bool:
+        """Mark the snapshot as stored now (renewal); False when the file was replaced."""
+        if not self.current():
+            return False
+        try:
+            os.utime(self.path)
+            self.stamp = _stamp(os.stat(self.path))
+        except OSError:
+            return False
+        return True
+
+    def load(self) -> Graph:
+        """Parsed copy of ``body``; serving or revalidating the graph does not need one."""
+        # pydantic only parses bytes: this copy is transient, the mapping stays shared
+        graph = Graph.model_validate_json(bytes(self.body))
+        graph._etag = self.etag
+        return graph
+
+
+class SharedGraphStore:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def epoch(self, document: str) -> str:
+        """Token replaced by every ``remove`` of ``document`` ("" until the first one)."""
+        try:
+            with open(os.path.join(self._folder(document), _EPOCH), encoding="utf-8") as fh:
+                return fh.read()
+        except OSError:
+            return ""
+
+    def write(
+        self,
+        document: str,
+        key: str,
+        body: bytes,
+        *,
+        etag: str,
+        revision: Optional[str],
+        epoch: Optional[str] = None,
+    ) -> Optional[SharedGraph]:
+        """Store ``body`` (the graph JSON) for ``key`` and map it; None when the write failed.
+
+        With ``epoch`` (read before the datasource was queried), nothing is stored when
+        the document was removed since, by this worker or another one.
+        """
+        if epoch is None:
+            epoch = self.epoch(document)
+        elif self.epoch(document) != epoch:
+            return None
+        meta = json.dumps({"key": key, "etag": etag, "revision": revision}).encode("utf-8")
+        folder = self._folder(document)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        except OSError:
+            return None
+        try:
+            with os.fdopen(fd, "wb", closefd=False) as fh:
+                fh.write(_HEADER.pack(_MAGIC, len(meta)) + meta)
+                fh.write(body)
+            shared = SharedGraph(self._path(document, key), fd)
+            os.replace(tmp, shared.path)
+        except (OSError, ValueError):
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return None
+        finally:
+            os.close(fd)
+        # ``remove`` replaces the epoch before deleting: either it deletes this file or
+        # the new epoch is seen here
+        if self.epoch(document) != epoch:
+            self.discard(shared)
+            return None
+        return shared
+
+    def open(self, document: str, key: str) -> Optional[SharedGraph]:
+        """Map the snapshot of ``key`` written by any worker (None when absent or unreadable)."""
+        path = self._path(document, key)
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            shared = SharedGraph(path, fd)
+        except (OSError, ValueError, struct.error):
+            return None
+        finally:
+            os.close(fd)
+        return shared if shared.meta.get("key") == key else None
+
+    def remove(self, document: str) -> int:
+        """Delete the snapshots of every key of ``document`` (mapped copies stay readable)."""
+        folder = self._folder(document)
+        try:
+            # also when nothing is stored yet: a worker may be reading the document
+            os.makedirs(folder, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        except OSError:
+            return 0
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(uuid.uuid4().hex)
+            os.replace(tmp, os.path.join(folder, _EPOCH))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+        count = 0
+        for path in self._snapshots(folder):
+            try:
+                os.unlink(path)
+                count += 1
+            except OSError:
+                pass
+        return count
+
+    def sweep(self, *, max_bytes: int, max_files: int) -> int:
+        """Delete the least recently stored snapshots beyond the budgets (0: unbounded)."""
+        files: List[Tuple[int, int, str]] = []
+        try:
+            folders = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in folders:
+            for path in self._snapshots(os.path.join(self.directory, name)):
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime_ns, stat.st_size, path))
+        files.sort(reverse=True)
+        removed = kept = kept_bytes = 0
+        for _, size, path in files:
+            if (max_files <= 0 or kept < max_files) and (max_bytes <= 0 or kept_bytes + size <= max_bytes):
+                kept += 1
+                kept_bytes += size
+                continue
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def discard(self, shared: SharedGraph) -> None:
+        """Delete the file ``shared`` was mapped from, unless it was replaced since."""
+        if shared.current():
+            try:
+                os.unlink(shared.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _snapshots(folder: str) -> List[str]:
+        try:
+            return [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".graph")]
+        except OSError:
+            return []
+
+    def _folder(self, document: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(document.encode("utf-8")).hexdigest()[:24])
+
+    def _path(self, document: str, key: str) -> str:
+        return os.path.join(self._folder(document), hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + ".graph")
+
+
+__all__ = ["SharedGraph", "SharedGraphStore"]
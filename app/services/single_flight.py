@@ -0,0 +1,108 @@
+"""Single-flight deduplication of identical concurrent loads.
+
+Callers asking for the same key while a load is in flight wait for that load and
+share its result (or its exception) instead of starting their own upstream read.
+Thread callers use ``do``; coroutines use ``do_async``, where the load runs in a task
+shielded from the cancellation of any single caller (a disconnecting client must not
+abort the read the others are waiting for).
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self, *, share: Optional[Callable[[T], T]] = None) -> None:
+        # waiters receive share(result): lets mutable results be copied per caller
+        self._share = share or (lambda value: value)
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, Tuple[asyncio.AbstractEventLoop, "asyncio.Task[T]"]] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return self._share(call.result)
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            running = self._tasks.get(key)
+            if running is not None and running[0] is loop:
+                self._coalesced += 1
+                task, leader = running[1], False
+            else:
+                task = loop.create_task(fn())
+                self._tasks[key] = (loop, task)
+                self._leaders += 1
+                leader = True
+                task.add_done_callback(lambda done: self._release(key, done))
+        result = await asyncio.shield(task)
+        return result if leader else self._share(result)
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls or key in self._tasks
+
+    def forget(self, predicate: Callable[[Any], bool]) -> None:
+        """Let the next callers of matching keys start a fresh load (current waiters are unaffected)."""
+        with self._lock:
+            for key in [key for key in self._calls if predicate(key)]:
+                del self._calls[key]
+            for key in [key for key in self._tasks if predicate(key)]:
+                del self._tasks[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._tasks),
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+            }
+
+    def _release(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        with self._lock:
+            running = self._tasks.get(key)
+            if running is not None and running[1] is task:
+                del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved: every caller has seen it, no "never retrieved" warning
+
+
+__all__ = ["SingleFlight"]
@@ -0,0 +1,140 @@
+"""Graph cache warmup run when the application starts.
+
+After a scale-from-zero start, the first viewer would otherwise pay for the Sheets
+read, the parsing and the layout probe. The app lifespan starts ``cache_warmup``
+in the background. It loads every target from the configured ``DATA_SOURCE``
+through ``load_graph`` (which fills the graph and layout caches), and ``/readyz``
+reports ready once it is done. Nothing is warmed while the graph cache is disabled:
+the loaded graphs would not be kept. Failures are recorded but do not hold readiness back: the instance then serves
+cold, as it would without warmup. ``WARMUP_TIMEOUT_S`` bounds the wait.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..config import settings
+from .graph_cache import graph_cache
+
+_WARMUP_THREADS = 4
+
+Target = Tuple[str, Optional[str]]
+
+
+def _source() -> str:
+    return (settings.data_source_default or "sheet").lower()
+
+
+def warmup_targets() -> List[Target]:
+    """``(sheet_id, site_id)`` pairs from ``WARMUP_SITES`` (``sheet:site`` or ``sheet``, comma/space separated).
+
+    Defaults to ``SHEET_ID_DEFAULT`` with ``SITE_ID_FILTER_DEFAULT``; ``none`` disables warmup,
+    and so does a disabled graph cache. A GCS or BigQuery ``DATA_SOURCE`` has a single
+    configured graph: one ``("", None)`` target.
+    """
+    from ..datasources import _SHEET_KINDS
+
+    raw = settings.warmup_sites.strip()
+    if raw.lower() == "none" or not graph_cache.enabled:
+        return []
+    if _source() not in _SHEET_KINDS:
+        return [("", None)]
+    if not raw:
+        if not settings.sheet_id_default:
+            return []
+        return [(settings.sheet_id_default, settings.site_id_filter_default or None)]
+    targets: List[Target] = []
+    for item in re.split(r"[,\s]+", raw):
+        sheet_id, _, site_id = item.partition(":")
+        if sheet_id and (sheet_id, site_id or None) not in targets:
+            targets.append((sheet_id, site_id or None))
+    return targets
+
+
+class CacheWarmup:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._targets: List[Target] = []
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> None:
+        """Warm the configured targets in a daemon thread (no-op once started)."""
+        with self._lock:
+            if self._started_at is not None:
+                return
+            self._targets = warmup_targets()
+            self._started_at = time.monotonic()
+            if not self._targets:
+                self._finished_at = self._started_at
+                return
+            self._thread = threading.Thread(target=self._run, name="graph-warmup", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.finished
+
+    @property
+    def finished(self) -> bool:
+        return self._finished_at is not None
+
+    def ready(self) -> bool:
+        """Ready once warmup finished (whatever its outcome) or ``WARMUP_TIMEOUT_S`` elapsed."""
+        if self._started_at is None:
+            return True
+        if self.finished:
+            return True
+        timeout = settings.warmup_timeout_s
+        return timeout > 0 and time.monotonic() - self._started_at >= timeout
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            results = dict(self._results)
+        elapsed = None
+        if self._started_at is not None:
+            elapsed = (self._finished_at or time.monotonic()) - self._started_at
+        return {
+            "ready": self.ready(),
+            "finished": self.finished,
+            "targets": len(self._targets),
+            "elapsed_ms": round(elapsed * 1000.0, 1) if elapsed is not None else None,
+            "results": results,
+        }
+
+    def _run(self) -> None:
+        with ThreadPoolExecutor(max_workers=min(_WARMUP_THREADS, len(self._targets))) as pool:
+            list(pool.map(self._warm, self._targets))
+        self._finished_at = time.monotonic()
+
+    def _warm(self, target: Target) -> None:
+        from ..datasources import load_graph
+
+        sheet_id, site_id = target
+        label = f"{sheet_id}:{site_id}" if site_id else sheet_id or _source()
+        started = time.perf_counter()
+        try:
+            graph = load_graph(source=_source(), sheet_id=sheet_id or None, site_id=site_id)
+            result: Dict[str, Any] = {"nodes": len(graph.nodes), "edges": len(graph.edges)}
+        except HTTPException as exc:
+            result = {"error": f"{exc.status_code}: {exc.detail}"}
+        except Exception as exc:
+            result = {"error": f"{type(exc).__name__}: {exc}"}
+        result["ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+        with self._lock:
+            self._results[label] = result
+
+
+cache_warmup = CacheWarmup()
+
+
+__all__ = ["CacheWarmup", "cache_warmup", "warmup_targets"]
@@ -0,0 +1,223 @@
+"""Write-behind queue coalescing rapid Sheets saves of the same document.
+
+The editor autosaves: with ``WRITE_BEHIND_WINDOW_MS`` > 0, ``POST /api/graph`` only
+validates and sanitises the graph, hands it to this queue and answers with a write id.
+Saves for the same sheet/tabs/site arriving within the window replace each other
+(last writer wins) and a single upstream write of the latest graph is made when the
+window closes. A write id becomes ``durable`` once that write, or a later one for the
+same document, has landed; ``GET /api/graph/writes/{write_id}`` reports it. Until then,
+``pending_graph`` hands the latest accepted graph to reads of the same document, so a
+GET right after the 202 sees the save.
+
+The queue lives in the process: pending saves are flushed on shutdown, but they are
+lost if the process is killed before the window closes. With a shared
+``CACHE_BACKEND``, the state of every write id is also stored there so any instance
+can report it; pending graphs are only served by the instance that accepted them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..config import settings
+from ..models import Graph
+from .cache_backend import CacheBackend
+
+# How long the shared backend remembers the state of a write id
+_STATUS_TTL_S = 24 * 3600.0
+
+Writer = Callable[..., None]
+
+
+@dataclass
+class _Document:
+    token: str
+    next_seq: int = 1
+    durable_seq: int = 0
+    failed_seq: int = 0
+    error: Optional[str] = None
+    pending: Optional[Tuple[int, Graph, Dict[str, Any]]] = None
+    # latest accepted graph, served to reads until its write (or a later one) completes
+    latest: Optional[Tuple[int, Graph]] = None
+    timer: Optional[threading.Timer] = None
+    writing: bool = False
+    idle: threading.Condition = field(default_factory=lambda: threading.Condition(threading.Lock()))
+    # keeps the shared status records of the document in order
+    published: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "next_seq": self.next_seq,
+            "durable_seq": self.durable_seq,
+            "failed_seq": self.failed_seq,
+            "error": self.error,
+        }
+
+
+def _state(write_id: str, seq: int, record: Dict[str, Any]) -> Dict[str, Any]:
+    if seq <= record["durable_seq"]:
+        return {"write_id": write_id, "state": "durable"}
+    if seq <= record["failed_seq"]:
+        return {"write_id": write_id, "state": "failed", "error": record["error"]}
+    return {"write_id": write_id, "state": "pending"}
+
+
+class WriteBehindQueue:
+    def __init__(self, writer: Writer, *, window_s: float, backend: Optional[CacheBackend] = None) -> None:
+        self._writer = writer
+        self._window_s = window_s
+        self._backend = backend if backend is not None and backend.shared else None
+        # write ids of two instances must not collide in the shared backend
+        self._origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._documents: Dict[Any, _Document] = {}
+        self._by_token: Dict[str, _Document] = {}
+        self._stats = {"submitted": 0, "writes": 0, "failed": 0}
+
+    def submit(self, key: Any, graph: Graph, **kwargs: Any) -> str:
+        """Queue ``graph`` for ``key``, superseding any save still pending; returns its write id."""
+        with self._lock:
+            doc = self._documents.get(key)
+            if doc is None:
+                token = hashlib.sha256(f"{self._origin}:{key!r}".encode("utf-8")).hexdigest()[:16]
+                doc = self._documents[key] = self._by_token[token] = _Document(token=token)
+            seq = doc.next_seq
+            doc.next_seq += 1
+            doc.pending = (seq, graph, kwargs)
+            doc.latest = (seq, graph)
+            self._stats["submitted"] += 1
+            if doc.timer is None and not doc.writing:
+                self._schedule(doc)
+        self._publish(doc)
+        return f"{doc.token}.{seq}"
+
+    def pending_graph(self, key: Any) -> Optional[Graph]:
+        """Copy of the latest graph accepted for ``key`` that is not durable yet, else None."""
+        with self._lock:
+            doc = self._documents.get(key)
+            latest = doc.latest if doc is not None else None
+        return latest[1].model_copy(deep=True) if latest is not None else None
+
+    def status(self, write_id: str) -> Dict[str, Any]:
+        token, _, raw_seq = write_id.partition(".")
+        seq = int(raw_seq) if raw_seq.isdigit() else 0
+        with self._lock:
+            doc = self._by_token.get(token)
+            record = doc.record() if doc is not None else None
+        if record is None and self._backend is not None and seq:
+            # accepted by another instance
+            raw = self._backend.get(f"write:{token}")
+            record = json.loads(raw) if raw is not None else None
+        if record is None or not 0 < seq < record["next_seq"]:
+            raise HTTPException(status_code=404, detail="unknown write id")
+        return _state(write_id, seq, record)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Write every pending save now (shutdown, tests) and wait for in-flight writes."""
+        with self._lock:
+            documents = list(self._documents.values())
+            for doc in documents:
+                if doc.timer is not None:
+                    doc.timer.cancel()
+                    doc.timer = None
+        for doc in documents:
+            self._drain(doc)
+            with doc.idle:
+                doc.idle.wait_for(lambda: not doc.writing and doc.pending is None, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = sum(1 for doc in self._documents.values() if doc.pending is not None)
+            return {**self._stats, "pending": pending, "window_ms": int(self._window_s * 1000)}
+
+    def _schedule(self, doc: _Document) -> None:
+        timer = threading.Timer(self._window_s, self._drain, args=(doc,))
+        timer.daemon = True
+        doc.timer = timer
+        timer.start()
+
+    def _drain(self, doc: _Document) -> None:
+        with self._lock:
+            doc.timer = None
+            if doc.writing or doc.pending is None:
+                return
+            seq, graph, kwargs = doc.pending
+            doc.pending = None
+            doc.writing = True
+        error: Optional[str] = None
+        try:
+            self._writer(graph=graph, **kwargs)
+        except HTTPException as exc:
+            error = f"{exc.status_code}: {exc.detail}"
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        with self._lock:
+            doc.writing = False
+            if error is None:
+                doc.durable_seq = seq
+                self._stats["writes"] += 1
+            else:
+                doc.failed_seq, doc.error = seq, error
+                self._stats["failed"] += 1
+            if doc.latest is not None and doc.latest[0] <= seq:
+                # reads go back to the sheet: the graph landed, or failed and never will
+                doc.latest = None
+            # saves queued while writing wait a full window so a burst still coalesces
+            if doc.pending is not None and doc.timer is None:
+                self._schedule(doc)
+        self._publish(doc)
+        with doc.idle:
+            doc.idle.notify_all()
+
+    def _publish(self, doc: _Document) -> None:
+        if self._backend is None:
+            return
+        # records are computed and stored in order, so a late set never rolls the state back
+        with doc.published:
+            with self._lock:
+                record = doc.record()
+            self._backend.set(f"write:{doc.token}", json.dumps(record).encode("utf-8"), _STATUS_TTL_S)
+
+
+_queue: Optional[WriteBehindQueue] = None
+_queue_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return settings.write_behind_window_ms > 0
+
+
+def write_behind_queue() -> WriteBehindQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            from ..datasources import write_prepared_graph
+            from .cache_backend import cache_backend
+
+            _queue = WriteBehindQueue(
+                write_prepared_graph,
+                window_s=settings.write_behind_window_ms / 1000.0,
+                backend=cache_backend(),
+            )
+        return _queue
+
+
+def flush_pending(timeout: Optional[float] = None) -> None:
+    if _queue is not None:
+        _queue.flush(timeout)
+
+
+def pending_graph(key: Any) -> Optional[Graph]:
+    """Graph saved for ``key`` that is still waiting in the queue (None when disabled)."""
+    if not enabled() or _queue is None:
+        return None
+    return _queue.pending_graph(key)
+
+
+__all__ = ["WriteBehindQueue", "enabled", "flush_pending", "pending_graph", "write_behind_queue"]
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Optional
+import asyncio
 import json
 import re
+import threading
 import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from dataclasses import dataclass, field
 
 from fastapi import HTTPException
 from pydantic import ValidationError
@@ -21,24 +26,93 @@ from .models import (
     LatLon,
     _compute_length_from_geometry,
 )
-from .gcp_auth import get_credentials
-from googleapiclient.errors import HttpError
+from .services.drive_client import get_drive_service
+from .config import settings
+from .services import google_async
+from .services.google_clients import SHEETS_SCOPES, get_sheets_service, http_error_class
 from .shared.graph_transform import ensure_created_at_string
 
 
+_DRIVE_READONLY_SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
+
+
 def _client():
     try:
-        from googleapiclient.discovery import build
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive.readonly",
-        ]
-        creds = get_credentials(scopes)
-        return build("sheets", "v4", credentials=creds, cache_discovery=False)
+        return get_sheets_service()
     except Exception as exc:
         raise HTTPException(status_code=501, detail=f"sheets_unavailable: {exc}")
 
 
+def _is_missing_range_error(exc: Exception) -> bool:
+    """True for the 400 Sheets returns when a range targets a tab that does not exist."""
+    status = getattr(getattr(exc, "resp", None), "status", None) or getattr(exc, "status_code", None)
+    return status == 400 and "Unable to parse range" in str(exc)
+
+
+def _range_tab(a1_range: str) -> str:
+    return a1_range.split("!", 1)[0].strip("'")
+
+
+def _list_sheet_titles(svc, sheet_id: str) -> set[str]:
+    meta = (
+        svc.spreadsheets()
+        .get(spreadsheetId=sheet_id, fields="sheets(properties(title))")
+        .execute()
+    )
+    return {
+        sheet.get("properties", {}).get("title")
+        for sheet in meta.get("sheets", [])
+    }
+
+
+def _batch_get_values(
+    svc,
+    sheet_id: str,
+    ranges: List[str],
+    *,
+    value_render_option: Optional[str] = None,
+    date_time_render_option: Optional[str] = None,
+) -> Dict[str, List[List[Any]]]:
+    """Fetch several ranges in one ``values.batchGet`` round trip.
+
+    batchGet fails as a whole when one range targets a missing tab; in that case the
+    existing tabs are listed and the batch is replayed without the absent ones.
+    Ranges of absent tabs are left out of the result (present-but-empty tabs map to []).
+    """
+    requested = list(ranges)
+    options: Dict[str, Any] = {}
+    if value_render_option:
+        options["valueRenderOption"] = value_render_option
+    if date_time_render_option:
+        options["dateTimeRenderOption"] = date_time_render_option
+    try:
+        resp = (
+            svc.spreadsheets()
+            .values()
+            .batchGet(spreadsheetId=sheet_id, ranges=requested, **options)
+            .execute()
+        )
+    except http_error_class() as exc:
+        if not _is_missing_range_error(exc):
+            raise
+        titles = _list_sheet_titles(svc, sheet_id)
+        requested = [rng for rng in ranges if _range_tab(rng) in titles]
+        if not requested:
+            return {}
+        resp = (
+            svc.spreadsheets()
+            .values()
+            .batchGet(spreadsheetId=sheet_id, ranges=requested, **options)
+            .execute()
+        )
+    value_ranges = resp.get("valueRanges", [])
+    result: Dict[str, List[List[Any]]] = {}
+    for idx, rng in enumerate(requested):
+        entry = value_ranges[idx] if idx < len(value_ranges) else {}
+        result[rng] = entry.get("values", [])
+    return result
+
+
 def _parse_style_meta_values(values: List[List[Any]]) -> Dict[str, Any]:
     if not values:
         return {}
@@ -72,108 +146,293 @@ def _parse_style_meta_values(values: List[List[Any]]) -> Dict[str, Any]:
     return meta
 
 
-def _read_style_meta_sheet(svc, sheet_id: str) -> Dict[str, Any]:
-    try:
-        resp = (
-            svc.spreadsheets()
-            .values()
-            .get(spreadsheetId=sheet_id, range=f"{STYLE_META_SHEET}!A:ZZZ")
-            .execute()
-        )
-        values = resp.get("values", [])
-        return _parse_style_meta_values(values)
-    except HttpError as exc:
-        if exc.resp.status == 400 and "Unable to parse range" in str(exc):
-            return {}
-        raise
-    except Exception:
+def _column_letter(index: int) -> str:
+    """1-based column index -> A1 letters (1 -> A, 27 -> AA)."""
+    letters = ""
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def _cell_key(value: Any) -> Tuple[str, Any]:
+    """Comparable form of a cell as written with RAW input and read back UNFORMATTED."""
+    if value is None or value == "":
+        return ("", "")
+    if isinstance(value, bool):
+        return ("b", value)
+    if isinstance(value, (int, float)):
+        return ("n", float(value))
+    return ("s", str(value))
+
+
+def _row_key(row: List[Any]) -> Tuple[Tuple[str, Any], ...]:
+    keys = [_cell_key(value) for value in row]
+    # The API omits trailing empty cells
+    while keys and keys[-1] == ("", ""):
+        keys.pop()
+    return tuple(keys)
+
+
+def _cell_data(value: Any) -> Dict[str, Any]:
+    """``CellData`` equivalent of writing ``value`` with ``valueInputOption=RAW``."""
+    if value is None or value == "":
         return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    return {"userEnteredValue": {"stringValue": str(value)}}
+
+
+def _update_cells_request(gid: int, start_row: int, rows: List[List[Any]], width: int) -> Dict[str, Any]:
+    return {
+        "updateCells": {
+            "range": {
+                "sheetId": gid,
+                "startRowIndex": start_row,
+                "endRowIndex": start_row + len(rows),
+                "startColumnIndex": 0,
+                "endColumnIndex": width,
+            },
+            "rows": [{"values": [_cell_data(value) for value in row]} for row in rows],
+            # Cells of the range not covered by ``rows`` are cleared as well
+            "fields": "userEnteredValue",
+        }
+    }
 
 
-def _write_style_meta_sheet(svc, sheet_id: str, style_meta: Dict[str, Any]) -> None:
-    payload = json.dumps(style_meta or {}, ensure_ascii=False, separators=(",", ":"))
-    values = [["style_meta", payload]]
-    body = {"values": values}
-    target_range = f"{STYLE_META_SHEET}!A1:B1"
-    try:
-        svc.spreadsheets().values().update(
+def _diff_tab_requests(
+    gid: int,
+    current: List[List[Any]],
+    target: List[List[Any]],
+    *,
+    truncate: bool = True,
+    grid: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """``spreadsheets.batchUpdate`` requests turning ``current`` into ``target``.
+
+    Only changed and added rows are sent, consecutive rows merged into one
+    ``updateCells``; cells beyond the new row width are cleared. Leftover rows past the
+    end of ``target`` are deleted (``truncate``) or cleared. ``grid`` holds the tab's
+    ``gridProperties``: the API rejects a delete that would leave only frozen rows, so
+    such leftovers are cleared instead (unknown grids are assumed to freeze the header).
+    """
+    delete = False
+    if truncate and len(current) > len(target):
+        # The API leaves out zero fields: a known grid without frozenRowCount freezes nothing
+        row_count = int((grid or {}).get("rowCount") or len(current))
+        frozen = int(grid.get("frozenRowCount") or 0) if grid else 1
+        delete = row_count - (len(current) - max(len(target), 1)) > frozen
+    end = len(target) if delete else max(len(current), len(target))
+    changed: List[int] = []
+    for idx in range(end):
+        old = current[idx] if idx < len(current) else []
+        new = target[idx] if idx < len(target) else []
+        if _row_key(old) != _row_key(new):
+            changed.append(idx)
+
+    requests: List[Dict[str, Any]] = []
+    run: List[int] = []
+
+    def flush() -> None:
+        if not run:
+            return
+        width = max(
+            max(len(current[i]) if i < len(current) else 0, len(target[i]) if i < len(target) else 0)
+            for i in run
+        )
+        rows = [list(target[i]) if i < len(target) else [] for i in run]
+        requests.append(_update_cells_request(gid, run[0], rows, max(width, 1)))
+
+    for idx in changed:
+        if run and idx != run[-1] + 1:
+            flush()
+            run = []
+        run.append(idx)
+    flush()
+
+    if delete:
+        requests.append({
+            "deleteDimension": {
+                "range": {
+                    "sheetId": gid,
+                    "dimension": "ROWS",
+                    "startIndex": max(len(target), 1),
+                    "endIndex": len(current),
+                }
+            }
+        })
+    return requests
+
+
+def _replace_tab_request(gid: int, target: List[List[Any]]) -> Dict[str, Any]:
+    """Set ``target`` from A1 and clear every other cell of the tab (contents unknown)."""
+    return {
+        "updateCells": {
+            "range": {"sheetId": gid},
+            "rows": [{"values": [_cell_data(value) for value in row]} for row in target],
+            "fields": "userEnteredValue",
+        }
+    }
+
+
+def _sheet_properties(svc, sheet_id: str) -> Dict[str, Dict[str, Any]]:
+    """Tab properties (sheetId, gridProperties) by title."""
+    meta = (
+        svc.spreadsheets()
+        .get(
             spreadsheetId=sheet_id,
-            range=target_range,
-            valueInputOption="RAW",
-            body=body,
-        ).execute()
-    except HttpError as exc:
-        if exc.resp.status == 400 and "Unable to parse range" in str(exc):
-            try:
-                svc.spreadsheets().batchUpdate(
-                    spreadsheetId=sheet_id,
-                    body={
-                        "requests": [
-                            {
-                                "addSheet": {
-                                    "properties": {
-                                        "title": STYLE_META_SHEET,
-                                    }
-                                }
-                            }
-                        ]
-                    },
-                ).execute()
-            except HttpError as inner_exc:
-                if inner_exc.resp.status not in {400, 409}:
-                    raise
-            svc.spreadsheets().values().update(
-                spreadsheetId=sheet_id,
-                range=target_range,
-                valueInputOption="RAW",
-                body=body,
-            ).execute()
-        else:
-            raise
+            fields="sheets(properties(sheetId,title,gridProperties(rowCount,columnCount,frozenRowCount)))",
+        )
+        .execute()
+    )
+    return {
+        sheet.get("properties", {}).get("title"): sheet.get("properties", {})
+        for sheet in meta.get("sheets", [])
+    }
 
 
-def _clear_sheet(svc, sheet_id: str, title: str) -> None:
-    try:
-        svc.spreadsheets().values().clear(
-            spreadsheetId=sheet_id, range=f"{title}!A:ZZZ"
-        ).execute()
-    except HttpError as exc:
-        if exc.resp.status == 400 and "Unable to parse range" in str(exc):
-            try:
-                svc.spreadsheets().batchUpdate(
-                    spreadsheetId=sheet_id,
-                    body={
-                        "requests": [
-                            {
-                                "addSheet": {
-                                    "properties": {
-                                        "title": title,
-                                    }
-                                }
-                            }
-                        ]
-                    },
-                ).execute()
-            except HttpError as inner_exc:
-                if inner_exc.resp.status not in {400, 409}:
-                    raise
-        else:
-            raise
+def _grid_requests(
+    props: Dict[str, Dict[str, Any]],
+    targets: Dict[str, List[List[Any]]],
+) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """sheetId per target tab, plus the addSheet / appendDimension requests they need.
+
+    Missing tabs get an explicit sheetId so later requests of the same batch can
+    address them; existing grids are grown when the new rows do not fit.
+    """
+    used_ids = {p.get("sheetId") for p in props.values()}
+    next_id = max([gid for gid in used_ids if isinstance(gid, int)] + [0]) + 1
+    gids: Dict[str, int] = {}
+    requests: List[Dict[str, Any]] = []
+    for title, values in targets.items():
+        rows = len(values)
+        cols = max((len(row) for row in values), default=0)
+        existing = props.get(title)
+        if existing is None:
+            gid = next_id
+            next_id += 1
+            requests.append({
+                "addSheet": {
+                    "properties": {
+                        "sheetId": gid,
+                        "title": title,
+                        "gridProperties": {"rowCount": max(rows, 1000), "columnCount": max(cols, 26)},
+                    }
+                }
+            })
+            gids[title] = gid
+            continue
+        gid = existing.get("sheetId")
+        gids[title] = gid
+        grid = existing.get("gridProperties", {})
+        for dimension, needed, have in (
+            ("ROWS", rows, grid.get("rowCount", 0)),
+            ("COLUMNS", cols, grid.get("columnCount", 0)),
+        ):
+            if have and needed > have:
+                requests.append({"appendDimension": {"sheetId": gid, "dimension": dimension, "length": needed - have}})
+    return gids, requests
+
+
+_SITE_COLUMN_KEYS = ["idSite1", "idSite"]
+
+
+def _has_site_column(header: List[Any]) -> bool:
+    header_keys = {
+        str(col).strip().lower()
+        for col in header
+        if isinstance(col, str) and col.strip()
+    }
+    return any(k.lower() in header_keys for k in _SITE_COLUMN_KEYS)
 
 
-def _read_branches_sheet(svc, sheet_id: str) -> List[BranchInfo]:
-    try:
-        resp = (
-            svc.spreadsheets()
-            .values()
-            .get(spreadsheetId=sheet_id, range=f"{BRANCHES_SHEET}!A:ZZZ")
-            .execute()
-        )
-    except HttpError as exc:
-        if exc.resp.status == 400 and "Unable to parse range" in str(exc):
-            return []
-        raise
-    rows = resp.get('values', [])
+def _row_in_site(row: Dict[str, Any], site_id: str) -> bool:
+    target = str(site_id).strip().lower()
+    for k in _SITE_COLUMN_KEYS:
+        v = row.get(k)
+        if v is None:
+            continue
+        if _text(v).strip().lower() == target:
+            return True
+    return False
+
+
+def _row_id(row: List[Any]) -> str:
+    return str(row[0]).strip() if row and row[0] not in (None, "") else ""
+
+
+def _site_scoped_values(
+    current: List[List[Any]],
+    header: List[Any],
+    new_rows: List[List[Any]],
+    belongs,
+) -> List[List[Any]]:
+    """Tab contents where the rows matched by ``belongs`` are replaced by ``new_rows``.
+
+    Other rows keep their position and values. New rows reuse the freed slots (and
+    empty rows), preferring the slot that already held the same id so the row diff
+    stays minimal; extra rows are appended, leftover slots are blanked. When the
+    current header differs, kept rows are re-laid out column by column name.
+    """
+    cur_header = list(current[0]) if current else []
+    rows = [list(r) for r in current[1:]]
+    if cur_header and cur_header != list(header):
+        rows = [
+            [d.get(col, "") for col in header] if d else []
+            for d in _values_to_dicts(rows, cur_header)
+        ]
+    dicts = _values_to_dicts(rows, list(header))
+
+    result: List[List[Any]] = [list(header)] + rows
+    free: List[int] = []
+    slot_by_id: Dict[str, int] = {}
+    for idx, (row, as_dict) in enumerate(zip(rows, dicts), start=1):
+        if not _row_key(row):
+            free.append(idx)
+        elif belongs(as_dict):
+            free.append(idx)
+            slot_by_id.setdefault(_row_id(row), idx)
+
+    free_set = set(free)
+    pending: List[List[Any]] = []
+    for row in new_rows:
+        slot = slot_by_id.get(_row_id(row))
+        if slot is not None and slot in free_set:
+            result[slot] = row
+            free_set.discard(slot)
+        else:
+            pending.append(row)
+    for row in pending:
+        slot = next((i for i in free if i in free_set), None)
+        if slot is None:
+            result.append(row)
+        else:
+            result[slot] = row
+            free_set.discard(slot)
+    for slot in free_set:
+        result[slot] = []
+    while len(result) > 1 and not _row_key(result[-1]):
+        result.pop()
+    return result
+
+
+def _merged_by_id_values(current: List[List[Any]], target: List[List[Any]]) -> List[List[Any]]:
+    """Rows of ``target`` upserted by id into ``current`` (header from ``target``, no deletion)."""
+    new_by_id = {_row_id(row): row for row in target[1:] if _row_id(row)}
+    result: List[List[Any]] = [list(target[0])]
+    for row in current[1:]:
+        rid = _row_id(row)
+        if rid in new_by_id:
+            result.append(new_by_id.pop(rid))
+        elif rid:
+            result.append(list(row))
+    result.extend(row for row in target[1:] if _row_id(row) in new_by_id)
+    return result
+
+
+def _parse_branches_values(rows: List[List[Any]]) -> List[BranchInfo]:
     if not rows:
         return []
     header = rows[0]
@@ -198,19 +457,7 @@ def _read_branches_sheet(svc, sheet_id: str) -> List[BranchInfo]:
     return list(branches.values())
 
 
-def _read_config_sheet(svc, sheet_id: str) -> Dict[str, Any]:
-    try:
-        resp = (
-            svc.spreadsheets()
-            .values()
-            .get(spreadsheetId=sheet_id, range=f"{CONFIG_SHEET}!A:B")
-            .execute()
-        )
-    except HttpError as exc:
-        if exc.resp.status == 400 and "Unable to parse range" in str(exc):
-            return {}
-        raise
-    rows = resp.get('values', [])
+def _parse_config_values(rows: List[List[Any]]) -> Dict[str, Any]:
     config: Dict[str, Any] = {}
     for row in rows:
         if not row:
@@ -413,6 +660,44 @@ def _lookup_sheet_id(svc, sheet_id: str, title: str) -> Optional[int]:
     return None
 
 
+def _select_plan_overlay_row(
+    header_row: List[Any],
+    data_rows: List[List[Any]],
+    site_id: Optional[str],
+) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+    rows_dicts = _values_to_dicts(data_rows, header_row)
+    target_site = _normalise_site_token(site_id)
+    target_index: Optional[int] = None
+    selected_row: Optional[Dict[str, Any]] = None
+    fallback_index: Optional[int] = None
+
+    for idx, row_dict in enumerate(rows_dicts):
+        normalised = _normalise_plan_row(row_dict)
+        if not normalised:
+            continue
+        row_site = _first_nonempty(
+            normalised,
+            ["site_id", "site", "id_site", "siteid", "idsite1", "site_id1"],
+        )
+        if target_site:
+            if _normalise_site_token(row_site) == target_site:
+                target_index = idx
+                selected_row = normalised
+                break
+            if fallback_index is None:
+                fallback_index = idx
+        else:
+            target_index = idx
+            selected_row = normalised
+            break
+
+    if target_index is None:
+        target_index = fallback_index
+        if target_index is not None:
+            selected_row = _normalise_plan_row(rows_dicts[target_index])
+    return target_index, selected_row
+
+
 def _locate_plan_overlay_row(
     svc,
     sheet_id: str,
@@ -427,8 +712,8 @@ def _locate_plan_overlay_row(
             .get(spreadsheetId=sheet_id, range=f"{PLAN_OVERLAY_SHEET}!A:ZZZ")
             .execute()
         )
-    except HttpError as exc:
-        if exc.resp.status == 400 and "Unable to parse range" in str(exc):
+    except http_error_class() as exc:
+        if _is_missing_range_error(exc):
             raise HTTPException(status_code=404, detail="plan_overlay_not_found") from exc
         raise HTTPException(status_code=502, detail=f"plan_overlay_sheet_error: {exc}") from exc
     except Exception as exc:  # pragma: no cover - network/auth errors
@@ -448,36 +733,7 @@ def _locate_plan_overlay_row(
                 raise HTTPException(status_code=404, detail="plan_overlay_not_found")
             header_row = _ensure_plan_overlay_header(svc, sheet_id, header_row)
 
-    rows_dicts = _values_to_dicts(data_rows, header_row)
-    target_site = _normalise_site_token(site_id)
-    target_index: Optional[int] = None
-    selected_row: Optional[Dict[str, Any]] = None
-    fallback_index: Optional[int] = None
-
-    for idx, row_dict in enumerate(rows_dicts):
-        normalised = _normalise_plan_row(row_dict)
-        if not normalised:
-            continue
-        row_site = _first_nonempty(
-            normalised,
-            ["site_id", "site", "id_site", "siteid", "idsite1", "site_id1"],
-        )
-        if target_site:
-            if _normalise_site_token(row_site) == target_site:
-                target_index = idx
-                selected_row = normalised
-                break
-            if fallback_index is None:
-                fallback_index = idx
-        else:
-            target_index = idx
-            selected_row = normalised
-            break
-
-    if target_index is None:
-        target_index = fallback_index
-        if target_index is not None:
-            selected_row = _normalise_plan_row(rows_dicts[target_index])
+    target_index, selected_row = _select_plan_overlay_row(header_row, data_rows, site_id)
 
     if target_index is None or target_index >= len(data_rows) or selected_row is None:
         if not create_if_missing:
@@ -529,7 +785,21 @@ def _read_plan_overlay_sheet(
     while len(row_values) < len(header_row):
         row_values.append("")
 
-    selected_row = _normalise_plan_row(selected_row)
+    return _plan_overlay_from_row(selected_row, site_id)
+
+
+def _plan_overlay_from_values(values: List[List[Any]], site_id: Optional[str]) -> Optional[PlanOverlayConfig]:
+    """Read-only counterpart of ``_read_plan_overlay_sheet`` working on pre-fetched values."""
+    if not values or not values[0]:
+        return None
+    target_index, selected_row = _select_plan_overlay_row(values[0], values[1:], site_id)
+    if target_index is None or selected_row is None:
+        return None
+    return _plan_overlay_from_row(selected_row, site_id)
+
+
+def _plan_overlay_from_row(selected_row: Optional[Dict[str, Any]], site_id: Optional[str]) -> Optional[PlanOverlayConfig]:
+    selected_row = _normalise_plan_row(selected_row or {})
     if not selected_row:
         return None
 
@@ -633,7 +903,7 @@ def _read_plan_overlay_sheet(
 
     return PlanOverlayConfig(
         enabled=_bool(enabled_value, default=True),
-        display_name=display_name_raw,
+        display_name=_text(display_name_raw),
         media=media,
         bounds=bounds,
         defaults=defaults,
@@ -654,6 +924,10 @@ def _detect_header(header: List[str], candidates: List[List[str]]) -> List[str]:
 
 
 def _num(v):
+    # Typed cells (UNFORMATTED_VALUE reads) take the first branch; strings are legacy
+    # formatted values ("12,5 mm", "1 234") and go through the cleanup below.
+    if type(v) is float or type(v) is int:
+        return float(v)
     try:
         if v is None or v == "":
             return None
@@ -698,6 +972,37 @@ def _bool(v, default=True):
     return default
 
 
+def _text(v):
+    """Text field value: typed numbers are rendered back without a spurious ``.0``."""
+    if v is None or isinstance(v, str):
+        return v
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+_SERIAL_EPOCH = datetime(1899, 12, 30)
+
+
+def _date_text(v):
+    """Date field value: SERIAL_NUMBER dates are rendered as ISO strings."""
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return _text(v)
+    try:
+        moment = _SERIAL_EPOCH + timedelta(days=float(v))
+    except (OverflowError, ValueError):
+        return _text(v)
+    if float(v).is_integer():
+        return moment.date().isoformat()
+    return moment.replace(microsecond=0).isoformat()
+
+
+# Extra columns holding dates; the others are text
+_EXTRA_DATE_HEADERS = {"dateAjoutligne"}
+
+
 def _split_ids(v) -> List[str]:
     if not v or not isinstance(v, str):
         return []
@@ -722,60 +1027,114 @@ def _map_type(t: Any) -> str:
     return s or 'OUVRAGE'
 
 
-def _row_to_node(row: Dict[str, Any], header_set: List[str], full_row: Dict[str, Any] | None = None) -> Node:
-    extras: Dict[str, Any] | None = None
-    if isinstance(full_row, dict):
-        extras = { k: full_row.get(k) for k in EXTRA_SHEET_HEADERS }
+def _column_index(header: List[Any]) -> Dict[Any, int]:
+    """Column position per header name (the last duplicate wins, as for dict rows)."""
+    return {key: i for i, key in enumerate(header)}
 
-    raw_t = row.get("type")
-    node_type = _map_type(raw_t or 'OUVRAGE')
 
-    diameter_mm = _num(
-        row.get("diametre_exterieur_mm")
-        or row.get("diametre_mm")
-        or row.get("diameter_mm")
-        or row.get("diametre_exterieur")
-        or row.get("diametreExterieur")
-    )
-    material = row.get("materiau") or row.get("material") or row.get("matériau") or ""
+def _cell_getter(index: Dict[Any, int], *names: str, convert: Optional[Callable[[Any], Any]] = None) -> Callable[[List[Any]], Any]:
+    """Row accessor returning the first of ``names`` whose cell is not blank.
 
-    gps_locked = _bool(row.get("gps_locked"), True)
-    pm_offset_m = _num(row.get("pm_offset_m") or row.get("pm_offset"))
+    Column positions are resolved once; ``convert`` is applied to the selected value.
+    Typed falsy cells (``0``, ``0.0``, ``False``) count as values, not blanks.
+    """
+    cols = tuple(index.get(name) for name in names)
+    if len(cols) == 1:
+        col = cols[0]
+        if col is None:
+            missing = convert(None) if convert else None
+            return lambda row: missing
 
-    if node_type != 'CANALISATION':
-        diameter_mm = None
-        material = ""
+        def get_one(row: List[Any]) -> Any:
+            value = row[col] if col < len(row) else None
+            return convert(value) if convert else value
 
-    site_id = None
-    try:
-        if extras and extras.get("idSite1"):
-            site_id = str(extras.get("idSite1"))
-    except Exception:
-        pass
+        return get_one
 
-    return Node(
-        id=str(row.get("id", "")).strip(),
-        name=(row.get("nom") or row.get("name") or ""),
-        type=node_type,
-        branch_id=(row.get("id_branche") or row.get("branch_id") or ""),
-        site_id=site_id,
-        diameter_mm=diameter_mm,
-        material=material,
-        gps_locked=gps_locked,
-        pm_offset_m=pm_offset_m,
-        commentaire=(row.get("commentaire") or ""),
-        well_pos_index=_int(row.get("well_pos_index")),
-        # attach canonical + legacy kept in sync by model validator
-        attach_edge_id=(row.get("pm_collector_edge_id") or row.get("pm_edge_id") or ""),
-        pm_collector_edge_id=(row.get("pm_collector_edge_id") or row.get("pm_edge_id") or ""),
-        gps_lat=_num(row.get("gps_lat")),
-        gps_lon=_num(row.get("gps_lon")),
-        x=_num(row.get("x")),
-        y=_num(row.get("y")),
-        x_ui=_num(row.get("x_UI")),
-        y_ui=_num(row.get("y_UI")),
-        extras=extras or {},
+    def get_first(row: List[Any]) -> Any:
+        value = None
+        size = len(row)
+        for col in cols:
+            value = row[col] if col is not None and col < size else None
+            if value not in (None, ""):
+                break
+        return convert(value) if convert else value
+
+    return get_first
+
+
+def _compile_node_row(header_raw: List[Any], header_set: List[str]) -> Callable[[List[Any]], Node]:
+    """Row -> Node converter for a Nodes tab whose first row is ``header_raw``."""
+    index = _column_index(header_raw)
+    extra_cols = tuple(
+        (key, index.get(key), _date_text if key in _EXTRA_DATE_HEADERS else _text) for key in EXTRA_SHEET_HEADERS
+    )
+    get_id = _cell_getter(index, "id", convert=_text)
+    get_type = _cell_getter(index, "type")
+    get_name = _cell_getter(index, "nom", "name", convert=_text)
+    get_branch = _cell_getter(index, "id_branche", "branch_id", convert=_text)
+    get_diameter = _cell_getter(
+        index,
+        "diametre_exterieur_mm",
+        "diametre_mm",
+        "diameter_mm",
+        "diametre_exterieur",
+        "diametreExterieur",
+        convert=_num,
     )
+    get_material = _cell_getter(index, "materiau", "material", "matériau", convert=_text)
+    get_gps_locked = _cell_getter(index, "gps_locked", convert=lambda v: _bool(v, True))
+    get_pm_offset = _cell_getter(index, "pm_offset_m", "pm_offset", convert=_num)
+    get_comment = _cell_getter(index, "commentaire", convert=_text)
+    get_well_pos = _cell_getter(index, "well_pos_index", convert=_int)
+    get_attach = _cell_getter(index, "pm_collector_edge_id", "pm_edge_id", convert=_text)
+    get_gps_lat = _cell_getter(index, "gps_lat", convert=_num)
+    get_gps_lon = _cell_getter(index, "gps_lon", convert=_num)
+    get_x = _cell_getter(index, "x", convert=_num)
+    get_y = _cell_getter(index, "y", convert=_num)
+    get_x_ui = _cell_getter(index, "x_UI", convert=_num)
+    get_y_ui = _cell_getter(index, "y_UI", convert=_num)
+
+    def to_node(row: List[Any]) -> Node:
+        size = len(row)
+        # Extras are free text: typed cells are rendered as the sheet would display them
+        extras = {
+            key: (convert(row[col]) if col is not None and col < size else None) for key, col, convert in extra_cols
+        }
+        node_type = _map_type(get_type(row) or 'OUVRAGE')
+        diameter_mm = get_diameter(row)
+        material = get_material(row) or ""
+        if node_type != 'CANALISATION':
+            diameter_mm = None
+            material = ""
+        site_raw = extras.get("idSite1")
+        node_id = get_id(row)
+        attach = get_attach(row) or ""
+        return Node(
+            id=str(node_id if node_id is not None else "").strip(),
+            name=(get_name(row) or ""),
+            type=node_type,
+            branch_id=(get_branch(row) or ""),
+            site_id=_text(site_raw) if site_raw else None,
+            diameter_mm=diameter_mm,
+            material=material,
+            gps_locked=get_gps_locked(row),
+            pm_offset_m=get_pm_offset(row),
+            commentaire=(get_comment(row) or ""),
+            well_pos_index=get_well_pos(row),
+            # attach canonical + legacy kept in sync by model validator
+            attach_edge_id=attach,
+            pm_collector_edge_id=attach,
+            gps_lat=get_gps_lat(row),
+            gps_lon=get_gps_lon(row),
+            x=get_x(row),
+            y=get_y(row),
+            x_ui=get_x_ui(row),
+            y_ui=get_y_ui(row),
+            extras=extras,
+        )
+
+    return to_node
 
 _EDGE_CREATED_AT_KEYS = {
     "created_at",
@@ -790,60 +1149,136 @@ _EDGE_CREATED_AT_KEYS = {
 }
 
 
-def _row_to_edge(row: Dict[str, Any], header_set: List[str]) -> Edge:
-    from_id = row.get("source_id") or row.get("from_id")
-    to_id = row.get("cible_id") or row.get("to_id")
-    geometry_coords = None
-    if row.get('geometry_json') not in (None, ''):
-        geometry_coords = _parse_geometry_field(row.get('geometry_json'))
-    if geometry_coords is None:
-        geometry_coords = _parse_geometry_field(row.get('Geometry') or row.get('geometry'))
-    branch_raw = row.get("BranchId") or row.get("branch_id")
-    branch_id = str(branch_raw).strip() if branch_raw is not None else ""
-    if not branch_id:
-        raise ValueError("branch_id required for edge")
-    diameter_mm = _num(row.get("diametre_mm") or row.get("diameter_mm"))
-    sdr = row.get("sdr")
-    material = row.get("materiau") or row.get("matériau") or row.get("material")
-    length_m = _num(row.get("longueur_m") or row.get("length_m"))
-
-    edge_id_raw = row.get("id")
-    edge_id = str(edge_id_raw).strip() if edge_id_raw not in (None, "") else ""
-    created_source = None
-    for key, value in row.items():
-        if value in (None, ""):
-            continue
-        key_norm = str(key or "").strip().lower()
-        if key_norm in _EDGE_CREATED_AT_KEYS:
-            created_source = value
-            break
-    if created_source in (None, ""):
-        created_source = row.get("created_at") or row.get("createdAt")
-    from_id_str = str(from_id) if from_id is not None else ""
-    to_id_str = str(to_id) if to_id is not None else ""
-    created_at = None
-    if created_source not in (None, ""):
-        created_at = ensure_created_at_string(edge_id or f"{from_id_str}->{to_id_str}", created_source)
-
-    if length_m in (None, "") and geometry_coords:
-        computed_length = _compute_length_from_geometry(geometry_coords)
-        if computed_length is not None:
-            length_m = computed_length
-
-    return Edge(
-        id=edge_id or None,
-        from_id=from_id_str,
-        to_id=to_id_str,
-        active=_bool(row.get("actif") if "actif" in header_set else row.get("active"), True),
-        commentaire=(row.get("commentaire") or row.get("comment") or ""),
-        geometry=(geometry_coords if geometry_coords else None),
-        branch_id=branch_id,
-        diameter_mm=diameter_mm,
-        sdr=(sdr or None),
-        material=(material or None),
-        length_m=length_m,
-        created_at=created_at,
+def _compile_edge_row(header_raw: List[Any], header_set: List[str]) -> Callable[[List[Any]], Edge]:
+    """Row -> Edge converter for an Edges tab whose first row is ``header_raw``."""
+    index = _column_index(header_raw)
+    created_cols = tuple(
+        col for key, col in index.items() if str(key or "").strip().lower() in _EDGE_CREATED_AT_KEYS
     )
+    get_id = _cell_getter(index, "id", convert=_text)
+    get_from = _cell_getter(index, "source_id", "from_id", convert=_text)
+    get_to = _cell_getter(index, "cible_id", "to_id", convert=_text)
+    get_geometry_json = _cell_getter(index, "geometry_json")
+    get_geometry = _cell_getter(index, "Geometry", "geometry")
+    get_branch = _cell_getter(index, "BranchId", "branch_id", convert=_text)
+    get_diameter = _cell_getter(index, "diametre_mm", "diameter_mm", convert=_num)
+    get_sdr = _cell_getter(index, "sdr", convert=_text)
+    get_material = _cell_getter(index, "materiau", "matériau", "material", convert=_text)
+    get_length = _cell_getter(index, "longueur_m", "length_m", convert=_num)
+    get_created = _cell_getter(index, "created_at", "createdAt")
+    get_active = _cell_getter(index, "actif" if "actif" in header_set else "active", convert=lambda v: _bool(v, True))
+    get_comment = _cell_getter(index, "commentaire", "comment", convert=_text)
+
+    def to_edge(row: List[Any]) -> Edge:
+        geometry_coords = None
+        geometry_json = get_geometry_json(row)
+        if geometry_json not in (None, ''):
+            geometry_coords = _parse_geometry_field(geometry_json)
+        if geometry_coords is None:
+            geometry_coords = _parse_geometry_field(get_geometry(row))
+        branch_raw = get_branch(row)
+        branch_id = str(branch_raw).strip() if branch_raw is not None else ""
+        if not branch_id:
+            raise ValueError("branch_id required for edge")
+        length_m = get_length(row)
+
+        edge_id_raw = get_id(row)
+        edge_id = str(edge_id_raw).strip() if edge_id_raw not in (None, "") else ""
+        created_source = None
+        size = len(row)
+        for col in created_cols:
+            if col < size and row[col] not in (None, ""):
+                created_source = row[col]
+                break
+        if created_source in (None, ""):
+            created_source = get_created(row)
+        from_id = get_from(row)
+        to_id = get_to(row)
+        from_id_str = str(from_id) if from_id is not None else ""
+        to_id_str = str(to_id) if to_id is not None else ""
+        created_at = None
+        if created_source not in (None, ""):
+            created_at = ensure_created_at_string(edge_id or f"{from_id_str}->{to_id_str}", created_source)
+
+        if length_m in (None, "") and geometry_coords:
+            computed_length = _compute_length_from_geometry(geometry_coords)
+            if computed_length is not None:
+                length_m = computed_length
+
+        sdr = get_sdr(row)
+        material = get_material(row)
+        return Edge(
+            id=edge_id or None,
+            from_id=from_id_str,
+            to_id=to_id_str,
+            active=get_active(row),
+            commentaire=(get_comment(row) or ""),
+            geometry=(geometry_coords if geometry_coords else None),
+            branch_id=branch_id,
+            diameter_mm=get_diameter(row),
+            sdr=(sdr or None),
+            material=(material or None),
+            length_m=length_m,
+            created_at=created_at,
+        )
+
+    return to_edge
+
+
+def _site_row_matcher(index: Dict[Any, int], header: List[Any], site_id: Optional[str]) -> Optional[Callable[[List[Any]], bool]]:
+    """List-row counterpart of ``_row_in_site``; ``None`` when rows are not filtered."""
+    if not site_id or not _has_site_column(header):
+        return None
+    target = str(site_id).strip().lower()
+    cols = tuple(index[k] for k in _SITE_COLUMN_KEYS if k in index)
+
+    def matches(row: List[Any]) -> bool:
+        size = len(row)
+        for col in cols:
+            if col < size and row[col] is not None and _text(row[col]).strip().lower() == target:
+                return True
+        return False
+
+    return matches
+
+
+def _iter_nodes(values: List[List[Any]], site_id: Optional[str]) -> Iterator[Node]:
+    """Nodes of a Nodes tab (header row first), optionally restricted to ``site_id``."""
+    header_raw = values[0]
+    to_node = _compile_node_row(header_raw, _detect_header(header_raw, [NODE_HEADERS_FR_V11]))
+    index = _column_index(header_raw)
+    id_col = index.get("id")
+    if id_col is None:
+        return
+    in_site = _site_row_matcher(index, header_raw, site_id)
+    for row in values[1:]:
+        if id_col >= len(row) or not row[id_col]:
+            continue
+        if in_site is not None and not in_site(row):
+            continue
+        try:
+            yield to_node(row)
+        except Exception:
+            continue
+
+
+def _iter_edges(values: List[List[Any]]) -> Iterator[Edge]:
+    """Edges of an Edges tab (header row first); malformed rows raise HTTP 422."""
+    header_raw = values[0]
+    if not header_raw:
+        return
+    to_edge = _compile_edge_row(header_raw, _detect_header(header_raw, [EDGE_HEADERS_FR_V6]))
+    for row in values[1:]:
+        if not row:
+            continue
+        try:
+            yield to_edge(row)
+        except ValidationError as exc:
+            raise HTTPException(status_code=422, detail=f"edge validation failed: {exc}") from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        except Exception as exc:
+            raise HTTPException(status_code=422, detail=f"edge parse failed: {exc}") from exc
 
 def _values_to_dicts(values: List[List[Any]], header: List[str]) -> List[Dict[str, Any]]:
     rows = []
@@ -930,105 +1365,397 @@ def _parse_geometry_field(v: Any) -> List[List[float]]:
     return coords
 
 
-def read_nodes_edges(sheet_id: str, nodes_tab: str, edges_tab: str, *, site_id: str | None = None) -> Graph:
+# Graph reads ask for typed cells: numbers and booleans arrive as JSON numbers/bools and
+# dates as serial numbers, so the formatted-string parsing in _num only runs for legacy
+# text cells.
+_GRAPH_VALUE_RENDER = "UNFORMATTED_VALUE"
+_GRAPH_DATE_TIME_RENDER = "SERIAL_NUMBER"
+
+
+def _graph_ranges(nodes_tab: str, edges_tab: str) -> List[str]:
+    """Ranges read for a graph: Nodes, Edges, STYLE_META, BRANCHES, CONFIG, PlanOverlay."""
+    return [
+        f"{nodes_tab}!A:ZZZ",
+        f"{edges_tab}!A:ZZZ",
+        f"{STYLE_META_SHEET}!A:ZZZ",
+        f"{BRANCHES_SHEET}!A:ZZZ",
+        f"{CONFIG_SHEET}!A:B",
+        f"{PLAN_OVERLAY_SHEET}!A:ZZZ",
+    ]
+
+
+# Grid size of every tab, valid for one Drive revision of a spreadsheet. Reads made at a
+# known revision ask for exact ranges (``A1:<last column><last row>``) instead of open
+# ``A:ZZZ`` ones, and skip absent tabs up front. Header-based tabs are narrowed further to
+# the header width seen at that revision; tabs whose grid is very wide get their header
+# row probed first so unused columns are never transferred.
+_LAYOUT_CACHE_MAX = 64
+_WIDE_GRID_COLUMNS = 100
+_NON_HEADER_TABS = {STYLE_META_SHEET, CONFIG_SHEET}
+
+
+@dataclass
+class _SheetLayout:
+    revision: str
+    grid: Dict[str, Tuple[int, int]]
+    header_widths: Dict[str, int] = field(default_factory=dict)
+    # (nodes_tab, edges_tab) -> site token -> (Nodes row runs, Edges row runs)
+    site_rows: Dict[Tuple[str, str], Dict[str, Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]]] = field(
+        default_factory=dict
+    )
+
+
+_layout_lock = threading.Lock()
+_layouts: "OrderedDict[str, _SheetLayout]" = OrderedDict()
+
+
+def _grid_sizes(props: Dict[str, Dict[str, Any]]) -> Dict[str, Tuple[int, int]]:
+    """``(rowCount, columnCount)`` by tab title from ``_sheet_properties``-style metadata."""
+    sizes: Dict[str, Tuple[int, int]] = {}
+    for title, tab_props in props.items():
+        grid = tab_props.get("gridProperties") or {}
+        sizes[title] = (int(grid.get("rowCount") or 1), int(grid.get("columnCount") or 1))
+    return sizes
+
+
+def _exact_range(tab: str, rows: int, columns: int) -> str:
+    return f"{tab}!A1:{_column_letter(max(columns, 1))}{max(rows, 1)}"
+
+
+def _cached_layout(sheet_id: str, revision: str) -> Optional[_SheetLayout]:
+    with _layout_lock:
+        layout = _layouts.get(sheet_id)
+        if layout is None or layout.revision != revision:
+            return None
+        _layouts.move_to_end(sheet_id)
+        return layout
+
+
+def _store_layout(sheet_id: str, revision: str, grid: Dict[str, Tuple[int, int]]) -> _SheetLayout:
+    layout = _SheetLayout(revision=revision, grid=grid)
+    with _layout_lock:
+        _layouts[sheet_id] = layout
+        _layouts.move_to_end(sheet_id)
+        while len(_layouts) > _LAYOUT_CACHE_MAX:
+            _layouts.popitem(last=False)
+    return layout
+
+
+def reset_layout_cache() -> None:
+    with _layout_lock:
+        _layouts.clear()
+
+
+def _wide_header_tabs(layout: _SheetLayout, nodes_tab: str, edges_tab: str) -> List[str]:
+    """Present header-based tabs whose grid is wide and whose header width is unknown."""
+    tabs = []
+    for open_range in _graph_ranges(nodes_tab, edges_tab):
+        tab = _range_tab(open_range)
+        if tab in _NON_HEADER_TABS or tab not in layout.grid or tab in layout.header_widths:
+            continue
+        if layout.grid[tab][1] > _WIDE_GRID_COLUMNS and tab not in tabs:
+            tabs.append(tab)
+    return tabs
+
+
+def _remember_header_widths(layout: _SheetLayout, headers: Dict[str, List[Any]]) -> None:
+    with _layout_lock:
+        for tab, header in headers.items():
+            if tab not in _NON_HEADER_TABS:
+                layout.header_widths[tab] = max(len(header), 1)
+
+
+def _layout_columns(layout: _SheetLayout, tab: str) -> int:
+    columns = layout.grid[tab][1]
+    if tab == CONFIG_SHEET:
+        return min(columns, 2)
+    if tab in layout.header_widths:
+        return min(columns, layout.header_widths[tab])
+    return columns
+
+
+def _layout_ranges(layout: _SheetLayout, nodes_tab: str, edges_tab: str) -> Dict[str, str]:
+    """Open graph range -> exact range, for the tabs present at the layout's revision."""
+    exact: Dict[str, str] = {}
+    for open_range in _graph_ranges(nodes_tab, edges_tab):
+        tab = _range_tab(open_range)
+        if tab in layout.grid:
+            exact[open_range] = _exact_range(tab, layout.grid[tab][0], _layout_columns(layout, tab))
+    return exact
+
+
+# Site reads through the row index: more runs than this and one full read is cheaper
+# than a batchGet with that many ranges.
+_MAX_SITE_RANGES = 40
+
+
+def _row_runs(rows: List[int]) -> List[Tuple[int, int]]:
+    """Sorted sheet row numbers -> inclusive ``(first, last)`` runs of consecutive rows."""
+    runs: List[Tuple[int, int]] = []
+    for row in rows:
+        if runs and row == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+def _site_row_numbers(
+    nodes_values: List[List[Any]], edges_values: List[List[Any]]
+) -> Optional[Dict[str, Tuple[str, List[int], List[int]]]]:
+    """Site token -> (site label, Nodes row numbers, Edges row numbers).
+
+    Tokens are normalised like ``_row_in_site`` and the label is the first spelling
+    seen. Edges belong to a site when both ends are nodes of that site. Row numbers are
+    1-based sheet rows, so ``values`` must start at row 1. ``None`` when the Nodes tab
+    has no site column.
+    """
+    if not nodes_values or not _has_site_column(nodes_values[0]):
+        return None
+    index = _column_index(nodes_values[0])
+    id_col = index.get("id")
+    site_cols = tuple(index[k] for k in _SITE_COLUMN_KEYS if k in index)
+    labels: Dict[str, str] = {}
+    node_rows: Dict[str, List[int]] = {}
+    sites_by_id: Dict[str, set] = {}
+    if id_col is not None:
+        for row_number, row in enumerate(nodes_values[1:], start=2):
+            if id_col >= len(row) or not row[id_col]:
+                continue
+            node_id = str(_text(row[id_col])).strip()
+            for col in site_cols:
+                if col >= len(row) or row[col] is None:
+                    continue
+                label = _text(row[col]).strip()
+                token = label.lower()
+                if not token:
+                    continue
+                labels.setdefault(token, label)
+                rows = node_rows.setdefault(token, [])
+                if not rows or rows[-1] != row_number:
+                    rows.append(row_number)
+                sites_by_id.setdefault(node_id, set()).add(token)
+
+    edge_rows: Dict[str, List[int]] = {}
+    if edges_values and edges_values[0]:
+        edge_index = _column_index(edges_values[0])
+        get_from = _cell_getter(edge_index, "source_id", "from_id", convert=_text)
+        get_to = _cell_getter(edge_index, "cible_id", "to_id", convert=_text)
+        no_sites: set = set()
+        for row_number, row in enumerate(edges_values[1:], start=2):
+            if not row:
+                continue
+            from_id, to_id = get_from(row), get_to(row)
+            if not from_id or not to_id:
+                continue
+            for token in sites_by_id.get(from_id, no_sites) & sites_by_id.get(to_id, no_sites):
+                edge_rows.setdefault(token, []).append(row_number)
+
+    return {token: (labels[token], rows, edge_rows.get(token, [])) for token, rows in node_rows.items()}
+
+
+def _build_site_rows(
+    nodes_values: List[List[Any]], edges_values: List[List[Any]]
+) -> Optional[Dict[str, Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]]]:
+    """Site token -> row runs of its Nodes rows and of its Edges rows (see ``_site_row_numbers``)."""
+    numbers = _site_row_numbers(nodes_values, edges_values)
+    if numbers is None:
+        return None
+    return {
+        token: (_row_runs(node_rows), _row_runs(edge_rows))
+        for token, (_, node_rows, edge_rows) in numbers.items()
+    }
+
+
+def _partition_values_by_site(
+    fetched: Dict[str, List[List[Any]]], nodes_tab: str, edges_tab: str
+) -> Dict[str, Dict[str, List[List[Any]]]]:
+    """Split a full graph read into one ``fetched`` mapping per site label.
+
+    Nodes/Edges keep their header row plus the site's rows; the side tabs are shared.
+    Nodes without a site are left out; no site column means no partition at all.
+    """
+    nodes_range, edges_range = f"{nodes_tab}!A:ZZZ", f"{edges_tab}!A:ZZZ"
+    nodes_values = fetched.get(nodes_range, [])
+    edges_values = fetched.get(edges_range, [])
+    numbers = _site_row_numbers(nodes_values, edges_values)
+    if not numbers:
+        return {}
+    partitions: Dict[str, Dict[str, List[List[Any]]]] = {}
+    for label, node_rows, edge_rows in numbers.values():
+        site_values = dict(fetched)
+        site_values[nodes_range] = [nodes_values[0]] + [nodes_values[r - 1] for r in node_rows]
+        if edges_values:
+            site_values[edges_range] = [edges_values[0]] + [edges_values[r - 1] for r in edge_rows]
+        partitions.setdefault(label, site_values)
+    return partitions
+
+
+def read_values_by_site(sheet_id: str, nodes_tab: str, edges_tab: str) -> Dict[str, Dict[str, List[List[Any]]]]:
+    """One full read of the graph tabs, partitioned by site (see ``_partition_values_by_site``).
+
+    Each partition can be turned into that site's graph with ``graph_from_site_values``.
+    """
     svc = _client()
-    # Read nodes independently from edges (Edges may be absent)
     try:
-        resp_nodes = (
-            svc.spreadsheets().values().get(
-                spreadsheetId=sheet_id, range=f"{nodes_tab}!A:ZZZ"
-            ).execute()
-        )
-        nodes_values = resp_nodes.get("values", [])
+        fetched = _read_graph_values(svc, sheet_id, nodes_tab, edges_tab, None)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"read_nodes_failed: {exc}")
+    if f"{nodes_tab}!A:ZZZ" not in fetched:
+        raise HTTPException(status_code=500, detail=f"read_nodes_failed: Unable to parse range: {nodes_tab}!A:ZZZ")
+    return _partition_values_by_site(fetched, nodes_tab, edges_tab)
+
+
+def graph_from_site_values(
+    site_values: Dict[str, List[List[Any]]], nodes_tab: str, edges_tab: str, site_id: str
+) -> Graph:
+    """Graph of one partition returned by ``read_values_by_site`` (same as a site read)."""
+    return _graph_from_values(site_values, nodes_tab, edges_tab, site_id=site_id)
+
+
+def _graph_read_plan(
+    layout: _SheetLayout, nodes_tab: str, edges_tab: str, site_id: Optional[str]
+) -> Tuple[Dict[str, List[str]], bool]:
+    """Exact ranges to fetch per open graph range, and whether the site row index was used.
+
+    With an indexed site, Nodes and Edges are read as their header row plus the row runs
+    of that site; the other tabs are read whole.
+    """
+    exact = _layout_ranges(layout, nodes_tab, edges_tab)
+    plan = {open_range: [rng] for open_range, rng in exact.items()}
+    site_rows = layout.site_rows.get((nodes_tab, edges_tab)) if site_id else None
+    if site_rows is None:
+        return plan, False
+    node_runs, edge_runs = site_rows.get(str(site_id).strip().lower(), ([], []))
+    if len(node_runs) + len(edge_runs) > _MAX_SITE_RANGES:
+        return plan, False
+    for tab, runs in ((nodes_tab, node_runs), (edges_tab, edge_runs)):
+        open_range = f"{tab}!A:ZZZ"
+        if open_range not in plan:
+            continue
+        last_column = _column_letter(max(_layout_columns(layout, tab), 1))
+        plan[open_range] = [f"{tab}!A1:{last_column}1"] + [
+            f"{tab}!A{first}:{last_column}{last}" for first, last in runs
+        ]
+    return plan, True
 
-    try:
-        resp_edges = (
-            svc.spreadsheets().values().get(
-                spreadsheetId=sheet_id, range=f"{edges_tab}!A:ZZZ"
-            ).execute()
-        )
-        edges_values = resp_edges.get("values", [])
-    except Exception:
-        edges_values = []
 
-    nodes: List[Node] = []
-    edges: List[Edge] = []
+def _plan_ranges(plan: Dict[str, List[str]]) -> List[str]:
+    return list(dict.fromkeys(rng for ranges in plan.values() for rng in ranges))
 
-    if nodes_values:
-        node_header_raw = nodes_values[0]
-        node_header = _detect_header(
-            node_header_raw,
-            [
-                NODE_HEADERS_FR_V11,
-            ],
-        )
-        # Build rows using the full header actually present
-        node_rows_full = _values_to_dicts(nodes_values[1:], node_header_raw)
-
-        # Optional filter by site_id when an extra column like 'idSite1' exists
-        site_col_keys = ["idSite1", "idSite"]
-        header_keys = {
-            str(col).strip().lower()
-            for col in node_header_raw
-            if isinstance(col, str) and col.strip()
-        }
-        has_site_column = any(k.lower() in header_keys for k in site_col_keys)
 
-        def row_matches_site(full_row: Dict[str, Any]) -> bool:
-            if not site_id or not has_site_column:
-                return True
-            target = str(site_id).strip().lower()
-            for k in site_col_keys:
-                v = full_row.get(k)
-                if v is None:
-                    continue
-                txt = str(v).strip().lower()
-                if txt == target:
-                    return True
-            return False
+def _assemble_plan(plan: Dict[str, List[str]], got: Dict[str, List[List[Any]]]) -> Dict[str, List[List[Any]]]:
+    return {
+        open_range: [row for rng in ranges for row in got.get(rng, [])]
+        for open_range, ranges in plan.items()
+    }
 
-        for row_full in node_rows_full:
-            if not row_full.get("id"):
-                continue
-            try:
-                if row_matches_site(row_full):
-                    nodes.append(_row_to_node(row_full, node_header, row_full))
-            except Exception:
-                continue
 
+def _note_graph_read(
+    layout: _SheetLayout,
+    nodes_tab: str,
+    edges_tab: str,
+    fetched: Dict[str, List[List[Any]]],
+    *,
+    indexed: bool,
+    site_id: Optional[str],
+) -> None:
+    """Learn header widths and, after a full site read, the site row index of this revision."""
+    _remember_header_widths(layout, {_range_tab(rng): values[0] for rng, values in fetched.items() if values})
+    if indexed or not site_id or (nodes_tab, edges_tab) in layout.site_rows:
+        return
+    site_rows = _build_site_rows(fetched.get(f"{nodes_tab}!A:ZZZ", []), fetched.get(f"{edges_tab}!A:ZZZ", []))
+    if site_rows is not None:
+        with _layout_lock:
+            layout.site_rows[(nodes_tab, edges_tab)] = site_rows
+
+
+def _read_graph_values(
+    svc,
+    sheet_id: str,
+    nodes_tab: str,
+    edges_tab: str,
+    revision: Optional[str],
+    site_id: Optional[str] = None,
+) -> Dict[str, List[List[Any]]]:
+    """Values of every graph tab keyed by ``_graph_ranges``.
+
+    When ``revision`` is known the ranges are exact, and a site already indexed at that
+    revision only has its own Nodes/Edges rows fetched.
+    """
+    render = {
+        "value_render_option": _GRAPH_VALUE_RENDER,
+        "date_time_render_option": _GRAPH_DATE_TIME_RENDER,
+    }
+    layout = _cached_layout(sheet_id, revision) if revision else None
+    if revision and layout is None:
+        try:
+            layout = _store_layout(sheet_id, revision, _grid_sizes(_sheet_properties(svc, sheet_id)))
+        except Exception:
+            layout = None
+        if layout is not None:
+            wide = _wide_header_tabs(layout, nodes_tab, edges_tab)
+            if wide:
+                probed = _batch_get_values(svc, sheet_id, [f"{tab}!1:1" for tab in wide], **render)
+                _remember_header_widths(layout, {tab: (probed.get(f"{tab}!1:1") or [[]])[0] for tab in wide})
+    if layout is None:
+        return _batch_get_values(svc, sheet_id, _graph_ranges(nodes_tab, edges_tab), **render)
+
+    plan, indexed = _graph_read_plan(layout, nodes_tab, edges_tab, site_id)
+    ranges = _plan_ranges(plan)
+    fetched = _assemble_plan(plan, _batch_get_values(svc, sheet_id, ranges, **render) if ranges else {})
+    _note_graph_read(layout, nodes_tab, edges_tab, fetched, indexed=indexed, site_id=site_id)
+    return fetched
+
+
+def read_nodes_edges(
+    sheet_id: str,
+    nodes_tab: str,
+    edges_tab: str,
+    *,
+    site_id: str | None = None,
+    revision: str | None = None,
+) -> Graph:
+    svc = _client()
+    # One batchGet for every tab; only Nodes is mandatory (Edges and side tabs may be absent).
+    # With the Drive ``revision`` the ranges are sized from the cached tab layout.
+    try:
+        fetched = _read_graph_values(svc, sheet_id, nodes_tab, edges_tab, revision, site_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"read_nodes_failed: {exc}")
+    return _graph_from_values(fetched, nodes_tab, edges_tab, site_id=site_id)
+
+
+def _graph_from_values(
+    fetched: Dict[str, List[List[Any]]],
+    nodes_tab: str,
+    edges_tab: str,
+    *,
+    site_id: str | None = None,
+) -> Graph:
+    nodes_range, edges_range, style_meta_range, branches_range, config_range, plan_overlay_range = _graph_ranges(
+        nodes_tab, edges_tab
+    )
+    if nodes_range not in fetched:
+        raise HTTPException(status_code=500, detail=f"read_nodes_failed: Unable to parse range: {nodes_range}")
+    nodes_values = fetched[nodes_range]
+    edges_values = fetched.get(edges_range, [])
+
+    # Headers are compiled once per tab; rows stream straight into models
+    nodes: List[Node] = list(_iter_nodes(nodes_values, site_id)) if nodes_values else []
+    edges: List[Edge] = []
     if edges_values:
-        edge_header_raw = edges_values[0]
-        edge_header = _detect_header(
-            edge_header_raw,
-            [
-                EDGE_HEADERS_FR_V6,
-            ],
-        )
-        # Use the full raw header to capture extra columns like Geometry/PipeGroupId
-        edge_rows = _values_to_dicts(edges_values[1:], edge_header_raw)
         allowed_ids = {n.id for n in nodes}
-        for row in edge_rows:
-            if not row:
-                continue
-            try:
-                e = _row_to_edge(row, edge_header)
-            except ValidationError as exc:
-                raise HTTPException(status_code=422, detail=f"edge validation failed: {exc}") from exc
-            except ValueError as exc:
-                raise HTTPException(status_code=422, detail=str(exc)) from exc
-            except Exception as exc:
-                raise HTTPException(status_code=422, detail=f"edge parse failed: {exc}") from exc
+        for e in _iter_edges(edges_values):
             if e.from_id and e.to_id:
                 if site_id and (e.from_id not in allowed_ids or e.to_id not in allowed_ids):
                     continue
                 edges.append(e)
 
-    style_meta = _read_style_meta_sheet(svc, sheet_id)
-    branches = _read_branches_sheet(svc, sheet_id)
-    config_map = _read_config_sheet(svc, sheet_id)
-    plan_overlay = _read_plan_overlay_sheet(svc, sheet_id, site_id)
+    style_meta = _parse_style_meta_values(fetched.get(style_meta_range, []))
+    branches = _parse_branches_values(fetched.get(branches_range, []))
+    config_map = _parse_config_values(fetched.get(config_range, []))
+    plan_overlay = _plan_overlay_from_values(fetched.get(plan_overlay_range, []), site_id)
     crs = _normalise_crs_from_config(config_map)
     if not branches:
         fallback: Dict[str, BranchInfo] = {}
@@ -1055,22 +1782,205 @@ def read_nodes_edges(sheet_id: str, nodes_tab: str, edges_tab: str, *, site_id:
     )
 
 
+async def _batch_get_values_async(
+    sheet_id: str,
+    ranges: List[str],
+    *,
+    value_render_option: Optional[str] = None,
+    date_time_render_option: Optional[str] = None,
+) -> Dict[str, List[List[Any]]]:
+    """Async ``values.batchGet`` with the same missing-tab fallback as ``_batch_get_values``."""
+    path = f"v4/spreadsheets/{google_async.quote(sheet_id)}/values:batchGet"
+    requested = list(ranges)
+    options: List[Tuple[str, Any]] = []
+    if value_render_option:
+        options.append(("valueRenderOption", value_render_option))
+    if date_time_render_option:
+        options.append(("dateTimeRenderOption", date_time_render_option))
+    try:
+        resp = await google_async.get_json(
+            google_async.SHEETS_ROOT, path, scopes=SHEETS_SCOPES, params=[("ranges", rng) for rng in requested] + options
+        )
+    except google_async.GoogleAPIError as exc:
+        if not _is_missing_range_error(exc):
+            raise
+        meta = await google_async.get_json(
+            google_async.SHEETS_ROOT,
+            f"v4/spreadsheets/{google_async.quote(sheet_id)}",
+            scopes=SHEETS_SCOPES,
+            params=[("fields", "sheets(properties(title))")],
+        )
+        titles = {sheet.get("properties", {}).get("title") for sheet in meta.get("sheets", [])}
+        requested = [rng for rng in ranges if _range_tab(rng) in titles]
+        if not requested:
+            return {}
+        resp = await google_async.get_json(
+            google_async.SHEETS_ROOT, path, scopes=SHEETS_SCOPES, params=[("ranges", rng) for rng in requested] + options
+        )
+    value_ranges = resp.get("valueRanges", [])
+    result: Dict[str, List[List[Any]]] = {}
+    for idx, rng in enumerate(requested):
+        entry = value_ranges[idx] if idx < len(value_ranges) else {}
+        result[rng] = entry.get("values", [])
+    return result
+
+
+async def _sheet_properties_async(sheet_id: str) -> Dict[str, Dict[str, Any]]:
+    meta = await google_async.get_json(
+        google_async.SHEETS_ROOT,
+        f"v4/spreadsheets/{google_async.quote(sheet_id)}",
+        scopes=SHEETS_SCOPES,
+        params=[("fields", "sheets(properties(sheetId,title,gridProperties(rowCount,columnCount)))")],
+    )
+    return {
+        sheet.get("properties", {}).get("title"): sheet.get("properties", {})
+        for sheet in meta.get("sheets", [])
+    }
+
+
+async def _read_graph_values_async(
+    sheet_id: str,
+    nodes_tab: str,
+    edges_tab: str,
+    revision: Optional[str],
+    site_id: Optional[str] = None,
+) -> Dict[str, List[List[Any]]]:
+    """Async ``_read_graph_values`` (same layout cache)."""
+    render = {
+        "value_render_option": _GRAPH_VALUE_RENDER,
+        "date_time_render_option": _GRAPH_DATE_TIME_RENDER,
+    }
+    layout = _cached_layout(sheet_id, revision) if revision else None
+    if revision and layout is None:
+        try:
+            layout = _store_layout(sheet_id, revision, _grid_sizes(await _sheet_properties_async(sheet_id)))
+        except Exception:
+            layout = None
+        if layout is not None:
+            wide = _wide_header_tabs(layout, nodes_tab, edges_tab)
+            if wide:
+                probed = await _batch_get_values_async(sheet_id, [f"{tab}!1:1" for tab in wide], **render)
+                _remember_header_widths(layout, {tab: (probed.get(f"{tab}!1:1") or [[]])[0] for tab in wide})
+    if layout is None:
+        return await _batch_get_values_async(sheet_id, _graph_ranges(nodes_tab, edges_tab), **render)
+
+    plan, indexed = _graph_read_plan(layout, nodes_tab, edges_tab, site_id)
+    ranges = _plan_ranges(plan)
+    fetched = _assemble_plan(plan, await _batch_get_values_async(sheet_id, ranges, **render) if ranges else {})
+    _note_graph_read(layout, nodes_tab, edges_tab, fetched, indexed=indexed, site_id=site_id)
+    return fetched
+
+
+async def read_nodes_edges_async(
+    sheet_id: str,
+    nodes_tab: str,
+    edges_tab: str,
+    *,
+    site_id: str | None = None,
+    revision: str | None = None,
+) -> Graph:
+    """Async ``read_nodes_edges``: the fetch awaits on the event loop, parsing runs in a thread."""
+    try:
+        fetched = await _read_graph_values_async(sheet_id, nodes_tab, edges_tab, revision, site_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"read_nodes_failed: {exc}")
+    return await asyncio.to_thread(_graph_from_values, fetched, nodes_tab, edges_tab, site_id=site_id)
+
+
+async def read_spreadsheet_revision_async(sheet_id: str) -> Optional[str]:
+    """Async ``read_spreadsheet_revision`` (None when Drive cannot be queried)."""
+    try:
+        meta = await google_async.get_json(
+            google_async.DRIVE_ROOT,
+            f"files/{google_async.quote(sheet_id)}",
+            scopes=_DRIVE_READONLY_SCOPES,
+            params=[("fields", "version,modifiedTime"), ("supportsAllDrives", "true")],
+        )
+    except Exception:
+        return None
+    revision = meta.get("version") or meta.get("modifiedTime")
+    return str(revision) if revision not in (None, "") else None
+
+
+def read_spreadsheet_revision(sheet_id: str) -> Optional[str]:
+    """Return the Drive revision marker of a spreadsheet (one small ``files.get``).
+
+    ``version`` increases on every change to the file; ``modifiedTime`` is the fallback.
+    Returns None when Drive cannot be queried, so callers fall back to a full read.
+    """
+    try:
+        meta = (
+            get_drive_service(writable=False)
+            .files()
+            .get(fileId=sheet_id, fields="version,modifiedTime", supportsAllDrives=True)
+            .execute()
+        )
+    except Exception:
+        return None
+    revision = meta.get("version") or meta.get("modifiedTime")
+    return str(revision) if revision not in (None, "") else None
+
+
+_site_write_locks_lock = threading.Lock()
+_site_write_locks: Dict[str, threading.Lock] = {}
+# fresh read + diff attempts of a site-scoped write when the sheet keeps moving under it
+_SITE_WRITE_ATTEMPTS = 3
+
+
+def _site_write_lock(sheet_id: str) -> threading.Lock:
+    with _site_write_locks_lock:
+        return _site_write_locks.setdefault(sheet_id, threading.Lock())
+
+
 def write_nodes_edges(sheet_id: str, nodes_tab: str, edges_tab: str, graph: Graph, *, site_id: str | None = None) -> None:
+    if not (site_id and settings.sheets_site_scoped_write):
+        _write_nodes_edges(sheet_id, nodes_tab, edges_tab, graph, site_id=site_id)
+        return
+    # Several sites saving to one sheet: the row diff is computed from a read, so saves
+    # are serialised in this process and, across instances, a diff is only applied when
+    # the Drive revision did not move since its read (else it is recomputed).
+    with _site_write_lock(sheet_id):
+        for _ in range(_SITE_WRITE_ATTEMPTS):
+            revision = read_spreadsheet_revision(sheet_id)
+            if _write_nodes_edges(sheet_id, nodes_tab, edges_tab, graph, site_id=site_id, revision=revision):
+                return
+    raise HTTPException(status_code=409, detail="sheet_write_conflict: the sheet kept changing during the save")
+
+
+def _write_nodes_edges(
+    sheet_id: str,
+    nodes_tab: str,
+    edges_tab: str,
+    graph: Graph,
+    *,
+    site_id: str | None = None,
+    revision: str | None = None,
+) -> bool:
+    """Diff and write the graph; False (nothing written) when ``revision`` moved since the read."""
     svc = _client()
 
     node_headers = NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS
     edge_headers = EDGE_HEADERS_FR_V6
 
-    # Preserve existing canonical positions (x, y) when saving from UI.
+    # Tab ids/grids, then the current contents of every written tab in one batchGet:
+    # they drive the row diff and preserve existing canonical positions (x, y).
+    props = _sheet_properties(svc, sheet_id)
+    grid = _grid_sizes(props)
+    current_ranges = {
+        title: _exact_range(title, *grid[title]) if title in grid else f"{title}!A:ZZZ"
+        for title in (nodes_tab, edges_tab, BRANCHES_SHEET, CONFIG_SHEET)
+    }
+    current_ranges[STYLE_META_SHEET] = f"{STYLE_META_SHEET}!A1:B1"
     try:
-        resp_nodes = (
-            svc.spreadsheets().values().get(
-                spreadsheetId=sheet_id, range=f"{nodes_tab}!A:ZZZ"
-            ).execute()
-        )
-        cur_values = resp_nodes.get("values", [])
+        current: Optional[Dict[str, List[List[Any]]]] = _batch_get_values(
+            svc,
+            sheet_id,
+            [rng for title, rng in current_ranges.items() if title in props],
+            value_render_option="UNFORMATTED_VALUE",
+        ) if any(title in props for title in current_ranges) else {}
     except Exception:
-        cur_values = []
+        current = None
+    cur_values = (current or {}).get(current_ranges[nodes_tab], [])
 
     existing_xy_by_id: Dict[str, Dict[str, Any]] = {}
     if cur_values:
@@ -1221,22 +2131,76 @@ def write_nodes_edges(sheet_id: str, nodes_tab: str, edges_tab: str, graph: Grap
         ["projected_for_lengths", crs_obj.projected_for_lengths or ""],
     ]
 
-    data = [
-        {"range": f"{nodes_tab}!A1", "values": node_values},
-        {"range": f"{edges_tab}!A1", "values": edge_values},
-        {"range": f"{BRANCHES_SHEET}!A1", "values": branches_rows},
-        {"range": f"{CONFIG_SHEET}!A1", "values": config_values},
-    ]
+    targets = {
+        nodes_tab: node_values,
+        edges_tab: edge_values,
+        BRANCHES_SHEET: branches_rows,
+        CONFIG_SHEET: config_values,
+    }
 
-    for title in (nodes_tab, edges_tab, BRANCHES_SHEET, CONFIG_SHEET):
-        _clear_sheet(svc, sheet_id, title)
+    site_scoped = bool(site_id) and settings.sheets_site_scoped_write
+    if site_scoped:
+        if current is None:
+            # Rewriting whole tabs would drop the other sites' rows
+            raise HTTPException(status_code=503, detail="sheet_read_failed: site-scoped write needs the current rows")
+        cur_nodes = current.get(current_ranges[nodes_tab], [])
+        cur_edges = current.get(current_ranges[edges_tab], [])
+        # Without a site column the reader shows every row for any site: they are all the site's
+        has_sites = bool(cur_nodes) and _has_site_column(cur_nodes[0])
+        cur_node_rows = _values_to_dicts(cur_nodes[1:], cur_nodes[0]) if cur_nodes else []
+        site_node_ids = {
+            str(row.get("id")).strip()
+            for row in cur_node_rows
+            if row.get("id") not in (None, "") and _row_in_site(row, site_id)
+        }
+        site_node_ids.update(str(n.id).strip() for n in graph.nodes or [])
 
-    svc.spreadsheets().values().batchUpdate(
-        spreadsheetId=sheet_id,
-        body={"valueInputOption": "RAW", "data": data},
-    ).execute()
+        def belongs_node(row: Dict[str, Any]) -> bool:
+            return not has_sites or _row_in_site(row, site_id)
 
-    _write_style_meta_sheet(svc, sheet_id, graph.style_meta or {})
+        def belongs_edge(row: Dict[str, Any]) -> bool:
+            # Same visibility rule as the reader: both ends on the site's nodes (an edge
+            # id is not enough, another site may use the same one)
+            if not has_sites:
+                return True
+            ends = (str(row.get("from_id") or "").strip(), str(row.get("to_id") or "").strip())
+            return all(end and end in site_node_ids for end in ends)
+
+        targets[nodes_tab] = _site_scoped_values(cur_nodes, node_headers, node_values[1:], belongs_node)
+        targets[edges_tab] = _site_scoped_values(cur_edges, edge_headers, edge_values[1:], belongs_edge)
+        # Branches are shared by every site of the sheet: upsert instead of replacing
+        cur_branches = current.get(current_ranges[BRANCHES_SHEET], [])
+        if cur_branches:
+            targets[BRANCHES_SHEET] = _merged_by_id_values(cur_branches, branches_rows)
+
+    style_payload = json.dumps(graph.style_meta or {}, ensure_ascii=False, separators=(",", ":"))
+    targets[STYLE_META_SHEET] = [["style_meta", style_payload]]
+
+    # Every change goes out in one spreadsheets.batchUpdate, which is applied atomically:
+    # a failed save leaves the sheet untouched and readers never see a cleared tab.
+    gids, requests = _grid_requests(props, targets)
+    for title, values in targets.items():
+        gid = gids[title]
+        if title == STYLE_META_SHEET:
+            # Only A1:B1 belongs to the graph; the rest of STYLE_META is left alone
+            old = (current or {}).get(current_ranges[title], [])
+            requests.extend(_diff_tab_requests(gid, old, values, truncate=False))
+        elif current is None:
+            # Current contents unknown: replace the whole tab
+            requests.append(_replace_tab_request(gid, values))
+        else:
+            requests.extend(_diff_tab_requests(
+                gid,
+                current.get(current_ranges[title], []),
+                values,
+                grid=(props.get(title) or {}).get("gridProperties"),
+            ))
+    if not any("updateCells" in req or "deleteDimension" in req for req in requests):
+        return True
+    if revision is not None and read_spreadsheet_revision(sheet_id) != revision:
+        return False
+    svc.spreadsheets().batchUpdate(spreadsheetId=sheet_id, body={"requests": requests}).execute()
+    return True
 
 
 def read_plan_overlay_config(sheet_id: str, *, site_id: str | None = None) -> Optional[PlanOverlayConfig]:
@@ -0,0 +1,181 @@
+"""Cold-start benchmark: process start -> first successful GET /api/graph.
+
+Starts a local Sheets/Drive stand-in (``scripts/sheets_standin.py``), then launches
+``uvicorn app.main:app`` in a fresh process pointed at it through
+``GOOGLE_API_EMULATOR_HOST`` and polls ``/api/graph`` until it answers 200.
+
+Usage examples:
+    python scripts/cold_start_bench.py
+    python scripts/cold_start_bench.py --runs 5 --json
+    python scripts/cold_start_bench.py --check   # fail if above tests/fixtures/perf/cold_start_budget.json
+    python scripts/cold_start_bench.py --warmup  # startup warmup on: time to /readyz, then the first GET
+
+The recorded budget is deliberately loose (several times a typical run on a dev laptop):
+it is meant to catch regressions such as discovery fetches or heavy imports on the
+startup path, not to track small variations.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from sheets_standin import SheetsStandIn, sample_tabs  # noqa: E402
+
+BUDGET_PATH = REPO_ROOT / "tests" / "fixtures" / "perf" / "cold_start_budget.json"
+SHEET_ID = "cold-start-bench"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _child_env(emulator_url: str, *, warmup: bool = False) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "DATA_SOURCE": "sheet",
+            "SHEET_ID_DEFAULT": SHEET_ID,
+            "GOOGLE_API_EMULATOR_HOST": emulator_url,
+            "PYTHONPATH": str(REPO_ROOT),
+            # the recorded budget measures the first viewer of a cold instance
+            "WARMUP_SITES": "" if warmup else "none",
+        }
+    )
+    return env
+
+
+def _poll(proc: subprocess.Popen, url: str, started: float, timeout_s: float) -> None:
+    """Wait for a 200 on ``url`` (connection errors and 503 mean "not yet")."""
+    while True:
+        if proc.poll() is not None:
+            stderr = proc.stderr.read().decode("utf-8", "replace") if proc.stderr else ""
+            raise RuntimeError(f"server exited with code {proc.returncode}:\n{stderr}")
+        try:
+            with urllib.request.urlopen(url, timeout=5) as resp:
+                if resp.status == 200:
+                    json.loads(resp.read())
+                    return
+        except urllib.error.HTTPError as exc:
+            if exc.code != 503:
+                raise RuntimeError(f"{url} answered {exc.code}: {exc.read()[:500]!r}") from exc
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        if time.perf_counter() - started > timeout_s:
+            raise RuntimeError(f"no successful {url} response within {timeout_s}s")
+        time.sleep(0.01)
+
+
+def measure_once(emulator_url: str, *, warmup: bool = False, timeout_s: float = 60.0) -> Dict[str, float]:
+    """Milliseconds from spawning the server to its first 200 on /api/graph.
+
+    With ``warmup``, /readyz is awaited first and the first GET is also timed on its own.
+    """
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=str(REPO_ROOT),
+        env=_child_env(emulator_url, warmup=warmup),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        sample: Dict[str, float] = {}
+        if warmup:
+            _poll(proc, f"{base}/readyz", started, timeout_s)
+            sample["ready_ms"] = (time.perf_counter() - started) * 1000.0
+        get_started = time.perf_counter()
+        _poll(proc, f"{base}/api/graph", started, timeout_s)
+        sample["first_get_ms"] = (time.perf_counter() - get_started) * 1000.0
+        sample["total_ms"] = (time.perf_counter() - started) * 1000.0
+        return sample
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        if proc.stderr:
+            proc.stderr.close()
+
+
+def run(runs: int, *, warmup: bool = False) -> Dict[str, Any]:
+    with SheetsStandIn(sample_tabs()) as standin:
+        samples: List[Dict[str, float]] = [measure_once(standin.url, warmup=warmup) for _ in range(runs)]
+        upstream = list(standin.requests)
+    discovery = [path for path in upstream if "discovery" in path.lower()]
+    result: Dict[str, Any] = {
+        "runs_ms": [round(s["total_ms"], 1) for s in samples],
+        "cold_start_ms": round(statistics.median(s["total_ms"] for s in samples), 1),
+        "upstream_requests": len(upstream),
+        "discovery_requests": len(discovery),
+    }
+    if warmup:
+        result["ready_ms"] = round(statistics.median(s["ready_ms"] for s in samples), 1)
+        result["first_get_ms"] = round(statistics.median(s["first_get_ms"] for s in samples), 1)
+    return result
+
+
+def load_budget(path: Path = BUDGET_PATH) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def check(result: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    failures = []
+    if result["cold_start_ms"] > budget["cold_start_ms"]:
+        failures.append(f"cold start {result['cold_start_ms']} ms > budget {budget['cold_start_ms']} ms")
+    if result["discovery_requests"] > budget.get("max_discovery_requests", 0):
+        failures.append(f"{result['discovery_requests']} discovery document request(s) on the startup path")
+    return failures
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for GET /api/graph")
+    parser.add_argument("--runs", type=int, default=3, help="Number of fresh processes to time (median is reported)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when the recorded budget is exceeded")
+    parser.add_argument("--warmup", action="store_true", help="Enable the startup warmup and wait for /readyz before the first GET")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    result = run(max(1, args.runs), warmup=args.warmup)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"cold start: median {result['cold_start_ms']} ms over {args.runs} run(s) {result['runs_ms']}")
+        if args.warmup:
+            print(f"ready after {result['ready_ms']} ms, first GET then took {result['first_get_ms']} ms")
+        print(f"upstream requests: {result['upstream_requests']} (discovery: {result['discovery_requests']})")
+    if args.check:
+        failures = check(result, load_budget())
+        for failure in failures:
+            print(f"BUDGET EXCEEDED: {failure}", file=sys.stderr)
+        if failures:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Import-time report for the API process, based on ``python -X importtime``.
+
+Imports a module (``app.main`` by default) in a fresh interpreter and summarises the
+``-X importtime`` trace: the slowest modules by cumulative time and the total self time
+per top-level package. Heavy optional dependencies (Pillow, pypdfium2, googleapiclient,
+google-cloud-*) are expected to stay out of the startup path; ``--check`` fails when
+one of them is imported.
+
+Usage examples:
+    python scripts/import_time_report.py
+    python scripts/import_time_report.py --top 40 --module app.routers.api
+    python scripts/import_time_report.py --json > import-times.json
+    python scripts/import_time_report.py --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = [
+    "PIL",
+    "pypdfium2",
+    "googleapiclient",
+    "httplib2",
+    "google.cloud.bigquery",
+    "google.cloud.storage",
+]
+
+
+def collect(module: str) -> List[Dict[str, Any]]:
+    """Run ``-X importtime`` on ``module`` and return one record per imported module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(REPO_ROOT),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr}")
+
+    records: List[Dict[str, Any]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        records.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_us": int(parts[0]),
+                "cumulative_us": int(parts[1]),
+            }
+        )
+    return records
+
+
+def summarize(records: List[Dict[str, Any]], module: str, top: int) -> Dict[str, Any]:
+    per_package: Dict[str, int] = defaultdict(int)
+    for rec in records:
+        per_package[rec["module"].split(".")[0]] += rec["self_us"]
+    target = next((rec for rec in records if rec["module"] == module), None)
+    imported = {rec["module"] for rec in records}
+    return {
+        "module": module,
+        "total_ms": round((target["cumulative_us"] if target else sum(r["self_us"] for r in records)) / 1000, 1),
+        "modules_imported": len(records),
+        "slowest": [
+            {"module": rec["module"], "cumulative_ms": round(rec["cumulative_us"] / 1000, 1), "self_ms": round(rec["self_us"] / 1000, 1)}
+            for rec in sorted(records, key=lambda r: r["cumulative_us"], reverse=True)[:top]
+        ],
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000, 1)}
+            for name, us in sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        "heavy_imported": [name for name in HEAVY_MODULES if name in imported],
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-module import cost of the API process")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of rows per table")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a heavy optional dependency is imported")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    report = summarize(collect(args.module), args.module, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {report['module']}: {report['total_ms']} ms, {report['modules_imported']} modules")
+        print("\nSlowest modules (cumulative / self ms):")
+        for row in report["slowest"]:
+            print(f"  {row['cumulative_ms']:>9.1f} {row['self_ms']:>9.1f}  {row['module']}")
+        print("\nSelf time per top-level package (ms):")
+        for row in report["packages"]:
+            print(f"  {row['self_ms']:>9.1f}  {row['package']}")
+        print(f"\nHeavy optional modules imported: {', '.join(report['heavy_imported']) or 'none'}")
+    if args.check and report["heavy_imported"]:
+        print(f"Heavy modules on the startup path: {', '.join(report['heavy_imported'])}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
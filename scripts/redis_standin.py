@@ -0,0 +1,233 @@
+"""Minimal local stand-in for a Redis server, for ``CACHE_BACKEND=redis`` tests and dev.
+
+Point the app at it with ``CACHE_REDIS_URL=redis://127.0.0.1:<port>/0``. Only the
+commands issued by ``app/services/cache_backend.py`` are served:
+
+    PING, AUTH, SELECT, GET, SET key value [PX ms | EX s], DEL key..., SCAN cursor MATCH pattern [COUNT n],
+    PUBLISH channel message, SUBSCRIBE channel...
+
+Every command name is recorded in ``commands``; ``drop_subscribers()`` closes the
+subscribed connections so reconnect paths can be exercised, and ``hold(key)`` delays
+the replies of commands on ``key`` until the returned event is set.
+
+    python scripts/redis_standin.py --port 6379
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _glob_to_regex(pattern: bytes) -> "re.Pattern[bytes]":
+    out, i = [], 0
+    while i < len(pattern):
+        char = pattern[i:i + 1]
+        if char == b"\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1:i + 2]))
+            i += 2
+            continue
+        out.append(b".*" if char == b"*" else b"." if char == b"?" else re.escape(char))
+        i += 1
+    return re.compile(b"".join(out) + b"\\Z", re.DOTALL)
+
+
+class _Raw(bytes):
+    """Replies already encoded (several pushes answering one SUBSCRIBE)."""
+
+
+def _encode(value: Any) -> bytes:
+    if isinstance(value, _Raw):
+        return value
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
+    if isinstance(value, str):
+        return b"+" + value.encode("utf-8") + b"\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class RedisStandIn:
+    def __init__(self, *, port: int = 0) -> None:
+        self.commands: List[str] = []
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._subscribers: Dict[bytes, List[socket.socket]] = {}
+        self._held: Dict[bytes, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), self._handler(), bind_and_activate=False)
+        self._server.daemon_threads = True
+        self._server.allow_reuse_address = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "RedisStandIn":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            held = list(self._held.values())
+        for release in held:
+            release.set()
+        self.drop_subscribers()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "RedisStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def keys(self) -> List[bytes]:
+        with self._lock:
+            return [key for key in self._data if self._live(key)]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({id(sock) for socks in self._subscribers.values() for sock in socks})
+
+    def hold(self, key: bytes) -> threading.Event:
+        """Stall commands on ``key`` (other connections keep being served) until set."""
+        release = threading.Event()
+        with self._lock:
+            self._held[key] = release
+        return release
+
+    def drop_subscribers(self) -> None:
+        with self._lock:
+            socks = {id(sock): sock for socks in self._subscribers.values() for sock in socks}
+            self._subscribers.clear()
+        for sock in socks.values():
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _live(self, key: bytes) -> bool:
+        entry = self._data.get(key)
+        if entry is None:
+            return False
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return False
+        return True
+
+    def _execute(self, args: List[bytes], sock: socket.socket) -> Any:
+        name = args[0].upper().decode("ascii")
+        self.commands.append(name)
+        with self._lock:
+            release = self._held.get(args[1]) if len(args) > 1 else None
+        if release is not None:
+            release.wait(10)
+        with self._lock:
+            if name == "PING":
+                return "PONG"
+            if name in ("AUTH", "SELECT"):
+                return "OK"
+            if name == "GET":
+                return self._data[args[1]][0] if self._live(args[1]) else None
+            if name == "SET":
+                expires_at = None
+                options = [arg.upper() for arg in args[3::2]]
+                for option, value in zip(options, args[4::2]):
+                    scale = 1000.0 if option == b"PX" else 1.0
+                    expires_at = time.monotonic() + int(value) / scale
+                self._data[args[1]] = (args[2], expires_at)
+                return "OK"
+            if name == "DEL":
+                return sum(1 for key in args[1:] if self._live(key) and self._data.pop(key, None))
+            if name == "SCAN":
+                options = dict(zip([arg.upper() for arg in args[2::2]], args[3::2]))
+                regex = _glob_to_regex(options.get(b"MATCH", b"*"))
+                return [b"0", [key for key in list(self._data) if self._live(key) and regex.match(key)]]
+            if name == "PUBLISH":
+                message = _encode([b"message", args[1], args[2]])
+                receivers = list(self._subscribers.get(args[1], ()))
+            elif name == "SUBSCRIBE":
+                replies = []
+                for channel in args[1:]:
+                    subscribed = self._subscribers.setdefault(channel, [])
+                    if sock not in subscribed:
+                        subscribed.append(sock)
+                    replies.append(_encode([b"subscribe", channel, len(args) - 1]))
+                return _Raw(b"".join(replies))
+            else:
+                return ValueError(f"ERR unknown command '{name}'")
+        delivered = 0
+        for receiver in receivers:
+            try:
+                receiver.sendall(message)
+                delivered += 1
+            except OSError:
+                pass
+        return delivered
+
+    def _forget(self, sock: socket.socket) -> None:
+        with self._lock:
+            for socks in self._subscribers.values():
+                if sock in socks:
+                    socks.remove(sock)
+
+    def _handler(self):
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                try:
+                    while True:
+                        args = self._read_command()
+                        if args is None:
+                            return
+                        reply = standin._execute(args, self.request)
+                        if isinstance(reply, ValueError):
+                            self.wfile.write(b"-" + str(reply).encode("utf-8") + b"\r\n")
+                        else:
+                            self.wfile.write(_encode(reply))
+                except OSError:
+                    pass
+                finally:
+                    standin._forget(self.request)
+
+            def _read_command(self) -> Optional[List[bytes]]:
+                line = self.rfile.readline()
+                if not line.startswith(b"*"):
+                    return None
+                args = []
+                for _ in range(int(line[1:])):
+                    size = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(size + 2)[:-2])
+                return args
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+    standin = RedisStandIn(port=args.port)
+    print(f"Redis stand-in listening on {standin.url}")
+    standin.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
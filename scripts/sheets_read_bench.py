@@ -0,0 +1,133 @@
+"""Parse-time benchmark for Sheets graph reads on a synthetic tab.
+
+Builds a Nodes tab (and a chained Edges tab) of ``--rows`` rows in two flavours and
+times ``app.sheets._graph_from_values`` on each:
+
+    formatted    cells as FORMATTED_VALUE returns them ("12,5", "TRUE", "15/03/2023")
+    unformatted  cells as UNFORMATTED_VALUE + SERIAL_NUMBER return them (floats, bools, serials)
+
+No network is involved: the numbers isolate the per-cell conversion cost that
+``read_nodes_edges`` pays after the batchGet.
+
+Usage examples:
+    python scripts/sheets_read_bench.py
+    python scripts/sheets_read_bench.py --rows 50000 --repeat 5 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.sheets import (  # noqa: E402
+    EDGE_HEADERS_FR_V6,
+    EXTRA_SHEET_HEADERS,
+    NODE_HEADERS_FR_V11,
+    _graph_from_values,
+)
+
+NODE_HEADER = NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS
+EDGE_HEADER = EDGE_HEADERS_FR_V6 + ["created_at"]
+
+
+def _fr_number(value: float) -> str:
+    return f"{value:,.2f}".replace(",", " ").replace(".", ",")
+
+
+def synthetic_tabs(rows: int, *, formatted: bool) -> Dict[str, List[List[Any]]]:
+    """``{range: values}`` as returned by ``_batch_get_values`` for a ``rows``-node site."""
+    col = {name: i for i, name in enumerate(NODE_HEADER)}
+    node_rows: List[List[Any]] = [list(NODE_HEADER)]
+    for i in range(rows):
+        row: List[Any] = [""] * len(NODE_HEADER)
+        lat, lon, x, y = 48.0 + i * 1e-5, 2.0 + i * 1e-5, 1000.0 + i * 3.5, 2000.0 + i * 1.25
+        row[col["id"]] = f"N{i}"
+        row[col["nom"]] = f"Ouvrage {i}"
+        row[col["type"]] = "CANALISATION" if i % 3 == 0 else "OUVRAGE"
+        row[col["id_branche"]] = f"B-{i % 20}"
+        row[col["idSite1"]] = f"SITE-{i % 4}"
+        if formatted:
+            row[col["gps_locked"]] = "TRUE"
+            row[col["pm_offset_m"]] = _fr_number(i % 50 / 4)
+            row[col["diametre_exterieur_mm"]] = "110"
+            row[col["gps_lat"]], row[col["gps_lon"]] = _fr_number(lat), _fr_number(lon)
+            row[col["x"]], row[col["y"]] = _fr_number(x), _fr_number(y)
+            row[col["x_UI"]], row[col["y_UI"]] = _fr_number(x), _fr_number(y)
+        else:
+            row[col["gps_locked"]] = True
+            row[col["pm_offset_m"]] = i % 50 / 4
+            row[col["diametre_exterieur_mm"]] = 110
+            row[col["gps_lat"]], row[col["gps_lon"]] = lat, lon
+            row[col["x"]], row[col["y"]] = x, y
+            row[col["x_UI"]], row[col["y_UI"]] = x, y
+        node_rows.append(row)
+
+    edge_rows: List[List[Any]] = [list(EDGE_HEADER)]
+    for i in range(rows - 1):
+        length = 5.0 + i % 40
+        edge_rows.append([
+            f"E{i}", f"N{i}", f"N{i + 1}", f"B-{i % 20}", "",
+            "110" if formatted else 110,
+            "PVC",
+            "17" if formatted else 17,
+            _fr_number(length) if formatted else length,
+            "TRUE" if formatted else True,
+            "",
+            "",
+            "2023-03-15 12:00:00" if formatted else 45000.5,
+        ])
+
+    return {
+        "Nodes!A:ZZZ": node_rows,
+        "Edges!A:ZZZ": edge_rows,
+    }
+
+
+def time_parse(fetched: Dict[str, List[List[Any]]], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _graph_from_values(fetched, "Nodes", "Edges")
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+def run(rows: int, repeat: int) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"rows": rows, "repeat": repeat}
+    for flavour in ("formatted", "unformatted"):
+        samples = time_parse(synthetic_tabs(rows, formatted=flavour == "formatted"), repeat)
+        result[f"{flavour}_ms"] = round(statistics.median(samples), 1)
+    result["speedup"] = round(result["formatted_ms"] / result["unformatted_ms"], 2) if result["unformatted_ms"] else None
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sheets graph parse-time benchmark (formatted vs unformatted cells)")
+    parser.add_argument("--rows", type=int, default=20000, help="Nodes rows in the synthetic tab (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed parses per flavour (median is reported)")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    result = run(max(2, args.rows), max(1, args.repeat))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['rows']} rows, median of {result['repeat']}:")
+        print(f"  formatted   {result['formatted_ms']:>9.1f} ms")
+        print(f"  unformatted {result['unformatted_ms']:>9.1f} ms  (x{result['speedup']})")
+
+
+if __name__ == "__main__":
+    main()
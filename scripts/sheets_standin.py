@@ -0,0 +1,135 @@
+"""Minimal local stand-in for the Sheets v4 / Drive v3 endpoints used by the app.
+
+Point the app at it with ``GOOGLE_API_EMULATOR_HOST=http://127.0.0.1:<port>``.
+Only the calls issued by ``app/sheets.py`` on the read path are served:
+
+    GET /v4/spreadsheets/{id}/values:batchGet?ranges=Tab!A:ZZZ&...   (whole tab, whatever the range)
+    GET /v4/spreadsheets/{id}              (sheet titles and grid sizes)
+    GET /drive/v3/files/{id}               (revision check)
+
+Every request path is recorded in ``requests`` so callers can assert on upstream traffic.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+class SheetsStandIn:
+    def __init__(self, tabs: Dict[str, List[List[str]]], *, revision: str = "1") -> None:
+        self.tabs = tabs
+        self.revision = revision
+        self.requests: List[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "SheetsStandIn":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SheetsStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _record(self, path: str) -> None:
+        with self._lock:
+            self.requests.append(path)
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:  # keep benchmark output clean
+                pass
+
+            def _send(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                parsed = urllib.parse.urlparse(self.path)
+                standin._record(parsed.path)
+                query = urllib.parse.parse_qs(parsed.query)
+                parts = [urllib.parse.unquote(p) for p in parsed.path.strip("/").split("/")]
+
+                if parts[:2] == ["v4", "spreadsheets"] and len(parts) == 4 and parts[3] == "values:batchGet":
+                    ranges = query.get("ranges", [])
+                    missing = [r for r in ranges if r.split("!")[0] not in standin.tabs]
+                    if missing:
+                        self._send(400, {"error": {"code": 400, "message": f"Unable to parse range: {missing[0]}"}})
+                        return
+                    value_ranges = [
+                        {"range": r, "majorDimension": "ROWS", "values": standin.tabs[r.split("!")[0]]}
+                        for r in ranges
+                    ]
+                    self._send(200, {"spreadsheetId": parts[2], "valueRanges": value_ranges})
+                    return
+
+                if parts[:2] == ["v4", "spreadsheets"] and len(parts) == 3:
+                    sheets = [
+                        {
+                            "properties": {
+                                "sheetId": index,
+                                "title": title,
+                                "gridProperties": {
+                                    "rowCount": max(len(rows), 1000),
+                                    "columnCount": max([len(row) for row in rows] + [26]),
+                                },
+                            }
+                        }
+                        for index, (title, rows) in enumerate(standin.tabs.items())
+                    ]
+                    self._send(200, {"spreadsheetId": parts[2], "sheets": sheets})
+                    return
+
+                if parts[:3] == ["drive", "v3", "files"] and len(parts) == 4:
+                    self._send(200, {"id": parts[3], "version": standin.revision})
+                    return
+
+                self._send(404, {"error": {"code": 404, "message": f"not served by stand-in: {parsed.path}"}})
+
+        return Handler
+
+
+def sample_tabs(nodes: int = 50) -> Dict[str, List[List[str]]]:
+    """Small two-site network laid out with the app's own Sheet headers."""
+    from app.sheets import EDGE_HEADERS_FR_V6, EXTRA_SHEET_HEADERS, NODE_HEADERS_FR_V11
+
+    node_rows: List[List[str]] = [NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS]
+    for i in range(nodes):
+        row = [""] * (len(NODE_HEADERS_FR_V11) + len(EXTRA_SHEET_HEADERS))
+        row[0] = f"N{i}"
+        row[2] = "OUVRAGE"
+        row[len(NODE_HEADERS_FR_V11)] = "SITE-A" if i % 2 == 0 else "SITE-B"
+        node_rows.append(row)
+
+    edge_rows: List[List[str]] = [list(EDGE_HEADERS_FR_V6)]
+    for i in range(nodes - 1):
+        row = [""] * len(EDGE_HEADERS_FR_V6)
+        row[0], row[1], row[2], row[3] = f"E{i}", f"N{i}", f"N{i + 1}", "B-1"
+        edge_rows.append(row)
+
+    return {"Nodes": node_rows, "Edges": edge_rows}
+
+
+__all__ = ["SheetsStandIn", "sample_tabs"]
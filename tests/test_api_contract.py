@@ -54,6 +54,44 @@ class APIGraphContractTests(unittest.TestCase):
         self.assertEqual(edge["branch_id"], "B-1")
         self.assertEqual(edge["diameter_mm"], 90.0)
 
+    @patch("app.routers.api.load_graph")
+    def test_get_honours_if_none_match(self, mock_load):
+        mock_load.side_effect = lambda **kwargs: Graph(
+            site_id="c034bf83",
+            nodes=[Node(id="N1", name="Source", branch_id="B-ROOT")],
+        )
+
+        first = self.client.get("/api/graph")
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers.get("etag")
+        self.assertTrue(etag)
+        self.assertEqual(first.headers.get("cache-control"), "no-cache")
+
+        revalidated = self.client.get("/api/graph", headers={"If-None-Match": etag})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.headers.get("etag"), etag)
+        self.assertEqual(revalidated.content, b"")
+
+        weak = self.client.get("/api/graph", headers={"If-None-Match": f'"other", W/{etag}'})
+        self.assertEqual(weak.status_code, 304)
+
+        mismatch = self.client.get("/api/graph", headers={"If-None-Match": '"stale"'})
+        self.assertEqual(mismatch.status_code, 200)
+        self.assertEqual(mismatch.headers.get("etag"), etag)
+
+    @patch("app.routers.api.load_graph")
+    def test_get_flags_stale_graphs_with_their_age(self, mock_load):
+        stale = Graph(site_id="c034bf83", nodes=[Node(id="N1", name="Source", branch_id="B-ROOT")])
+        stale._cache_age_s = 75.6
+        mock_load.return_value = stale
+
+        response = self.client.get("/api/graph")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.headers.get("x-graph-stale"), response.headers.get("age")), ("1", "75"))
+
+        mock_load.return_value = Graph(site_id="c034bf83")
+        self.assertIsNone(self.client.get("/api/graph").headers.get("x-graph-stale"))
+
     @patch("app.routers.api.save_graph")
     def test_post_accepts_frontend_sanitized_payload(self, mock_save):
         captured = {}
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.datasources import load_graph_async
+from app.main import app
+from app.models import Graph, Node
+from app.services import google_async
+from app.services.graph_cache import graph_cache
+from app.sheets import EDGE_HEADERS_FR_V6, EXTRA_SHEET_HEADERS, NODE_HEADERS_FR_V11, reset_layout_cache
+
+
+def _tabs():
+    node = [""] * (len(NODE_HEADERS_FR_V11) + len(EXTRA_SHEET_HEADERS))
+    node[0], node[2], node[len(NODE_HEADERS_FR_V11)] = "N1", "OUVRAGE", "S1"
+    other = list(node)
+    other[0] = "N2"
+    edge = [""] * len(EDGE_HEADERS_FR_V6)
+    edge[0], edge[1], edge[2], edge[3] = "E1", "N1", "N2", "B-1"
+    return {
+        "Nodes": [NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS, node, other],
+        "Edges": [EDGE_HEADERS_FR_V6, edge],
+    }
+
+
+class _StandIn:
+    """httpx handler answering the Sheets batchGet / spreadsheets.get / Drive files.get calls."""
+
+    def __init__(self, tabs, revision="5"):
+        self.tabs = tabs
+        self.revision = revision
+        self.paths = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.paths.append(path)
+        if path.endswith("values:batchGet"):
+            ranges = request.url.params.get_list("ranges")
+            missing = [r for r in ranges if r.split("!")[0] not in self.tabs]
+            if missing:
+                return httpx.Response(400, json={"error": {"code": 400, "message": f"Unable to parse range: {missing[0]}"}})
+            return httpx.Response(200, json={"valueRanges": [{"range": r, "values": self.tabs[r.split("!")[0]]} for r in ranges]})
+        if path.startswith("/drive/v3/files/"):
+            return httpx.Response(200, json={"version": self.revision})
+        if path.startswith("/v4/spreadsheets/"):
+            return httpx.Response(200, json={"sheets": [
+                {"properties": {"title": t, "gridProperties": {"rowCount": len(rows), "columnCount": len(rows[0])}}}
+                for t, rows in self.tabs.items()
+            ]})
+        return httpx.Response(404, json={"error": {"message": path}})
+
+
+class AsyncLoadGraphTests(unittest.TestCase):
+    def setUp(self):
+        graph_cache.clear()
+        self.addCleanup(graph_cache.clear)
+        reset_layout_cache()
+        self.addCleanup(reset_layout_cache)
+        self.standin = _StandIn(_tabs())
+        patches = [
+            patch.object(google_async.settings, "google_api_emulator_host", "http://standin"),
+            patch(
+                "app.services.google_async._new_client",
+                side_effect=lambda: httpx.AsyncClient(transport=httpx.MockTransport(self.standin)),
+            ),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_reads_sheet_through_async_client_and_caches(self):
+        async def scenario():
+            first = await load_graph_async(source="sheet", sheet_id="sheet-1", site_id="S1")
+            second = await load_graph_async(source="sheet", sheet_id="sheet-1", site_id="S1")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        self.assertEqual([n.id for n in first.nodes], ["N1", "N2"])
+        self.assertEqual([e.id for e in first.edges], ["E1"])
+        self.assertEqual(second.model_dump(), first.model_dump())
+        batch_gets = [p for p in self.standin.paths if p.endswith("values:batchGet")]
+        # The revision comes first, so the grid sizes give exact ranges of the existing tabs
+        self.assertEqual(len(batch_gets), 1)
+        self.assertEqual(sum(p.startswith("/drive/v3/files/") for p in self.standin.paths), 1)
+        self.assertEqual(graph_cache.stats()["entries"], 1)
+
+    def test_revision_is_read_before_the_tabs(self):
+        standin = self.standin
+
+        def edit_during_read(request):
+            if request.url.path.endswith("values:batchGet"):
+                standin.revision = "6"  # a save lands while the tabs are read
+            return _StandIn.__call__(standin, request)
+
+        with patch("app.services.google_async._new_client", side_effect=lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(edit_during_read)
+        )), patch("app.config.settings.sheets_revision_check", True):
+            asyncio.run(load_graph_async(source="sheet", sheet_id="sheet-1", site_id="S1"))
+
+        revision_call = next(i for i, p in enumerate(standin.paths) if p.startswith("/drive/v3/files/"))
+        first_read = next(i for i, p in enumerate(standin.paths) if p.endswith("values:batchGet"))
+        self.assertLess(revision_call, first_read)
+        # the older revision is stored: the next revalidation re-reads instead of renewing
+        (key,) = list(graph_cache._entries)
+        self.assertEqual(graph_cache.revision_of(key), "5")
+
+    def test_missing_nodes_tab_maps_to_http_error(self):
+        from fastapi import HTTPException
+
+        del self.standin.tabs["Nodes"]
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(load_graph_async(source="sheet", sheet_id="sheet-1"))
+        self.assertEqual(ctx.exception.status_code, 500)
+        self.assertIn("read_nodes_failed", ctx.exception.detail)
+
+
+class AsyncRouteTests(unittest.TestCase):
+    def test_get_graph_uses_async_layer_when_enabled(self):
+        graph = Graph(site_id="S1", nodes=[Node(id="N1")])
+
+        async def fake_load(**kwargs):
+            return graph
+
+        with patch("app.routers.api.settings.async_datasources", True), \
+                patch("app.routers.api.load_graph_async", side_effect=fake_load) as load_async, \
+                patch("app.routers.api.load_graph") as load_sync:
+            response = TestClient(app).get("/api/graph", params={"site_id": "S1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["nodes"][0]["id"], "N1")
+        load_async.assert_called_once()
+        load_sync.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,241 @@
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.models import Graph, Node, PlanOverlayMedia
+from app.services.cache_backend import CacheBackend, DiskBackend, MemoryBackend, RedisBackend
+from app.services.graph_cache import GraphCache, GraphCacheKey
+from app.services.plan_overlay import PlanOverlayMediaService
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+from redis_standin import RedisStandIn  # noqa: E402
+
+KEY = GraphCacheKey(source="sheet", document="sheet-1", tabs=("Nodes", "Edges"), site_id="S1", normalize=False)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+class _BackendContract:
+    """Checks every backend must pass; ``make_backend`` returns a fresh instance."""
+
+    def make_backend(self):
+        raise NotImplementedError
+
+    def test_entries_expire_and_are_dropped_by_prefix(self):
+        backend = self.make_backend()
+        backend.set("graph:a:1", b"one", 60)
+        backend.set("graph:a:2", b"two\nlines", 60)
+        backend.set("graph:b:1", b"three", 60)
+        backend.set("graph:short", b"gone", 0.01)
+        time.sleep(0.05)
+
+        self.assertEqual(backend.get("graph:a:2"), b"two\nlines")
+        self.assertIsNone(backend.get("graph:short"))
+        self.assertEqual(backend.delete_prefix("graph:a:"), 2)
+        self.assertIsNone(backend.get("graph:a:1"))
+        self.assertEqual(backend.get("graph:b:1"), b"three")
+
+
+class CacheBackendInterfaceTests(unittest.TestCase):
+    def test_incomplete_backend_fails_when_created(self):
+        class NoEvents(CacheBackend):
+            def get(self, key):
+                return None
+
+            def set(self, key, value, ttl_s):
+                pass
+
+            def delete_prefix(self, prefix):
+                return 0
+
+        with self.assertRaises(TypeError):
+            NoEvents()
+
+
+class MemoryBackendTests(_BackendContract, unittest.TestCase):
+    def make_backend(self):
+        return MemoryBackend()
+
+
+class DiskBackendTests(_BackendContract, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def make_backend(self):
+        backend = DiskBackend(self.directory.name)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_event_log_is_rotated_and_followers_resync(self):
+        received = []
+        listener, publisher = self.make_backend(), self.make_backend()
+        listener.subscribe("graph-invalidate", received.append)
+        with patch("app.services.cache_backend._DISK_EVENTS_MAX_BYTES", 200):
+            for index in range(3):
+                publisher.publish("graph-invalidate", f"{index}" * 80)
+            self.assertTrue(_wait_for(lambda: None in received))
+            publisher.publish("graph-invalidate", "after")
+            self.assertTrue(_wait_for(lambda: received[-1:] == ["after"]))
+        self.assertLessEqual(Path(self.directory.name, "events.log").stat().st_size, 200)
+        self.assertGreaterEqual(publisher.stats()["log_rotations"], 1)
+
+    def test_events_reach_other_processes_sharing_the_directory(self):
+        received = []
+        listener, publisher = self.make_backend(), self.make_backend()
+        listener.subscribe("graph-invalidate", received.append)
+        publisher.publish("graph-invalidate", "sheet-1")
+        publisher.publish("other", "ignored")
+        self.assertTrue(_wait_for(lambda: received == ["sheet-1"]))
+        self.assertEqual(publisher.get("missing"), None)
+
+
+class RedisBackendTests(_BackendContract, unittest.TestCase):
+    def setUp(self):
+        self.server = RedisStandIn().start()
+        self.addCleanup(self.server.stop)
+
+    def make_backend(self):
+        backend = RedisBackend(self.server.url)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_keys_are_namespaced_and_prefixes_escaped(self):
+        backend = self.make_backend()
+        backend.set('graph:["sheet","a*",', b"1", 60)
+        backend.set('graph:["sheet","ab",', b"2", 60)
+        self.assertEqual(backend.delete_prefix('graph:["sheet","a*"'), 1)
+        self.assertEqual(self.server.keys(), [b'editeur-reseau:graph:["sheet","ab",'])
+
+    def test_subscription_survives_a_lost_connection(self):
+        received = []
+        listener, publisher = self.make_backend(), self.make_backend()
+        with patch("app.services.cache_backend._REDIS_RETRY_S", (0.01, 0.05)):
+            listener.subscribe("graph-invalidate", received.append)
+            self.assertTrue(_wait_for(lambda: self.server.subscriber_count() == 1))
+            publisher.publish("graph-invalidate", "first")
+            self.assertTrue(_wait_for(lambda: received == ["first"]))
+
+            self.server.drop_subscribers()
+            # None: events may have been missed while disconnected
+            self.assertTrue(_wait_for(lambda: received == ["first", None]))
+            self.assertTrue(_wait_for(lambda: self.server.subscriber_count() == 1))
+            publisher.publish("graph-invalidate", "second")
+            self.assertTrue(_wait_for(lambda: received == ["first", None, "second"]))
+        self.assertEqual(listener.stats()["resubscribed"], 1)
+
+    def test_slow_reply_does_not_hold_up_other_commands(self):
+        backend = self.make_backend()
+        backend.set("slow", b"1", 60)
+        release = self.server.hold(b"editeur-reseau:slow")
+        self.addCleanup(release.set)
+        slow = threading.Thread(target=backend.get, args=("slow",))
+        slow.start()
+        self.assertTrue(_wait_for(lambda: self.server.commands.count("GET") == 1))
+
+        started = time.monotonic()
+        backend.set("other", b"2", 60)
+        self.assertEqual(backend.get("other"), b"2")
+        self.assertLess(time.monotonic() - started, 1.0)
+        release.set()
+        slow.join(5)
+        self.assertEqual(backend.stats()["idle_connections"], 2)
+
+    def test_unreachable_server_degrades_to_misses(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        backend = RedisBackend(f"redis://127.0.0.1:{port}/0")
+        backend.set("graph:a", b"1", 60)
+        self.assertIsNone(backend.get("graph:a"))
+        self.assertEqual(backend.stats()["errors"], 2)
+
+
+class SharedGraphCacheTests(unittest.TestCase):
+    """Two instances (two caches, two connections) in front of one Redis stand-in."""
+
+    def setUp(self):
+        self.server = RedisStandIn().start()
+        self.addCleanup(self.server.stop)
+        self.instances = []
+        for _ in range(2):
+            backend = RedisBackend(self.server.url)
+            self.addCleanup(backend.close)
+            self.instances.append(GraphCache(ttl_s=60, max_entries=10, max_bytes=0, backend=backend))
+
+    def test_graph_loaded_by_one_instance_is_warm_for_the_other(self):
+        first, second = self.instances
+        first.put(KEY, Graph(nodes=[Node(id="N1")]), revision="7")
+
+        graph = second.get(KEY)
+        self.assertEqual([node.id for node in graph.nodes], ["N1"])
+        self.assertEqual(second.revision_of(KEY), "7")
+        self.assertEqual(graph._etag, first.get(KEY)._etag)
+        self.assertEqual(second.stats()["shared_hits"], 1)
+
+    def test_save_on_one_instance_invalidates_the_others(self):
+        first, second = self.instances
+        dropped = threading.Event()
+        second.listen(lambda source, document: dropped.set())
+        self.assertTrue(_wait_for(lambda: self.server.subscriber_count() == 1))
+        first.put(KEY, Graph(nodes=[Node(id="N1")]))
+        self.assertIsNotNone(second.get(KEY))
+
+        first.invalidate("sheet", "sheet-1")
+        self.assertTrue(dropped.wait(5))
+        self.assertIsNone(second.get(KEY))
+        self.assertEqual(self.server.keys(), [])
+        self.assertEqual(second.stats()["remote_invalidations"], 1)
+
+    def test_invalidation_racing_the_shared_set_wins(self):
+        first, second = self.instances
+        generation = first.generation("sheet", "sheet-1")
+        set_entry = first.backend.set
+
+        def invalidated_before_set(*args):
+            # the save's invalidation lands after put checked the generation
+            first.invalidate("sheet", "sheet-1")
+            set_entry(*args)
+
+        with patch.object(first.backend, "set", side_effect=invalidated_before_set):
+            self.assertFalse(first.put(KEY, Graph(nodes=[Node(id="N1")]), generation=generation))
+        self.assertEqual(self.server.keys(), [])
+        self.assertIsNone(second.get(KEY))
+
+    def test_process_local_backend_is_not_used_as_a_second_tier(self):
+        cache = GraphCache(ttl_s=60, max_entries=10, max_bytes=0, backend=MemoryBackend())
+        self.assertIsNone(cache.backend)
+
+
+class PlanOverlayMediaSharingTests(unittest.TestCase):
+    def test_converted_media_is_downloaded_once_across_instances(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        downloads = []
+
+        def download(file_id, *, transparent):
+            downloads.append(file_id)
+            return b"\x89PNG\nbytes", "image/png"
+
+        media = PlanOverlayMedia(drive_file_id="plan", type="application/pdf", source="drive")
+        for _ in range(2):
+            service = PlanOverlayMediaService(backend=DiskBackend(directory.name))
+            service._download_drive = download  # type: ignore[assignment]
+            self.assertEqual(service.fetch_media(media, transparent=False)[:2], (b"\x89PNG\nbytes", "image/png"))
+        self.assertEqual(downloads, ["plan"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BENCH = REPO_ROOT / "scripts" / "cold_start_bench.py"
+BUDGET = REPO_ROOT / "tests" / "fixtures" / "perf" / "cold_start_budget.json"
+
+
+class ColdStartBudgetTests(unittest.TestCase):
+    def test_first_graph_response_within_recorded_budget(self):
+        proc = subprocess.run(
+            [sys.executable, str(BENCH), "--runs", "1", "--json"],
+            cwd=str(REPO_ROOT),
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        budget = json.loads(BUDGET.read_text(encoding="utf-8"))
+
+        self.assertEqual(result["discovery_requests"], budget["max_discovery_requests"])
+        self.assertLessEqual(result["cold_start_ms"], budget["cold_start_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
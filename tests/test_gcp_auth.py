@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from app import gcp_auth
+
+
+class _FakeCredentials:
+    def __init__(self, expires_in: timedelta | None):
+        self.token = "token-0" if expires_in is not None else None
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.expiry = now + expires_in if expires_in is not None else None
+        self.refresh_started = threading.Event()
+        self.release = threading.Event()
+        self.refresh_calls = 0
+
+    @property
+    def valid(self):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return self.token is not None and (self.expiry is None or self.expiry > now)
+
+    def refresh(self, request):
+        self.refresh_calls += 1
+        self.refresh_started.set()
+        self.release.wait(5)
+        self.token = f"token-{self.refresh_calls}"
+        self.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class CredentialCacheTests(unittest.TestCase):
+    def setUp(self):
+        gcp_auth.reset_credentials_cache()
+        self.addCleanup(gcp_auth.reset_credentials_cache)
+
+    def test_credentials_are_cached_per_scope_set(self):
+        minted = []
+
+        def fake_default(scopes):
+            creds = _FakeCredentials(timedelta(hours=1))
+            minted.append((tuple(scopes), creds))
+            return creds, "project"
+
+        with patch("google.auth.default", side_effect=fake_default):
+            first = gcp_auth.get_credentials(["scope-b", "scope-a"])
+            second = gcp_auth.get_credentials(["scope-a", "scope-b"])
+            other = gcp_auth.get_credentials(["scope-c"])
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(len(minted), 2)
+
+    def test_expiring_token_is_refreshed_in_background(self):
+        creds = _FakeCredentials(timedelta(minutes=1))
+        with patch("google.auth.default", return_value=(creds, "project")):
+            returned = gcp_auth.get_credentials(["scope-a"])
+            # The caller gets the current token immediately while the refresh is pending
+            self.assertTrue(creds.refresh_started.wait(5))
+            self.assertEqual(returned.token, "token-0")
+            gcp_auth.get_credentials(["scope-a"])
+            creds.release.set()
+
+        for _ in range(100):
+            if creds.token == "token-1":
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(creds.token, "token-1")
+        self.assertEqual(creds.refresh_calls, 1)
+        # the next refresh is already scheduled five minutes ahead of the new expiry
+        (entry,) = gcp_auth._cache.values()
+        self.assertTrue(_wait_for(lambda: entry.timer is not None and entry.timer.interval > 50 * 60))
+
+    def test_transport_refreshes_are_serialised(self):
+        creds = _FakeCredentials(timedelta(hours=1))
+        with patch("google.auth.default", return_value=(creds, "project")):
+            shared = gcp_auth.get_credentials(["scope-a"])
+        creds.expiry = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=1)
+
+        # every pooled service shares the object: their transports refresh it at once
+        threads = [threading.Thread(target=shared.refresh, args=(None,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(creds.refresh_started.wait(5))
+        creds.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(creds.refresh_calls, 1)
+
+    def test_slow_mint_does_not_block_other_scopes(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def fake_default(scopes):
+            if scopes == ["scope-slow"]:
+                release.wait(5)
+            return _FakeCredentials(timedelta(hours=1)), "project"
+
+        with patch("google.auth.default", side_effect=fake_default):
+            slow = threading.Thread(target=gcp_auth.get_credentials, args=(["scope-slow"],))
+            slow.start()
+            started = time.monotonic()
+            gcp_auth.get_credentials(["scope-a"])
+            self.assertLess(time.monotonic() - started, 1.0)
+            release.set()
+            slow.join(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
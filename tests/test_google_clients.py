@@ -0,0 +1,73 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import google_clients
+
+
+class GoogleClientsPoolTests(unittest.TestCase):
+    def setUp(self):
+        google_clients.reset_pool()
+        self.addCleanup(google_clients.reset_pool)
+
+    def test_services_are_reused_per_thread(self):
+        built = []
+
+        def fake_build(api, version, scopes):
+            built.append((api, version, threading.get_ident()))
+            return object()
+
+        with patch("app.services.google_clients._build_service", side_effect=fake_build):
+            before = google_clients.pool_stats()
+            first = google_clients.get_sheets_service()
+            second = google_clients.get_sheets_service()
+            drive = google_clients.get_service("drive", "v3", ["https://www.googleapis.com/auth/drive"])
+
+            other = {}
+            worker = threading.Thread(target=lambda: other.setdefault("svc", google_clients.get_sheets_service()))
+            worker.start()
+            worker.join()
+            after = google_clients.pool_stats()
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, drive)
+        self.assertIsNot(first, other["svc"])
+        self.assertEqual(len(built), 3)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["misses"] - before["misses"], 3)
+
+    def test_counted_calls_counts_the_requests_sent(self):
+        import httplib2
+
+        reply = (httplib2.Response({"status": "200"}), b"{}")
+        with patch("app.config.settings.google_api_emulator_host", "http://localhost:9"), \
+                patch("httplib2.Http.request", return_value=reply) as request:
+            service = google_clients.get_sheets_service()
+            with google_clients.counted_calls() as outer:
+                service.spreadsheets().get(spreadsheetId="sheet-1").execute()
+                with google_clients.counted_calls() as inner:
+                    service.spreadsheets().values().get(spreadsheetId="sheet-1", range="Nodes").execute()
+                    service.spreadsheets().values().get(spreadsheetId="sheet-1", range="Edges").execute()
+                self.assertEqual(inner(), 2)
+            # nested calls still count towards the enclosing scope
+            self.assertEqual(outer(), 3)
+        self.assertEqual(request.call_count, 3)
+
+    def test_metrics_endpoint_reports_pool_counters(self):
+        client = TestClient(app)
+        with patch("app.config.settings.admin_token", "secret"):
+            self.assertEqual(client.get("/metrics").status_code, 403)
+            self.assertEqual(client.get("/metrics", headers={"X-Admin-Token": "wrong"}).status_code, 403)
+            response = client.get("/metrics", headers={"X-Admin-Token": "secret"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn("hits", data["google_clients"])
+        self.assertIn("misses", data["google_clients"])
+        self.assertIn("entries", data["graph_cache"])
+
+
+if __name__ == "__main__":
+    unittest.main()
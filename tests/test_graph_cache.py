@@ -0,0 +1,237 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from app.datasources import load_graph, save_graph, write_prepared_graph
+from app.models import Edge, Graph, Node
+from app.services.graph_cache import GraphCache, GraphCacheKey, compute_graph_etag, graph_cache, graph_etag
+
+
+def _key(site: str = "SITE-A", document: str = "sheet-1") -> GraphCacheKey:
+    return GraphCacheKey(source="sheet", document=document, tabs=("Nodes", "Edges"), site_id=site, normalize=False)
+
+
+def _json_key(uri: str) -> GraphCacheKey:
+    return GraphCacheKey(source="gcs_json", document=uri, tabs=(), site_id="", normalize=False)
+
+
+def _graph(site: str = "SITE-A", nodes: int = 1) -> Graph:
+    return Graph(site_id=site, nodes=[Node(id=f"N{i}") for i in range(nodes)])
+
+
+class GraphCacheTests(unittest.TestCase):
+    def test_get_returns_independent_copies(self):
+        cache = GraphCache(ttl_s=60, max_entries=4, max_bytes=0)
+        cache.put(_key(), _graph())
+
+        first = cache.get(_key())
+        first.nodes.append(Node(id="MUTATED"))
+        second = cache.get(_key())
+
+        self.assertEqual([n.id for n in second.nodes], ["N0"])
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_entries_expire_after_ttl(self):
+        cache = GraphCache(ttl_s=10, max_entries=4, max_bytes=0)
+        with patch("app.services.graph_cache.time.monotonic", return_value=100.0):
+            cache.put(_key(), _graph())
+        with patch("app.services.graph_cache.time.monotonic", return_value=109.0):
+            self.assertIsNotNone(cache.get(_key()))
+        with patch("app.services.graph_cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get(_key()))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction_on_entry_budget(self):
+        cache = GraphCache(ttl_s=60, max_entries=2, max_bytes=0)
+        cache.put(_key("A"), _graph("A"))
+        cache.put(_key("B"), _graph("B"))
+        cache.get(_key("A"))  # A becomes most recently used
+        cache.put(_key("C"), _graph("C"))
+
+        self.assertIsNotNone(cache.get(_key("A")))
+        self.assertIsNone(cache.get(_key("B")))
+        self.assertIsNotNone(cache.get(_key("C")))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_budget_evicts_and_skips_oversized_graphs(self):
+        small = len(_graph("A").model_dump_json())
+        cache = GraphCache(ttl_s=60, max_entries=10, max_bytes=small * 2 + 1)
+        cache.put(_key("A"), _graph("A"))
+        cache.put(_key("B"), _graph("B"))
+        cache.put(_key("C"), _graph("C"))
+        self.assertIsNone(cache.get(_key("A")))
+        self.assertLessEqual(cache.stats()["bytes"], small * 2 + 1)
+
+        cache.put(_key("BIG"), _graph("BIG", nodes=50))
+        self.assertIsNone(cache.get(_key("BIG")))
+
+    def test_invalidate_drops_every_site_of_a_document(self):
+        cache = GraphCache(ttl_s=60, max_entries=10, max_bytes=0)
+        cache.put(_key("A"), _graph("A"))
+        cache.put(_key("B"), _graph("B"))
+        cache.put(_key("A", document="other"), _graph("A"))
+
+        self.assertEqual(cache.invalidate("sheet", "sheet-1"), 2)
+        self.assertIsNone(cache.get(_key("B")))
+        self.assertIsNotNone(cache.get(_key("A", document="other")))
+
+    def test_etag_is_stamped_on_put_and_carried_by_copies(self):
+        cache = GraphCache(ttl_s=60, max_entries=4, max_bytes=0)
+        graph = _graph()
+        cache.put(_key(), graph)
+
+        expected = compute_graph_etag(_graph())
+        self.assertEqual(graph._etag, expected)
+        self.assertEqual(cache.get(_key())._etag, expected)
+        self.assertNotEqual(graph_etag(_graph(nodes=2)), expected)
+
+    def test_stale_copies_are_kept_for_the_stale_window(self):
+        cache = GraphCache(ttl_s=10, max_entries=4, max_bytes=0, stale_s=20)
+        with patch("app.services.graph_cache.time.monotonic", return_value=100.0):
+            cache.put(_key(), _graph())
+            self.assertIsNone(cache.get_stale(_key()))
+        with patch("app.services.graph_cache.time.monotonic", return_value=125.0):
+            self.assertIsNone(cache.get(_key()))
+            stale = cache.get_stale(_key())
+            self.assertEqual((stale.site_id, stale._cache_age_s), ("SITE-A", 25.0))
+        with patch("app.services.graph_cache.time.monotonic", return_value=131.0):
+            self.assertIsNone(cache.get(_key()))
+            self.assertIsNone(cache.get_stale(_key()))
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stats()["stale_hits"], 1)
+
+    def test_put_is_skipped_when_the_document_was_invalidated_since_the_read(self):
+        cache = GraphCache(ttl_s=60, max_entries=4, max_bytes=0)
+        generation = cache.generation("sheet", "sheet-1")
+        other = cache.generation("sheet", "sheet-2")
+        cache.invalidate("sheet", "sheet-1")
+
+        self.assertFalse(cache.put(_key(), _graph(), generation=generation))
+        self.assertIsNone(cache.get(_key()))
+        self.assertTrue(cache.put(_key(document="sheet-2"), _graph(), generation=other))
+        self.assertTrue(cache.put(_key(), _graph(), generation=cache.generation("sheet", "sheet-1")))
+
+    def test_disabled_cache_is_a_noop(self):
+        cache = GraphCache(ttl_s=0, max_entries=10, max_bytes=0)
+        cache.put(_key(), _graph())
+        self.assertIsNone(cache.get(_key()))
+
+
+class LoadGraphCachingTests(unittest.TestCase):
+    def setUp(self):
+        graph_cache.clear()
+        self.addCleanup(graph_cache.clear)
+
+    def _write_graph(self, path: str, name: str) -> None:
+        graph = Graph(
+            site_id="SITE-TEST",
+            nodes=[
+                Node(id="OUVRAGE-A", name=name, type="OUVRAGE", site_id="SITE-TEST", gps_lat=48.0, gps_lon=2.0),
+                Node(id="OUVRAGE-B", type="OUVRAGE", site_id="SITE-TEST", gps_lat=48.001, gps_lon=2.001),
+            ],
+            edges=[
+                Edge(
+                    id="E1",
+                    from_id="OUVRAGE-A",
+                    to_id="OUVRAGE-B",
+                    branch_id="BR-1",
+                    diameter_mm=63.0,
+                    material="PVC",
+                    sdr="17",
+                    geometry=[[2.0, 48.0], [2.001, 48.001]],
+                    created_at="2025-01-01T00:00:00Z",
+                )
+            ],
+        )
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(graph.model_dump_json())
+
+    def test_repeat_loads_hit_cache_until_save_invalidates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.json")
+            uri = f"file://{path}"
+            self._write_graph(path, "first")
+
+            self.assertEqual(load_graph(source="json", gcs_uri=uri).nodes[0].name, "first")
+
+            # Out-of-band change is not visible while the entry is fresh.
+            self._write_graph(path, "second")
+            cached = load_graph(source="json", gcs_uri=uri)
+            self.assertEqual(cached.nodes[0].name, "first")
+
+            cached.nodes[0].name = "saved"
+            save_graph(source="json", graph=cached, gcs_uri=uri)
+            with open(path, "r", encoding="utf-8") as handle:
+                self.assertEqual(json.load(handle)["nodes"][0]["name"], "saved")
+            self.assertEqual(load_graph(source="json", gcs_uri=uri).nodes[0].name, "saved")
+
+    def test_save_during_a_load_keeps_the_pre_save_graph_out_of_the_cache(self):
+        def read_then_save(**kw):
+            graph = _graph(kw["site_id"])
+            # the save lands after the tabs were read, before the loader stores them
+            with patch("app.datasources.save_sheet"):
+                write_prepared_graph(source="sheet", graph=_graph(kw["site_id"], nodes=2), sheet_id="sheet-1", site_id="S1")
+            return graph
+
+        with patch("app.datasources.sheet_revision", return_value="7"), \
+                patch("app.datasources.load_sheet", side_effect=read_then_save):
+            self.assertEqual(len(load_graph(source="sheet", sheet_id="sheet-1", site_id="S1").nodes), 1)
+        self.assertIsNone(graph_cache.get(_key("S1")))
+
+    def test_expired_sheet_entry_is_renewed_while_revision_is_unchanged(self):
+        revisions = iter(["7", "7", "8"])
+        with patch("app.datasources.sheet_revision", side_effect=lambda *_: next(revisions)), \
+                patch("app.datasources.load_sheet", side_effect=lambda **kw: _graph(kw["site_id"])) as load_sheet, \
+                patch("app.services.graph_cache.time.monotonic") as clock:
+            clock.return_value = 1000.0
+            load_graph(source="sheet", sheet_id="sheet-1", site_id="S1")
+            self.assertEqual(load_sheet.call_count, 1)
+
+            clock.return_value = 1000.0 + graph_cache.ttl_s + 1
+            load_graph(source="sheet", sheet_id="sheet-1", site_id="S1")
+            self.assertEqual(load_sheet.call_count, 1)
+            self.assertEqual(graph_cache.stats()["revalidations"], 1)
+
+            clock.return_value = 1000.0 + 3 * graph_cache.ttl_s
+            load_graph(source="sheet", sheet_id="sheet-1", site_id="S1")
+            self.assertEqual(load_sheet.call_count, 2)
+
+    def test_stale_graph_is_served_while_it_is_refreshed(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.object(graph_cache, "stale_s", 300), \
+                patch("app.services.graph_cache.time.monotonic") as clock:
+            path = os.path.join(tmp, "graph.json")
+            uri = f"file://{path}"
+            self._write_graph(path, "first")
+            clock.return_value = 1000.0
+            load_graph(source="json", gcs_uri=uri)
+
+            self._write_graph(path, "second")
+            clock.return_value = 1000.0 + graph_cache.ttl_s + 5
+            stale = load_graph(source="json", gcs_uri=uri)
+            self.assertEqual(stale.nodes[0].name, "first")
+            self.assertEqual(stale._cache_age_s, graph_cache.ttl_s + 5)
+
+            for _ in range(500):
+                fresh = graph_cache.get(_json_key(uri))
+                if fresh is not None:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(fresh.nodes[0].name, "second")
+            self.assertIsNone(load_graph(source="json", gcs_uri=uri)._cache_age_s)
+
+    def test_normalize_flag_uses_a_separate_entry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.json")
+            uri = f"file://{path}"
+            self._write_graph(path, "first")
+
+            load_graph(source="json", gcs_uri=uri)
+            load_graph(source="json", gcs_uri=uri, normalize=True)
+            self.assertEqual(graph_cache.stats()["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
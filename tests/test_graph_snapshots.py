@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Graph
+from app.services.graph_sanitizer import sanitize_graph_for_write
+from app.services.graph_snapshots import export_site_snapshots, snapshot_uri
+from app.sheets import EDGE_HEADERS_FR_V6, EXTRA_SHEET_HEADERS, NODE_HEADERS_FR_V11, read_nodes_edges
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def execute(self):
+        return self._payload
+
+
+class _FakeSheetsClient:
+    """Sheets client serving whole tabs whatever the requested range."""
+
+    def __init__(self, tabs):
+        self.tabs = tabs
+        self.batch_get_calls = 0
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def batchGet(self, *, spreadsheetId, ranges, **options):  # noqa: N802 - match API signature
+        self.batch_get_calls += 1
+        return _FakeResponse({
+            "valueRanges": [{"range": rng, "values": self.tabs.get(rng.split("!")[0], [])} for rng in ranges]
+        })
+
+
+def _file_name(dest, site_id):
+    return os.path.basename(snapshot_uri(dest, site_id))
+
+
+def _tabs():
+    nodes = [NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS]
+    sites = ["S1", "S2", "S1", "S/3", "S2", ""]
+    for i, site in enumerate(sites):
+        row = [""] * len(nodes[0])
+        row[0], row[2], row[3] = f"N{i}", "OUVRAGE", "B-1"
+        row[NODE_HEADERS_FR_V11.index("gps_lat")] = 48.0 + i / 100
+        row[NODE_HEADERS_FR_V11.index("gps_lon")] = 2.0 + i / 100
+        row[len(NODE_HEADERS_FR_V11)] = site
+        nodes.append(row)
+    edges = [EDGE_HEADERS_FR_V6]
+    for edge_id, a, b in [("E1", "N0", "N2"), ("E2", "N1", "N4"), ("E3", "N0", "N1")]:
+        row = [""] * len(EDGE_HEADERS_FR_V6)
+        row[0], row[1], row[2], row[3] = edge_id, a, b, "B-1"
+        row[4], row[5], row[6], row[7] = "[[2.0, 48.0], [2.1, 48.1]]", 63, "PVC", "17"
+        edges.append(row)
+    return {
+        "Nodes": nodes,
+        "Edges": edges,
+        "BRANCHES": [["id", "name", "parent_id", "is_trunk"], ["B-1", "Main", "", "TRUE"]],
+    }
+
+
+class GraphSnapshotExportTests(unittest.TestCase):
+    def test_one_read_writes_one_snapshot_per_site(self):
+        client = _FakeSheetsClient(_tabs())
+        with tempfile.TemporaryDirectory() as tmp, patch("app.sheets._client", return_value=client):
+            dest = f"file://{tmp}/snaps"
+            summary = export_site_snapshots(dest_uri=dest, sheet_id="sheet123", workers=1)
+
+            self.assertEqual(client.batch_get_calls, 1)
+            self.assertEqual(sorted(summary["sites"]), ["S/3", "S1", "S2"])
+            self.assertEqual(summary["sites"]["S1"], {"uri": snapshot_uri(dest, "S1"), "nodes": 2, "edges": 1})
+            self.assertRegex(summary["sites"]["S/3"]["uri"], r"/S_3-[0-9a-f]{8}\.json$")
+
+            for site in ("S1", "S2"):
+                with open(os.path.join(tmp, "snaps", _file_name(dest, site)), encoding="utf-8") as handle:
+                    written = Graph.model_validate(json.load(handle))
+                expected = sanitize_graph_for_write(
+                    read_nodes_edges("sheet123", "Nodes", "Edges", site_id=site), strict=False
+                )
+                self.assertEqual([n.id for n in written.nodes], [n.id for n in expected.nodes])
+                self.assertEqual([(e.from_id, e.to_id) for e in written.edges], [(e.from_id, e.to_id) for e in expected.edges])
+
+    def test_process_pool_and_site_selection(self):
+        client = _FakeSheetsClient(_tabs())
+        with tempfile.TemporaryDirectory() as tmp, patch("app.sheets._client", return_value=client):
+            summary = export_site_snapshots(dest_uri=tmp, sheet_id="sheet123", sites=["s1", "S2"], workers=2)
+
+            self.assertEqual(sorted(summary["sites"]), ["S1", "S2"])
+            self.assertEqual(summary["sites"]["S2"]["edges"], 1)
+            self.assertEqual(sorted(os.listdir(tmp)), sorted(_file_name(tmp, site) for site in ("S1", "S2")))
+
+    def test_invalid_site_is_reported_without_blocking_the_others(self):
+        tabs = _tabs()
+        tabs["Nodes"][1][NODE_HEADERS_FR_V11.index("gps_lat")] = ""
+        client = _FakeSheetsClient(tabs)
+        with tempfile.TemporaryDirectory() as tmp, patch("app.sheets._client", return_value=client):
+            summary = export_site_snapshots(dest_uri=tmp, sheet_id="sheet123", workers=1)
+
+            self.assertIn("gps_lat", summary["sites"]["S1"]["error"])
+            self.assertEqual(sorted(os.listdir(tmp)), sorted(_file_name(tmp, site) for site in ("S2", "S/3")))
+
+
+class AdminSnapshotEndpointTests(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_requires_configured_token(self):
+        with patch("app.routers.admin.settings.admin_token", ""):
+            self.assertEqual(self.client.post("/api/admin/snapshots").status_code, 403)
+        with patch("app.routers.admin.settings.admin_token", "secret"):
+            resp = self.client.post("/api/admin/snapshots", headers={"X-Admin-Token": "wrong"})
+            self.assertEqual(resp.status_code, 403)
+
+    @patch("app.routers.admin.export_site_snapshots", return_value={"sites": {}})
+    def test_runs_export_with_valid_token(self, mock_export):
+        with patch("app.routers.admin.settings.admin_token", "secret"):
+            resp = self.client.post(
+                "/api/admin/snapshots?dest_uri=gs://bucket/snaps&site_id=S1&site_id=S2",
+                headers={"X-Admin-Token": "secret"},
+            )
+        self.assertEqual(resp.status_code, 200)
+        kwargs = mock_export.call_args.kwargs
+        self.assertEqual((kwargs["dest_uri"], kwargs["sites"]), ("gs://bucket/snaps", ["S1", "S2"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
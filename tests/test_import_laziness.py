@@ -0,0 +1,24 @@
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ["PIL", "pypdfium2", "googleapiclient", "google.cloud.bigquery", "google.cloud.storage"]
+
+
+class ImportLazinessTests(unittest.TestCase):
+    def test_app_startup_does_not_import_heavy_optional_dependencies(self):
+        code = (
+            "import json, sys\n"
+            "import app.main\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+        )
+        proc = subprocess.run([sys.executable, "-c", code], cwd=str(REPO_ROOT), capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(json.loads(proc.stdout.strip().splitlines()[-1]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.datasources import save_graph, save_plan_overlay_bounds
+from app.main import app
+from app.models import Edge, Graph, Node, PlanOverlayBounds, PlanOverlayUpdateRequest
+from app.services import read_snapshots
+from app.services.graph_cache import graph_cache
+
+
+def _graph(site_id="S1"):
+    return Graph(
+        site_id=site_id,
+        nodes=[
+            Node(id="N1", name="Source", gps_lat=48.0, gps_lon=2.0, branch_id="B-1"),
+            Node(id="N2", name="Puits", gps_lat=48.1, gps_lon=2.1, branch_id="B-1"),
+        ],
+        edges=[
+            Edge(
+                id="E1",
+                from_id="N1",
+                to_id="N2",
+                branch_id="B-1",
+                diameter_mm=63,
+                geometry=[[2.0, 48.0], [2.1, 48.1]],
+            )
+        ],
+    )
+
+
+class ReadSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        read_snapshots.reset()
+        self.addCleanup(read_snapshots.reset)
+        graph_cache.clear()
+        self.addCleanup(graph_cache.clear)
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        for name, value in {
+            "read_snapshots": True,
+            "read_snapshot_uri": f"file://{self.tmp.name}/ro",
+            "read_snapshot_gzip": True,
+            "sheet_id_default": "",
+            "site_id_filter_default": "",
+            "async_datasources": False,
+            "sheets_revision_check": False,
+        }.items():
+            stack.enter_context(patch(f"app.config.settings.{name}", value))
+        # the sheet as saved, per site: saves republish what a fresh read returns
+        self.sheet = {}
+        self.save_sheet = stack.enter_context(patch("app.datasources.save_sheet", side_effect=self._save_sheet))
+        self.load_sheet = stack.enter_context(patch("app.datasources.load_sheet", side_effect=self._load_sheet))
+
+    def _save_sheet(self, graph, *, site_id=None, **kwargs):
+        self.sheet[site_id] = graph.model_copy(deep=True)
+
+    def _load_sheet(self, *, site_id=None, **kwargs):
+        return self.sheet[site_id].model_copy(deep=True)
+
+    def _snapshot_path(self, *parts):
+        return os.path.join(self.tmp.name, "ro", *parts)
+
+    def _site_path(self, sheet_id, site_id):
+        return read_snapshots.snapshot_location(sheet_id, site_id).replace("file://", "")
+
+    def test_save_publishes_and_read_only_get_skips_sheets(self):
+        save_graph(source="sheet", graph=_graph(), sheet_id="sheet123", site_id="S1")
+        self.assertTrue(os.path.exists(self._site_path("sheet123", "S1")))
+
+        read_snapshots.reset()  # as seen from another instance
+        with patch("app.routers.api.load_graph") as load:
+            plain = self.client.get(
+                "/api/graph?sheet_id=sheet123&site_id=S1&mode=ro", headers={"Accept-Encoding": "identity"}
+            )
+            zipped = self.client.get("/api/graph?sheet_id=sheet123&site_id=S1&mode=ro")
+            load.assert_not_called()
+
+        self.assertEqual(plain.status_code, 200)
+        self.assertIsNone(plain.headers.get("content-encoding"))
+        data = plain.json()
+        self.assertEqual((data["site_id"], len(data["nodes"]), len(data["edges"])), ("S1", 2, 1))
+        self.assertTrue(data["generated_at"])
+        self.assertEqual(zipped.headers.get("content-encoding"), "gzip")
+        self.assertEqual(zipped.json(), data)
+        self.assertEqual(zipped.headers["etag"], f"W/{plain.headers['etag']}")
+
+        revalidated = self.client.get(
+            "/api/graph?sheet_id=sheet123&site_id=S1&mode=ro",
+            headers={"If-None-Match": plain.headers["etag"], "Accept-Encoding": "identity"},
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_snapshot_body_matches_live_response(self):
+        graph = _graph()
+        with patch("app.routers.api.load_graph", return_value=graph):
+            live = self.client.get("/api/graph?sheet_id=sheet123&site_id=S1")
+        self.assertEqual(json.loads(read_snapshots.serialize(graph)), live.json())
+
+    def test_sheets_are_read_without_snapshot_or_outside_read_only_mode(self):
+        with patch("app.routers.api.load_graph", return_value=_graph("S2")) as load:
+            missing = self.client.get("/api/graph?sheet_id=sheet123&site_id=S2&mode=ro")
+            self.assertEqual(missing.status_code, 200)
+            self.assertIsNone(missing.headers.get("x-graph-snapshot"))
+
+            save_graph(source="sheet", graph=_graph("S2"), sheet_id="sheet123", site_id="S2")
+            editing = self.client.get("/api/graph?sheet_id=sheet123&site_id=S2&mode=rw")
+            self.assertIsNone(editing.headers.get("x-graph-snapshot"))
+            self.assertEqual(load.call_count, 2)
+
+            served = self.client.get("/api/graph?sheet_id=sheet123&site_id=S2&mode=ro")
+            self.assertEqual(served.headers.get("x-graph-snapshot"), "hit")
+            self.assertEqual(load.call_count, 2)
+
+    def test_read_only_miss_republishes_the_snapshot(self):
+        save_graph(source="sheet", graph=_graph("S1"), sheet_id="sheet123", site_id="S1")
+        # S2's save withdraws S1's snapshot and only republishes S2's
+        save_graph(source="sheet", graph=_graph("S2"), sheet_id="sheet123", site_id="S2")
+
+        missed = self.client.get("/api/graph?sheet_id=sheet123&site_id=S1&mode=ro")
+        self.assertIsNone(missed.headers.get("x-graph-snapshot"))
+        served = self.client.get("/api/graph?sheet_id=sheet123&site_id=S1&mode=ro")
+        self.assertEqual(served.headers.get("x-graph-snapshot"), "hit")
+        self.assertEqual(served.json(), missed.json())
+
+    def test_pending_write_is_served_instead_of_the_snapshot(self):
+        save_graph(source="sheet", graph=_graph("S1"), sheet_id="sheet123", site_id="S1")
+        pending = _graph("S1")
+        pending.nodes[0].name = "queued"
+
+        with patch("app.datasources.write_behind.pending_graph", return_value=pending):
+            response = self.client.get("/api/graph?sheet_id=sheet123&site_id=S1&mode=ro")
+
+        self.assertIsNone(response.headers.get("x-graph-snapshot"))
+        self.assertEqual(response.json()["nodes"][0]["name"], "queued")
+        self.assertNotIn(b"queued", read_snapshots.load(sheet_id="sheet123", site_id="S1").body)
+
+    def test_save_publishes_what_the_sheet_now_holds(self):
+        def save_and_edit(graph, *, site_id=None, **kwargs):
+            # columns the writer does not own (or a concurrent editor) change the stored rows
+            self._save_sheet(graph, site_id=site_id)
+            self.sheet[site_id].nodes[0].name = "Source (sheet)"
+
+        self.save_sheet.side_effect = save_and_edit
+        save_graph(source="sheet", graph=_graph(), sheet_id="sheet123", site_id="S1")
+
+        read_snapshots.reset()
+        snapshot = read_snapshots.load(sheet_id="sheet123", site_id="S1")
+        self.assertEqual(json.loads(snapshot.body)["nodes"][0]["name"], "Source (sheet)")
+        self.load_sheet.assert_called_once()
+
+    def test_any_sheet_write_withdraws_every_snapshot_of_the_sheet(self):
+        save_graph(source="sheet", graph=_graph("S3"), sheet_id="other", site_id="S3")
+        save_graph(source="sheet", graph=_graph(), sheet_id="sheet123")
+        save_graph(source="sheet", graph=_graph("S1"), sheet_id="sheet123", site_id="S1")
+        self.assertIsNotNone(read_snapshots.load(sheet_id="sheet123", site_id="S1"))
+
+        # branches and plan overlays are shared: a save for S2 may change what S1 serves
+        save_graph(source="sheet", graph=_graph("S2"), sheet_id="sheet123", site_id="S2")
+        self.assertIsNone(read_snapshots.load(sheet_id="sheet123", site_id="S1"))
+        self.assertFalse(os.path.exists(self._site_path("sheet123", "S1")))
+        self.assertFalse(os.path.exists(self._snapshot_path("sheet123.json.gz")))
+        self.assertIsNotNone(read_snapshots.load(sheet_id="sheet123", site_id="S2"))
+
+        # a save without site_id rewrites every site's rows
+        save_graph(source="sheet", graph=_graph(), sheet_id="sheet123")
+        self.assertFalse(os.path.exists(self._site_path("sheet123", "S2")))
+        self.assertIsNone(read_snapshots.load(sheet_id="sheet123", site_id="S2"))
+        self.assertTrue(os.path.exists(self._snapshot_path("sheet123.json.gz")))
+        self.assertTrue(os.path.exists(self._site_path("other", "S3")))
+
+    def test_plan_overlay_write_withdraws_the_sheet_snapshots(self):
+        save_graph(source="sheet", graph=_graph("S1"), sheet_id="sheet123", site_id="S1")
+        self.assertIsNotNone(read_snapshots.load(sheet_id="sheet123", site_id="S1"))
+
+        point = {"lat": 48.0, "lon": 2.0}
+        payload = PlanOverlayUpdateRequest(bounds=PlanOverlayBounds(sw=point, se=point, nw=point, ne=point))
+        with patch("app.datasources.save_sheet_plan_bounds") as save_bounds:
+            save_plan_overlay_bounds(source="sheet", payload=payload, sheet_id="sheet123", site_id="S1")
+        save_bounds.assert_called_once()
+
+        self.assertIsNone(read_snapshots.load(sheet_id="sheet123", site_id="S1"))
+        self.assertFalse(os.path.exists(self._snapshot_path("sheet123")))
+
+    def test_site_ids_reduced_to_the_same_name_get_distinct_snapshots(self):
+        for site_id in ("A/B", "A_B", "A B"):
+            save_graph(source="sheet", graph=_graph(site_id), sheet_id="sheet123", site_id=site_id)
+            self.sheet[site_id] = _graph(site_id)
+        paths = {self._site_path("sheet123", site_id) for site_id in ("A/B", "A_B", "A B")}
+        self.assertEqual(len(paths), 3)
+
+        read_snapshots.reset()
+        for site_id in ("A/B", "A_B", "A B"):
+            response = self.client.get("/api/graph", params={"sheet_id": "sheet123", "site_id": site_id, "mode": "ro"})
+            self.assertEqual(response.json()["site_id"], site_id)
+
+    def test_disabled_by_default(self):
+        with patch("app.config.settings.read_snapshots", False):
+            save_graph(source="sheet", graph=_graph(), sheet_id="sheet123", site_id="S1")
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "ro")))
+        self.save_sheet.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from app.datasources import load_graph, refresh_sheet_graph
+from app.models import Graph, Node
+from app.services.google_clients import note_call
+from app.services.graph_cache import GraphCache, GraphCacheKey, graph_cache
+from app.services.refresh_scheduler import Refresh, RefreshScheduler
+
+
+def _key(site):
+    return GraphCacheKey(source="sheet", document="sheet-1", tabs=("Nodes", "Edges"), site_id=site, normalize=False)
+
+
+class _Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RefreshSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = patch("app.services.graph_cache.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = GraphCache(ttl_s=60, max_entries=10, max_bytes=0)
+        self.refreshed = []
+
+        def refresher(**params):
+            self.refreshed.append(params["site_id"])
+            self.cache.put(_key(params["site_id"]), Graph(site_id=params["site_id"]), revision="r")
+            return Refresh("reread", 2)
+
+        self.scheduler = RefreshScheduler(budget_per_min=60, cache=self.cache, refresher=refresher, clock=self.clock)
+
+    def _access(self, site, times=1):
+        for _ in range(times):
+            self.scheduler.record(_key(site), {"site_id": site})
+
+    def test_only_warm_keys_close_to_expiry_are_refreshed(self):
+        for site in ("HOT", "FRESH", "UNCACHED"):
+            self._access(site, times=3)
+        self.cache.put(_key("HOT"), Graph(site_id="HOT"))
+        self.clock.now += 30
+        self.cache.put(_key("FRESH"), Graph(site_id="FRESH"))
+        self.clock.now += 20  # HOT expires in 10 s (< 15 s lead), FRESH in 40 s
+
+        self.assertEqual(self.scheduler.run_once(), 1)
+        self.assertEqual(self.refreshed, ["HOT"])
+        self.assertEqual(self.cache.expires_at(_key("HOT")), self.clock.now + 60)
+
+    def test_forgotten_keys_are_no_longer_refreshed(self):
+        self._access("COLD")
+        self.cache.put(_key("COLD"), Graph(site_id="COLD"))
+        self.clock.now += 600  # two half-lives without access
+        self.assertEqual(self.scheduler.run_once(), 0)
+        self.assertEqual(self.scheduler.stats()["tracked"], 0)
+
+    def test_budget_limits_refreshes_hottest_first(self):
+        self.scheduler.budget_per_min = 4
+        self.scheduler._tokens = 4.0
+        for site, hits in (("A", 2), ("B", 5), ("C", 3)):
+            self._access(site, times=hits)
+            self.cache.put(_key(site), Graph(site_id=site))
+        self.clock.now += 50
+
+        self.scheduler.run_once()
+        self.assertEqual(self.refreshed, ["B", "C"])
+        self.assertEqual(self.scheduler.stats()["deferred"], 1)
+
+        self.clock.now += 30  # one call per 15 s: back to two tokens
+        self.scheduler.run_once()
+        self.assertEqual(self.refreshed, ["B", "C", "A"])
+
+    def test_costly_refreshes_put_the_budget_in_debt(self):
+        self.scheduler.budget_per_min = 6
+        self.scheduler._tokens = 6.0
+        self.scheduler._refresher = lambda **params: (self.refreshed.append(params["site_id"]), Refresh("reread", 5))[1]
+        for site, hits in (("A", 3), ("B", 2)):
+            self._access(site, times=hits)
+            self.cache.put(_key(site), Graph(site_id=site))
+        self.clock.now += 50
+
+        self.scheduler.run_once()
+        self.assertEqual(self.refreshed, ["A"])
+        self.assertEqual(self.scheduler.stats()["tokens"], 1.0)
+
+    def test_failed_refresh_is_charged_the_requests_it_sent(self):
+        def failing(**params):
+            for _ in range(3):
+                note_call()
+            raise RuntimeError("backend error")
+
+        self.scheduler._refresher = failing
+        self._access("A", times=3)
+        self.cache.put(_key("A"), Graph(site_id="A"))
+        self.clock.now += 50
+        tokens = self.scheduler._tokens
+
+        self.assertEqual(self.scheduler.run_once(), 0)
+        self.assertEqual(self.scheduler.stats()["failed"], 1)
+        self.assertEqual(tokens - self.scheduler._tokens, 3)
+
+    def test_disabled_without_budget(self):
+        scheduler = RefreshScheduler(budget_per_min=0, cache=self.cache, refresher=lambda **_: Refresh("renewed", 1), clock=self.clock)
+        scheduler.record(_key("A"), {"site_id": "A"})
+        self.assertEqual(scheduler.stats()["tracked"], 0)
+
+
+def _revision(revisions):
+    def read(*_):
+        note_call()  # Drive files.get
+        return next(revisions)
+
+    return read
+
+
+def _read_sheet(requests=3):
+    def read(**kwargs):
+        for _ in range(requests):  # tab properties, header probe, batchGet
+            note_call()
+        return Graph(nodes=[Node(id="N1")])
+
+    return read
+
+
+class RefreshSheetGraphTests(unittest.TestCase):
+    def setUp(self):
+        graph_cache.clear()
+        self.addCleanup(graph_cache.clear)
+
+    def test_revision_check_guards_the_reread(self):
+        revisions = iter(["7", "7", "8"])
+        with patch("app.datasources.sheet_revision", side_effect=_revision(revisions)), \
+                patch("app.datasources.load_sheet", side_effect=_read_sheet()) as load_sheet:
+            load_graph(source="sheet", sheet_id="sheet-1", site_id="S1")
+            self.assertEqual(refresh_sheet_graph(sheet_id="sheet-1", site_id="S1"), Refresh("renewed", 1))
+            self.assertEqual(load_sheet.call_count, 1)
+            # every request of the re-read is charged, not a flat cost
+            self.assertEqual(refresh_sheet_graph(sheet_id="sheet-1", site_id="S1"), Refresh("reread", 4))
+            self.assertEqual(load_sheet.call_count, 2)
+            self.assertEqual(load_sheet.call_args.kwargs["revision"], "8")
+
+    def test_rereads_without_revision_when_the_check_is_off(self):
+        with patch("app.config.settings.sheets_revision_check", False), \
+                patch("app.datasources.sheet_revision") as sheet_revision, \
+                patch("app.datasources.load_sheet", side_effect=_read_sheet(requests=5)) as load_sheet:
+            load_graph(source="sheet", sheet_id="sheet-1", site_id="S1")
+            self.assertEqual(refresh_sheet_graph(sheet_id="sheet-1", site_id="S1"), Refresh("reread", 5))
+        sheet_revision.assert_not_called()
+        self.assertEqual(load_sheet.call_count, 2)
+        self.assertIsNone(load_sheet.call_args.kwargs["revision"])
+
+    def test_joining_a_running_load_costs_no_read(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_read(**kwargs):
+            note_call()  # made by the reader's thread: not the refresh's
+            started.set()
+            release.wait(5)
+            return Graph(nodes=[Node(id="N1")])
+
+        with patch("app.config.settings.sheets_revision_check", False), \
+                patch("app.datasources.load_sheet", side_effect=slow_read) as load_sheet:
+            reader = threading.Thread(target=load_graph, kwargs={"source": "sheet", "sheet_id": "sheet-1", "site_id": "S1"})
+            reader.start()
+            self.assertTrue(started.wait(5))
+            threading.Timer(0.05, release.set).start()
+            self.assertEqual(refresh_sheet_graph(sheet_id="sheet-1", site_id="S1"), Refresh("joined", 0))
+            reader.join(5)
+        self.assertEqual(load_sheet.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
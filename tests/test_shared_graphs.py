@@ -0,0 +1,172 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Graph, Node
+from app.services.graph_cache import GraphCache, GraphCacheKey, _shared_key, _shared_prefix
+from app.services.shared_graphs import SharedGraph, SharedGraphStore
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+KEY = GraphCacheKey(source="sheet", document="sheet-1", tabs=("Nodes", "Edges"), site_id="S1", normalize=False)
+
+
+def _graph(*ids):
+    return Graph(nodes=[Node(id=node_id) for node_id in ids])
+
+
+class SharedGraphCacheTests(unittest.TestCase):
+    """Two caches on one snapshot directory stand for two workers of a container."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.first, self.second = (
+            GraphCache(ttl_s=60, max_entries=10, max_bytes=0, shm=SharedGraphStore(self.directory)) for _ in range(2)
+        )
+
+    def test_graph_stored_by_one_worker_is_mapped_by_the_other(self):
+        self.first.put(KEY, _graph("N1", "N2"), revision="7")
+
+        graph = self.second.get(KEY)
+        self.assertEqual([node.id for node in graph.nodes], ["N1", "N2"])
+        self.assertEqual(graph._etag, self.first.get(KEY)._etag)
+        self.assertEqual(self.second.revision_of(KEY), "7")
+        self.assertEqual(self.second.stats()["shared_hits"], 1)
+        # neither worker keeps a parsed copy: both read the mapped snapshot
+        self.assertIsNone(self.first._entries[KEY].graph)
+        self.assertIsNone(self.second._entries[KEY].graph)
+
+    def test_copies_handed_out_do_not_share_state(self):
+        self.first.put(KEY, _graph("N1"))
+        served = self.first.get(KEY)
+        served.nodes.append(Node(id="N2"))
+        self.assertEqual(len(self.first.get(KEY).nodes), 1)
+
+    def test_invalidation_and_newer_graphs_reach_the_other_worker(self):
+        self.first.put(KEY, _graph("N1"))
+        self.assertIsNotNone(self.second.get(KEY))
+
+        self.first.put(KEY, _graph("N1", "N2"))
+        self.assertEqual(len(self.second.get(KEY).nodes), 2)
+
+        self.first.invalidate("sheet", "sheet-1")
+        self.assertIsNone(self.second.get(KEY))
+        self.assertNotIn(KEY, self.second._entries)
+
+    def test_renewal_is_seen_by_the_other_worker(self):
+        self.first.put(KEY, _graph("N1"), revision="7")
+        self.assertIsNotNone(self.second.get(KEY))
+        self.assertTrue(self.first.renew(KEY, "7"))
+        self.assertFalse(self.first.renew(KEY, "8"))
+        self.assertEqual([node.id for node in self.second.get(KEY).nodes], ["N1"])
+
+    def test_graph_read_before_another_workers_save_is_not_published(self):
+        generation = self.second.generation("sheet", "sheet-1")
+        # the first worker saves (and invalidates) while the second one reads the sheet
+        self.first.invalidate("sheet", "sheet-1")
+
+        self.assertFalse(self.second.put(KEY, _graph("N1"), generation=generation))
+        self.assertIsNone(self.first.get(KEY))
+        self.assertTrue(self.second.put(KEY, _graph("N1"), generation=self.second.generation("sheet", "sheet-1")))
+        self.assertIsNotNone(self.first.get(KEY))
+
+    def test_evicted_snapshots_are_deleted(self):
+        cache = GraphCache(ttl_s=60, max_entries=2, max_bytes=0, shm=SharedGraphStore(self.directory))
+        for index in range(3):
+            cache.put(KEY._replace(document=f"sheet-{index}"), _graph("N1"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(len(list(Path(self.directory).glob("*/*.graph"))), 2)
+        self.assertIsNone(self.second.get(KEY._replace(document="sheet-0")))
+
+    def test_snapshots_beyond_the_budget_are_swept_oldest_first(self):
+        self.first.put(KEY, _graph("N1"))
+        (orphan,) = Path(self.directory).glob("*/*.graph")
+        os.utime(orphan, ns=(0, 0))
+        cache = GraphCache(ttl_s=60, max_entries=1, max_bytes=0, shm=SharedGraphStore(self.directory))
+        cache.put(KEY._replace(document="sheet-2"), _graph("N1"))
+
+        self.assertFalse(orphan.exists())
+        self.assertEqual(len(list(Path(self.directory).glob("*/*.graph"))), 1)
+        self.assertIsNone(self.first.get(KEY))
+
+    def test_unreadable_snapshots_are_misses(self):
+        store = SharedGraphStore(self.directory)
+        path = store._path(_shared_prefix("sheet", "sheet-1"), _shared_key(KEY))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Path(path).write_bytes(b"garbage")
+        self.assertIsNone(self.second.get(KEY))
+
+    def test_snapshot_is_readable_from_another_process(self):
+        self.first.put(KEY, _graph("N1", "N2"))
+        code = (
+            "import json, sys\n"
+            "from app.services.graph_cache import GraphCache, GraphCacheKey\n"
+            "from app.services.shared_graphs import SharedGraphStore\n"
+            "cache = GraphCache(ttl_s=60, max_entries=10, max_bytes=0, shm=SharedGraphStore(sys.argv[1]))\n"
+            "graph = cache.get(GraphCacheKey('sheet', 'sheet-1', ('Nodes', 'Edges'), 'S1', False))\n"
+            "print(json.dumps([node.id for node in graph.nodes]))\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", code, self.directory], cwd=str(REPO_ROOT), capture_output=True, text=True
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(json.loads(proc.stdout.strip().splitlines()[-1]), ["N1", "N2"])
+
+
+class SharedGraphRouteTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = GraphCache(ttl_s=60, max_entries=10, max_bytes=0, shm=SharedGraphStore(directory.name))
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        stack.enter_context(patch("app.datasources.graph_cache", self.cache))
+        for name, value in {"async_datasources": False, "sheets_revision_check": False}.items():
+            stack.enter_context(patch(f"app.config.settings.{name}", value))
+        self.load_sheet = stack.enter_context(
+            patch("app.datasources.load_sheet", side_effect=lambda **kwargs: _graph("N1", "N2"))
+        )
+        self.client = TestClient(app)
+
+    def _get(self, **headers):
+        return self.client.get(
+            "/api/graph", params={"source": "sheet", "sheet_id": "sheet-1", "site_id": "S1"}, headers=headers
+        )
+
+    def test_hits_serve_the_mapped_json_and_revalidate_without_parsing(self):
+        first = self._get()
+        self.assertEqual(first.status_code, 200)
+        with patch.object(SharedGraph, "load", side_effect=AssertionError("parsed")):
+            hit = self._get()
+            self.assertEqual(hit.status_code, 200)
+            self.assertEqual(hit.json(), first.json())
+            self.assertEqual(hit.headers["etag"], first.headers["etag"])
+            self.assertEqual(hit.headers["content-type"], "application/json")
+
+            revalidated = self._get(**{"If-None-Match": first.headers["etag"]})
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated.headers["etag"], first.headers["etag"])
+        self.assertEqual(self.load_sheet.call_count, 1)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_in_process_entries_are_still_revalidated_from_their_etag(self):
+        cache = GraphCache(ttl_s=60, max_entries=10, max_bytes=0)
+        cache.put(KEY, _graph("N1"))
+        etag = cache.get(KEY)._etag
+        self.assertEqual(cache.get_body(KEY, lambda candidate: candidate == etag), (etag, None))
+        # a full body needs the Graph: left to ``get``
+        self.assertIsNone(cache.get_body(KEY, lambda candidate: False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,352 @@
+import json
+import re
+import unittest
+from unittest.mock import patch
+
+import httplib2
+from fastapi import HTTPException
+from googleapiclient.errors import HttpError
+
+from app.sheets import (
+    read_nodes_edges,
+    reset_layout_cache,
+    NODE_HEADERS_FR_V11,
+    EXTRA_SHEET_HEADERS,
+    EDGE_HEADERS_FR_V6,
+)
+
+
+def _missing_range_error(a1_range):
+    content = json.dumps({"error": {"code": 400, "message": f"Unable to parse range: {a1_range}"}}).encode()
+    return HttpError(httplib2.Response({"status": 400}), content)
+
+
+class _FakeResponse:
+    def __init__(self, payload=None, error=None):
+        self._payload = payload or {}
+        self._error = error
+
+    def execute(self):
+        if self._error is not None:
+            raise self._error
+        return self._payload
+
+
+def _column_number(letters):
+    number = 0
+    for ch in letters:
+        number = number * 26 + ord(ch) - ord("A") + 1
+    return number
+
+
+def _slice(values, a1):
+    """Values of an A1 range on a tab: ``A:ZZZ``, ``1:1`` or ``A<row>:<col><row>``."""
+    if a1 == "1:1":
+        return values[:1]
+    match = re.fullmatch(r"A(\d+):([A-Z]+)(\d+)", a1)
+    if not match:
+        return values
+    first, width, last = int(match.group(1)), _column_number(match.group(2)), int(match.group(3))
+    return [row[:width] for row in values[first - 1:last]]
+
+
+class _FakeValuesService:
+    def __init__(self, tabs):
+        self.tabs = tabs
+        self.grid = {}
+        self.batch_get_calls = []
+
+    def batchGet(self, *, spreadsheetId, ranges, **options):  # noqa: N802 - match API signature
+        self.batch_get_calls.append(list(ranges))
+        self.options = options
+        for rng in ranges:
+            if rng.split("!")[0] not in self.tabs:
+                return _FakeResponse(error=_missing_range_error(rng))
+        return _FakeResponse({
+            "valueRanges": [
+                {"range": rng, "values": _slice(self.tabs[rng.split("!")[0]], rng.split("!")[1])}
+                for rng in ranges
+            ]
+        })
+
+
+class _FakeSpreadsheetsService:
+    def __init__(self, values_service):
+        self._values_service = values_service
+        self.get_calls = 0
+
+    def values(self):
+        return self._values_service
+
+    def get(self, *, spreadsheetId, fields):
+        self.get_calls += 1
+        tabs = self._values_service.tabs
+        grid = self._values_service.grid
+        return _FakeResponse({
+            "sheets": [
+                {"properties": {
+                    "title": title,
+                    "gridProperties": {
+                        "rowCount": 1000,
+                        "columnCount": grid.get(title, max([len(row) for row in rows] + [26])),
+                    },
+                }}
+                for title, rows in tabs.items()
+            ]
+        })
+
+
+class _FakeSheetsClient:
+    def __init__(self, tabs):
+        self.values_service = _FakeValuesService(tabs)
+        self._spreadsheets = _FakeSpreadsheetsService(self.values_service)
+
+    def spreadsheets(self):
+        return self._spreadsheets
+
+
+def _node_row(node_id, site):
+    row = [""] * len(NODE_HEADERS_FR_V11)
+    row[0] = node_id
+    row[2] = "OUVRAGE"
+    extras = [""] * len(EXTRA_SHEET_HEADERS)
+    extras[0] = site
+    return row + extras
+
+
+def _edge_row(edge_id, from_id, to_id):
+    row = [""] * len(EDGE_HEADERS_FR_V6)
+    row[0], row[1], row[2], row[3] = edge_id, from_id, to_id, "B-1"
+    return row
+
+
+class SheetsReadTests(unittest.TestCase):
+    def setUp(self):
+        reset_layout_cache()
+        self.addCleanup(reset_layout_cache)
+
+    def _tabs(self):
+        return {
+            "Nodes": [
+                NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS,
+                _node_row("N1", "S1"),
+                _node_row("N2", "S1"),
+                _node_row("N3", "S2"),
+            ],
+            "Edges": [
+                EDGE_HEADERS_FR_V6,
+                _edge_row("E1", "N1", "N2"),
+                _edge_row("E2", "N2", "N3"),
+            ],
+            "STYLE_META": [["style_meta", '{"mode":"continuous"}']],
+            "BRANCHES": [["id", "name", "parent_id", "is_trunk"], ["B-1", "Main", "", "TRUE"]],
+            "CONFIG": [["crs_code", "EPSG:4326"], ["projected_for_lengths", "EPSG:3857"]],
+        }
+
+    def test_reads_every_tab_in_one_batch_get(self):
+        tabs = self._tabs()
+        tabs["PlanOverlay"] = [["site_id"]]
+        client = _FakeSheetsClient(tabs)
+
+        with patch("app.sheets._client", return_value=client):
+            graph = read_nodes_edges("sheet123", "Nodes", "Edges", site_id="S1")
+
+        self.assertEqual(len(client.values_service.batch_get_calls), 1)
+        self.assertEqual(client.values_service.options, {
+            "valueRenderOption": "UNFORMATTED_VALUE",
+            "dateTimeRenderOption": "SERIAL_NUMBER",
+        })
+        self.assertEqual(client.spreadsheets().get_calls, 0)
+        self.assertEqual([n.id for n in graph.nodes], ["N1", "N2"])
+        self.assertEqual([e.id for e in graph.edges], ["E1"])
+        self.assertEqual(graph.style_meta, {"mode": "continuous"})
+        self.assertEqual([(b.id, b.name, b.is_trunk) for b in graph.branches], [("B-1", "Main", True)])
+        self.assertEqual(graph.crs.projected_for_lengths, "EPSG:3857")
+        self.assertIsNone(graph.plan_overlay)
+
+    def test_missing_side_tabs_fall_back_to_existing_ranges(self):
+        tabs = self._tabs()
+        del tabs["STYLE_META"]
+        del tabs["BRANCHES"]
+        client = _FakeSheetsClient(tabs)
+
+        with patch("app.sheets._client", return_value=client):
+            graph = read_nodes_edges("sheet123", "Nodes", "Edges")
+
+        calls = client.values_service.batch_get_calls
+        self.assertEqual(len(calls), 2)
+        self.assertNotIn("STYLE_META!A:ZZZ", calls[1])
+        self.assertEqual(len(graph.nodes), 3)
+        self.assertEqual(graph.style_meta, {})
+        # Branches are rebuilt from edges when the tab is absent
+        self.assertEqual([b.id for b in graph.branches], ["B-1"])
+
+    def test_columns_are_resolved_by_header_name(self):
+        tabs = self._tabs()
+        # Reordered legacy columns, fallback names and rows trimmed by the API
+        tabs["Nodes"] = [
+            ["type", "name", "id", "x", "idSite1"],
+            ["OUVRAGE", "Puits 1", "N1", "12,5", "S1"],
+            ["", "", "N2"],
+            ["OUVRAGE", "no id"],
+        ]
+        tabs["Edges"] = [
+            ["source_id", "cible_id", "BranchId", "id", "longueur_m", "date_creation"],
+            ["N1", "N2", "B-7", "E1", "4,2", "2024-03-01"],
+            [],
+        ]
+        client = _FakeSheetsClient(tabs)
+
+        with patch("app.sheets._client", return_value=client):
+            graph = read_nodes_edges("sheet123", "Nodes", "Edges")
+
+        self.assertEqual([(n.id, n.name, n.x, n.site_id) for n in graph.nodes], [
+            ("N1", "Puits 1", 12.5, "S1"),
+            ("N2", "", None, None),
+        ])
+        self.assertEqual(graph.nodes[1].type, "OUVRAGE")
+        edge, = graph.edges
+        self.assertEqual((edge.id, edge.from_id, edge.to_id, edge.branch_id), ("E1", "N1", "N2", "B-7"))
+        self.assertEqual(edge.length_m, 4.2)
+        self.assertTrue(edge.created_at.startswith("2024-03-01"))
+
+    def test_typed_cells_are_read_without_string_parsing(self):
+        tabs = self._tabs()
+        header = NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS
+        row = _node_row("N1", 42)
+        row[header.index("type")] = "CANALISATION"
+        row[header.index("nom")] = 101
+        row[header.index("diametre_exterieur_mm")] = 110
+        row[header.index("gps_locked")] = False
+        row[header.index("gps_lat")] = 48.85
+        tabs["Nodes"] = [header, row]
+        edge = _edge_row("E1", "N1", "N1")
+        edge[EDGE_HEADERS_FR_V6.index("sdr")] = 17
+        edge[EDGE_HEADERS_FR_V6.index("length_m")] = 12.5
+        edge[EDGE_HEADERS_FR_V6.index("active")] = False
+        tabs["Edges"] = [EDGE_HEADERS_FR_V6 + ["created_at"], edge + [45000.5]]
+        client = _FakeSheetsClient(tabs)
+
+        with patch("app.sheets._client", return_value=client):
+            graph = read_nodes_edges("sheet123", "Nodes", "Edges", site_id="42")
+
+        node, = graph.nodes
+        self.assertEqual((node.name, node.site_id, node.diameter_mm, node.gps_locked, node.gps_lat), ("101", "42", 110.0, False, 48.85))
+        edge, = graph.edges
+        self.assertEqual((edge.sdr, edge.length_m, edge.active), ("17", 12.5, False))
+        # Serial 45000.5 is 2023-03-15 12:00 UTC
+        self.assertEqual(edge.created_at, "2023-03-15T12:00:00Z")
+
+    def test_typed_zero_cells_are_values_not_blanks(self):
+        tabs = self._tabs()
+        header = NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS
+        row = _node_row("N1", "S1")
+        row[header.index("nom")] = 0
+        row[header.index("pm_offset_m")] = 0
+        tabs["Nodes"] = [header, row]
+        tabs["Edges"] = [["id", "source_id", "cible_id", "BranchId", "longueur_m", "diametre_mm"], ["E1", "N1", "N1", "B-1", 0, 0.0]]
+        client = _FakeSheetsClient(tabs)
+
+        with patch("app.sheets._client", return_value=client):
+            graph = read_nodes_edges("sheet123", "Nodes", "Edges")
+
+        node, = graph.nodes
+        self.assertEqual((node.name, node.pm_offset_m), ("0", 0.0))
+        edge, = graph.edges
+        self.assertEqual((edge.length_m, edge.diameter_mm), (0.0, 0.0))
+
+    def test_typed_extra_cells_are_rendered_as_text(self):
+        tabs = self._tabs()
+        header = NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS
+        row = _node_row("N1", 42)
+        row[header.index("dateAjoutligne")] = 45000
+        row[header.index("actif")] = True
+        row[header.index("diametreInterieur")] = 90.5
+        row[header.index("sdrOuvrage")] = 17.0
+        tabs["Nodes"] = [header, row]
+        client = _FakeSheetsClient(tabs)
+
+        with patch("app.sheets._client", return_value=client):
+            graph = read_nodes_edges("sheet123", "Nodes", "Edges")
+
+        extras = graph.nodes[0].extras
+        # Serial 45000 is 2023-03-15
+        self.assertEqual(extras["dateAjoutligne"], "2023-03-15")
+        self.assertEqual(
+            (extras["idSite1"], extras["actif"], extras["diametreInterieur"], extras["sdrOuvrage"], extras["site"]),
+            ("42", "TRUE", "90.5", "17", ""),
+        )
+
+    def test_known_revision_reads_exact_ranges_from_cached_layout(self):
+        client = _FakeSheetsClient(self._tabs())
+        client.values_service.grid["Nodes"] = 60
+
+        with patch("app.sheets._client", return_value=client):
+            first = read_nodes_edges("sheet123", "Nodes", "Edges", site_id="S1", revision="7")
+            second = read_nodes_edges("sheet123", "Nodes", "Edges", site_id="S2", revision="7")
+
+        # Grid sizes are fetched once per revision; absent tabs are never requested
+        self.assertEqual(client.spreadsheets().get_calls, 1)
+        calls = client.values_service.batch_get_calls
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0], [
+            "Nodes!A1:BH1000", "Edges!A1:Z1000", "STYLE_META!A1:Z1000", "BRANCHES!A1:Z1000", "CONFIG!A1:B1000",
+        ])
+        # The second read is narrowed to the header widths seen by the first one
+        self.assertEqual(calls[1][0], "Nodes!A1:AB1")
+        self.assertEqual([n.id for n in first.nodes], ["N1", "N2"])
+        self.assertEqual([n.id for n in second.nodes], ["N3"])
+
+        with patch("app.sheets._client", return_value=client):
+            read_nodes_edges("sheet123", "Nodes", "Edges", revision="8")
+        self.assertEqual(client.spreadsheets().get_calls, 2)
+
+    def test_indexed_site_reads_only_its_own_rows(self):
+        tabs = self._tabs()
+        tabs["Nodes"] += [_node_row("N4", "S2"), _node_row("N5", "S1")]
+        tabs["Edges"] += [_edge_row("E3", "N3", "N4"), _edge_row("E4", "N1", "N5")]
+        client = _FakeSheetsClient(tabs)
+
+        with patch("app.sheets._client", return_value=client):
+            full = read_nodes_edges("sheet123", "Nodes", "Edges", site_id="S1", revision="7")
+            site1 = read_nodes_edges("sheet123", "Nodes", "Edges", site_id="s1 ", revision="7")
+            site2 = read_nodes_edges("sheet123", "Nodes", "Edges", site_id="S2", revision="7")
+            unknown = read_nodes_edges("sheet123", "Nodes", "Edges", site_id="S9", revision="7")
+
+        calls = client.values_service.batch_get_calls
+        self.assertEqual(calls[1][:5], [
+            "Nodes!A1:AB1", "Nodes!A2:AB3", "Nodes!A6:AB6", "Edges!A1:L1", "Edges!A2:L2",
+        ])
+        self.assertEqual(calls[1][5], "Edges!A5:L5")
+        self.assertEqual(calls[2][:4], ["Nodes!A1:AB1", "Nodes!A4:AB5", "Edges!A1:L1", "Edges!A4:L4"])
+        self.assertEqual(site1.model_dump(exclude={"site_id"}), full.model_dump(exclude={"site_id"}))
+        self.assertEqual([n.id for n in site2.nodes], ["N3", "N4"])
+        self.assertEqual([e.id for e in site2.edges], ["E3"])
+        self.assertEqual((unknown.nodes, unknown.edges), ([], []))
+
+    def test_wide_grid_probes_the_header_row_first(self):
+        client = _FakeSheetsClient(self._tabs())
+        client.values_service.grid["Nodes"] = 18000
+
+        with patch("app.sheets._client", return_value=client):
+            graph = read_nodes_edges("sheet123", "Nodes", "Edges", revision="7")
+
+        calls = client.values_service.batch_get_calls
+        self.assertEqual(calls[0], ["Nodes!1:1"])
+        self.assertEqual(calls[1][0], "Nodes!A1:AB1000")
+        self.assertEqual(len(graph.nodes), 3)
+
+    def test_missing_nodes_tab_fails(self):
+        tabs = self._tabs()
+        del tabs["Nodes"]
+        client = _FakeSheetsClient(tabs)
+
+        with patch("app.sheets._client", return_value=client):
+            with self.assertRaises(HTTPException) as ctx:
+                read_nodes_edges("sheet123", "Nodes", "Edges")
+        self.assertEqual(ctx.exception.status_code, 500)
+        self.assertIn("read_nodes_failed", ctx.exception.detail)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,59 +11,191 @@ from app.sheets import (
 
 
 class _FakeResponse:
-    def __init__(self, payload=None):
+    def __init__(self, payload=None, error=None):
         self._payload = payload or {}
+        self._error = error
 
     def execute(self):
+        if self._error is not None:
+            raise self._error
         return self._payload
 
 
-class _FakeValuesService:
-    def __init__(self, existing_nodes_values):
-        self._existing_nodes_values = existing_nodes_values
-        self.clear_calls = []
-        self.batch_kwargs = None
-        self.update_calls = []
-
-    def get(self, *, spreadsheetId, range):  # noqa: A003 - match API signature
-        if "Nodes" in range:
-            return _FakeResponse({"values": self._existing_nodes_values})
-        return _FakeResponse({"values": []})
-
-    def clear(self, *, spreadsheetId, range):  # noqa: A003
-        self.clear_calls.append(range)
-        return _FakeResponse({})
+def _trimmed(rows):
+    out = []
+    for row in rows:
+        row = list(row)
+        while row and row[-1] in ("", None):
+            row.pop()
+        out.append(row)
+    while out and not out[-1]:
+        out.pop()
+    return out
 
-    def batchUpdate(self, *, spreadsheetId, body):  # noqa: A003
-        self.batch_kwargs = body
-        return _FakeResponse({})
 
-    def update(self, *, spreadsheetId, range, valueInputOption, body):  # noqa: A003
-        self.update_calls.append({
-            "range": range,
-            "valueInputOption": valueInputOption,
-            "body": body,
-        })
-        return _FakeResponse({})
+class _FakeSpreadsheet:
+    """In-memory spreadsheet applying the batchUpdate requests used by the writer."""
+
+    def __init__(self, tabs):
+        self.tabs = {}
+        for gid, (title, rows) in enumerate(tabs.items()):
+            self.tabs[title] = {
+                "sheetId": gid, "rows": [list(r) for r in rows], "rowCount": 1000, "columnCount": 26, "frozenRowCount": 0,
+            }
+        self.get_calls = 0
+        self.batch_get_calls = []
+        self.batch_update_bodies = []
+        self.fail_batch_get = False
+
+    def values_of(self, title):
+        return _trimmed(self.tabs[title]["rows"])
+
+    def _tab_by_id(self, gid):
+        return next(tab for tab in self.tabs.values() if tab["sheetId"] == gid)
+
+    # -- reads -------------------------------------------------------------
+    def get(self, fields):
+        self.get_calls += 1
+        return {
+            "sheets": [
+                {"properties": {
+                    "sheetId": tab["sheetId"],
+                    "title": title,
+                    "gridProperties": {
+                        key: tab[key] for key in ("rowCount", "columnCount", "frozenRowCount") if tab.get(key)
+                    },
+                }}
+                for title, tab in self.tabs.items()
+            ]
+        }
+
+    def batch_get(self, ranges, value_render_option):
+        self.batch_get_calls.append({"ranges": list(ranges), "valueRenderOption": value_render_option})
+        if self.fail_batch_get:
+            raise RuntimeError("backend error")
+        value_ranges = []
+        for rng in ranges:
+            values = self.values_of(rng.split("!")[0])
+            if rng.endswith("A1:B1"):
+                values = _trimmed([row[:2] for row in values[:1]])
+            value_ranges.append({"range": rng, "values": values})
+        return {"valueRanges": value_ranges}
+
+    # -- writes ------------------------------------------------------------
+    def batch_update(self, body):
+        self.batch_update_bodies.append(body)
+        for request in body["requests"]:
+            (kind, payload), = request.items()
+            getattr(self, f"_apply_{kind}")(payload)
+
+    def _apply_addSheet(self, payload):  # noqa: N802
+        props = payload["properties"]
+        grid = props.get("gridProperties", {})
+        self.tabs[props["title"]] = {
+            "sheetId": props["sheetId"],
+            "rows": [],
+            "rowCount": grid.get("rowCount", 1000),
+            "columnCount": grid.get("columnCount", 26),
+        }
+
+    def _apply_appendDimension(self, payload):  # noqa: N802
+        tab = self._tab_by_id(payload["sheetId"])
+        key = "rowCount" if payload["dimension"] == "ROWS" else "columnCount"
+        tab[key] += payload["length"]
+
+    def _apply_updateCells(self, payload):  # noqa: N802
+        rng = payload["range"]
+        tab = self._tab_by_id(rng["sheetId"])
+        rows = [[self._cell_value(c) for c in row.get("values", [])] for row in payload["rows"]]
+        if set(rng) == {"sheetId"}:
+            tab["rows"] = rows
+            return
+        if rng["endRowIndex"] > tab["rowCount"] or rng["endColumnIndex"] > tab["columnCount"]:
+            raise AssertionError(f"updateCells exceeds grid limits: {rng}")
+        for offset, r in enumerate(range(rng["startRowIndex"], rng["endRowIndex"])):
+            while len(tab["rows"]) <= r:
+                tab["rows"].append([])
+            row = tab["rows"][r]
+            new = rows[offset] if offset < len(rows) else []
+            for c in range(rng["startColumnIndex"], rng["endColumnIndex"]):
+                while len(row) <= c:
+                    row.append("")
+                row[c] = new[c] if c < len(new) else ""
+
+    def _apply_deleteDimension(self, payload):  # noqa: N802
+        rng = payload["range"]
+        tab = self._tab_by_id(rng["sheetId"])
+        if tab["rowCount"] - (rng["endIndex"] - rng["startIndex"]) <= tab.get("frozenRowCount", 0):
+            raise AssertionError("Sorry, it is not possible to delete all non-frozen rows.")
+        del tab["rows"][rng["startIndex"]:rng["endIndex"]]
+        tab["rowCount"] -= rng["endIndex"] - rng["startIndex"]
+
+    @staticmethod
+    def _cell_value(cell):
+        value = cell.get("userEnteredValue")
+        if not value:
+            return ""
+        (_, raw), = value.items()
+        return raw
+
+
+class _FakeValuesService:
+    def __init__(self, spreadsheet):
+        self._spreadsheet = spreadsheet
+
+    def batchGet(self, *, spreadsheetId, ranges, valueRenderOption=None):  # noqa: N802 - match API signature
+        try:
+            return _FakeResponse(self._spreadsheet.batch_get(ranges, valueRenderOption))
+        except Exception as exc:
+            return _FakeResponse(error=exc)
 
 
 class _FakeSpreadsheetsService:
-    def __init__(self, values_service):
-        self._values_service = values_service
+    def __init__(self, spreadsheet):
+        self._spreadsheet = spreadsheet
+        self._values = _FakeValuesService(spreadsheet)
 
     def values(self):
-        return self._values_service
+        return self._values
+
+    def get(self, *, spreadsheetId, fields):
+        return _FakeResponse(self._spreadsheet.get(fields))
+
+    def batchUpdate(self, *, spreadsheetId, body):  # noqa: N802
+        self._spreadsheet.batch_update(body)
+        return _FakeResponse({})
 
 
 class _FakeSheetsClient:
-    def __init__(self, values_service):
-        self._spreadsheets = _FakeSpreadsheetsService(values_service)
+    def __init__(self, spreadsheet):
+        self._spreadsheets = _FakeSpreadsheetsService(spreadsheet)
 
     def spreadsheets(self):
         return self._spreadsheets
 
 
+def _write(spreadsheet, graph, **kwargs):
+    with patch("app.sheets._client", return_value=_FakeSheetsClient(spreadsheet)):
+        write_nodes_edges("sheet123", "Nodes", "Edges", graph, **kwargs)
+
+
+def _updated_rows(body, gid):
+    """0-based row indexes touched by updateCells on ``gid``."""
+    rows = []
+    for request in body["requests"]:
+        rng = request.get("updateCells", {}).get("range")
+        if rng and rng["sheetId"] == gid:
+            rows.extend(range(rng["startRowIndex"], rng["endRowIndex"]))
+    return rows
+
+
 class SheetsWriteTests(unittest.TestCase):
+    def setUp(self):
+        # site-scoped writes check the Drive revision: none here unless a test provides one
+        revision = patch("app.sheets.read_spreadsheet_revision", return_value=None)
+        revision.start()
+        self.addCleanup(revision.stop)
+
     def test_write_preserves_existing_xy_and_formats_edges(self):
         base_row = [
             "N1", "Node 1", "OUVRAGE", "", "", "", "", "", "", "",
@@ -73,8 +205,7 @@ class SheetsWriteTests(unittest.TestCase):
             NODE_HEADERS_FR_V11,
             base_row + ["" for _ in EXTRA_SHEET_HEADERS],
         ]
-        values_service = _FakeValuesService(existing_nodes)
-        fake_client = _FakeSheetsClient(values_service)
+        sheet = _FakeSpreadsheet({"Nodes": existing_nodes, "Edges": [], "BRANCHES": [], "CONFIG": [], "STYLE_META": []})
 
         graph = Graph(
             style_meta={"mode": "continuous", "width_px": {"min": 2, "max": 8}},
@@ -99,21 +230,18 @@ class SheetsWriteTests(unittest.TestCase):
             ],
         )
 
-        with patch("app.sheets._client", return_value=fake_client):
-            write_nodes_edges("sheet123", "Nodes", "Edges", graph)
+        _write(sheet, graph)
 
-        # Ensure tabs are cleared before writing
-        self.assertEqual(
-            set(values_service.clear_calls),
-            {"Nodes!A:ZZZ", "Edges!A:ZZZ", "BRANCHES!A:ZZZ", "CONFIG!A:ZZZ"},
-        )
+        # One metadata read, one unformatted batchGet and a single batchUpdate for every tab
+        self.assertEqual(sheet.get_calls, 1)
+        self.assertEqual(len(sheet.batch_get_calls), 1)
+        self.assertEqual(sheet.batch_get_calls[0]["valueRenderOption"], "UNFORMATTED_VALUE")
+        self.assertEqual(len(sheet.batch_update_bodies), 1)
 
-        body = values_service.batch_kwargs
-        self.assertIsNotNone(body)
-        nodes_payload = body["data"][0]["values"]
-        edges_payload = body["data"][1]["values"]
-        branches_payload = body["data"][2]["values"]
-        config_payload = body["data"][3]["values"]
+        nodes_payload = sheet.values_of("Nodes")
+        edges_payload = sheet.values_of("Edges")
+        branches_payload = sheet.values_of("BRANCHES")
+        config_payload = sheet.values_of("CONFIG")
 
         # Headers should match the latest layouts
         self.assertEqual(nodes_payload[0], NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS)
@@ -149,13 +277,150 @@ class SheetsWriteTests(unittest.TestCase):
         self.assertEqual(branch_row[2], '')
         self.assertEqual(branch_row[3], 'FALSE')
 
-        # STYLE_META sheet should be updated with the serialized style meta
-        style_calls = [call for call in values_service.update_calls if call["range"] == "STYLE_META!A1:B1"]
-        self.assertTrue(style_calls)
-        meta_row = style_calls[-1]["body"]["values"][0]
+        # STYLE_META row holds the serialized style meta
+        meta_row = sheet.values_of("STYLE_META")[0]
         self.assertEqual(meta_row[0], "style_meta")
         self.assertIn("width_px", meta_row[1])
 
+    def _graph(self, node_ids):
+        return Graph(
+            nodes=[Node(id=nid, name=nid, type="OUVRAGE", branch_id="B-1") for nid in node_ids],
+            edges=[],
+        )
+
+    def _saved(self, graph):
+        sheet = _FakeSpreadsheet({"Nodes": [], "Edges": [], "BRANCHES": [], "CONFIG": [], "STYLE_META": []})
+        _write(sheet, graph)
+        sheet.batch_update_bodies.clear()
+        sheet.batch_get_calls.clear()
+        return sheet
+
+    def test_unchanged_save_sends_no_write(self):
+        sheet = self._saved(self._graph(["N1", "N2", "N3"]))
+
+        _write(sheet, self._graph(["N1", "N2", "N3"]))
+
+        self.assertEqual(sheet.batch_update_bodies, [])
+
+    def test_only_changed_rows_are_written_and_leftovers_truncated(self):
+        sheet = self._saved(self._graph(["N1", "N2", "N3", "N4"]))
+
+        graph = self._graph(["N1", "N2", "N3"])
+        graph.nodes[1].name = "renamed"
+        _write(sheet, graph)
+
+        body, = sheet.batch_update_bodies
+        nodes_gid = sheet.tabs["Nodes"]["sheetId"]
+        self.assertEqual(_updated_rows(body, nodes_gid), [2])
+        deletes = [r["deleteDimension"]["range"] for r in body["requests"] if "deleteDimension" in r]
+        self.assertEqual(deletes, [{"sheetId": nodes_gid, "dimension": "ROWS", "startIndex": 4, "endIndex": 5}])
+        self.assertEqual([row[0] for row in sheet.values_of("Nodes")[1:]], ["N1", "N2", "N3"])
+        self.assertEqual(sheet.values_of("Nodes")[2][1], "renamed")
+
+    def test_shrinking_to_the_header_clears_rows_that_cannot_be_deleted(self):
+        sheet = self._saved(self._graph(["N1", "N2"]))
+        nodes = sheet.tabs["Nodes"]
+        nodes["rowCount"], nodes["frozenRowCount"] = len(nodes["rows"]), 1
+
+        _write(sheet, Graph())
+
+        body, = sheet.batch_update_bodies
+        self.assertFalse([r for r in body["requests"] if r.get("deleteDimension", {}).get("range", {}).get("sheetId") == nodes["sheetId"]])
+        self.assertEqual(_updated_rows(body, nodes["sheetId"]), [1, 2])
+        self.assertEqual(sheet.values_of("Nodes"), [NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS])
+        self.assertEqual(nodes["rowCount"], 3)
+
+    def _site_graph(self, nodes, edges):
+        return Graph(
+            nodes=[
+                Node(id=nid, name=name, type="OUVRAGE", branch_id="B-1", extras={"idSite1": site})
+                for nid, name, site in nodes
+            ],
+            edges=[
+                Edge(id=eid, from_id=a, to_id=b, branch_id="B-1", diameter_mm=63.0, material="PVC", sdr="17",
+                     geometry=[[2.0, 48.0], [2.1, 48.1]])
+                for eid, a, b in edges
+            ],
+        )
+
+    def test_site_scoped_write_leaves_other_sites_rows_alone(self):
+        sheet = self._saved(self._site_graph(
+            [("N1", "N1", "S1"), ("N2", "N2", "S2"), ("N3", "N3", "S1"), ("N5", "N5", "S2")],
+            [("E1", "N1", "N3"), ("E2", "N2", "N5")],
+        ))
+
+        graph = self._site_graph([("N1", "renamed", "S1"), ("N4", "N4", "S1")], [("E3", "N1", "N4")])
+        _write(sheet, graph, site_id="S1")
+
+        body, = sheet.batch_update_bodies
+        # N1 stays on row 2, N4 takes the slot freed by N3 (row 4); S2 rows 3 and 5 are untouched
+        self.assertEqual(_updated_rows(body, sheet.tabs["Nodes"]["sheetId"]), [1, 3])
+        self.assertEqual(_updated_rows(body, sheet.tabs["Edges"]["sheetId"]), [1])
+        self.assertEqual(_updated_rows(body, sheet.tabs["BRANCHES"]["sheetId"]), [])
+        self.assertEqual([row[0] for row in sheet.values_of("Nodes")[1:]], ["N1", "N2", "N4", "N5"])
+        self.assertEqual([row[0] for row in sheet.values_of("Edges")[1:]], ["E3", "E2"])
+
+    def test_site_scoped_write_keeps_another_sites_edge_with_the_same_id(self):
+        sheet = self._saved(self._site_graph(
+            [("N1", "N1", "S1"), ("N2", "N2", "S2"), ("N3", "N3", "S1"), ("N5", "N5", "S2")],
+            [("E1", "N1", "N3"), ("E2", "N2", "N5")],
+        ))
+
+        _write(sheet, self._site_graph([("N1", "N1", "S1"), ("N3", "N3", "S1")], [("E2", "N1", "N3")]), site_id="S1")
+
+        edges = [row[:3] for row in sheet.values_of("Edges")[1:]]
+        self.assertEqual(edges, [["E2", "N1", "N3"], ["E2", "N2", "N5"]])
+
+    def test_site_scoped_write_is_recomputed_when_the_sheet_moved_since_its_read(self):
+        sheet = self._saved(self._site_graph([("N1", "N1", "S1"), ("N2", "N2", "S2")], []))
+        revisions = iter(["1", "2", "2", "2"])
+
+        def revision(sheet_id):
+            current = next(revisions)
+            if current == "2" and len(sheet.values_of("Nodes")) == 3:
+                # another instance saves site S2 between this save's read and its update
+                row = [""] * len(NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS)
+                row[0], row[2], row[len(NODE_HEADERS_FR_V11)] = "N6", "OUVRAGE", "S2"
+                sheet.tabs["Nodes"]["rows"].append(row)
+            return current
+
+        with patch("app.sheets.read_spreadsheet_revision", side_effect=revision):
+            _write(sheet, self._site_graph([("N1", "N1", "S1"), ("N4", "N4", "S1")], []), site_id="S1")
+
+        self.assertEqual([row[0] for row in sheet.values_of("Nodes")[1:]], ["N1", "N2", "N6", "N4"])
+
+    def test_missing_tabs_are_created_in_the_same_batch(self):
+        sheet = _FakeSpreadsheet({"Nodes": [], "Edges": []})
+
+        _write(sheet, self._graph(["N1"]))
+
+        body, = sheet.batch_update_bodies
+        added = [r["addSheet"]["properties"] for r in body["requests"] if "addSheet" in r]
+        self.assertEqual([p["title"] for p in added], ["BRANCHES", "CONFIG", "STYLE_META"])
+        self.assertEqual(len({p["sheetId"] for p in added} | {0, 1}), 5)
+        self.assertEqual(sheet.values_of("CONFIG")[0], ["crs_code", "EPSG:4326"])
+        self.assertEqual(sheet.values_of("STYLE_META")[0][0], "style_meta")
+
+    def test_grid_is_grown_before_writing_past_its_limits(self):
+        sheet = _FakeSpreadsheet({"Nodes": [], "Edges": [], "BRANCHES": [], "CONFIG": [], "STYLE_META": []})
+        sheet.tabs["Nodes"]["rowCount"] = 2
+
+        _write(sheet, self._graph(["N1", "N2", "N3"]))
+
+        self.assertEqual(len(sheet.values_of("Nodes")), 4)
+        self.assertGreaterEqual(sheet.tabs["Nodes"]["columnCount"], len(NODE_HEADERS_FR_V11 + EXTRA_SHEET_HEADERS))
+
+    def test_unreadable_contents_replace_whole_tabs(self):
+        sheet = self._saved(self._graph(["N1", "N2", "N3"]))
+        sheet.fail_batch_get = True
+
+        _write(sheet, self._graph(["N9"]))
+
+        body, = sheet.batch_update_bodies
+        whole = [r["updateCells"]["range"] for r in body["requests"] if set(r.get("updateCells", {}).get("range", {"x": 1})) == {"sheetId"}]
+        self.assertEqual(len(whole), 4)
+        self.assertEqual([row[0] for row in sheet.values_of("Nodes")[1:]], ["N9"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from app.datasources import load_graph, load_graph_async, save_graph
+from app.models import Graph, Node
+from app.services.graph_cache import graph_cache
+from app.services.single_flight import SingleFlight
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_threads_share_one_call(self):
+        flight = SingleFlight(share=list)
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return ["graph"]
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(flight.do, "key", fetch) for _ in range(5)]
+            while flight.stats()["coalesced"] < 4:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["graph"]] * 5)
+        self.assertEqual(len({id(result) for result in results}), 5)
+        self.assertEqual(flight.stats(), {"in_flight": 0, "leaders": 1, "coalesced": 4})
+
+    def test_errors_are_shared_and_the_next_call_retries(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise HTTPException(status_code=502, detail="sheets down")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flight.do, "key", failing) for _ in range(3)]
+            while flight.stats()["coalesced"] < 2:
+                time.sleep(0.001)
+            release.set()
+            for future in futures:
+                with self.assertRaises(HTTPException):
+                    future.result()
+        self.assertEqual(flight.do("key", lambda: "ok"), "ok")
+
+    def test_coroutines_share_one_task_despite_a_cancelled_caller(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "graph"
+
+        async def scenario():
+            impatient = asyncio.ensure_future(flight.do_async("key", fetch))
+            others = [asyncio.ensure_future(flight.do_async("key", fetch)) for _ in range(3)]
+            await asyncio.sleep(0)
+            impatient.cancel()
+            return await asyncio.gather(*others)
+
+        self.assertEqual(asyncio.run(scenario()), ["graph"] * 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats()["coalesced"], 3)
+
+
+def _graph(site_id):
+    return Graph(site_id=site_id, nodes=[Node(id="OUVRAGE-N1", gps_lat=48.0, gps_lon=2.0, branch_id="B-1")])
+
+
+class LoadGraphSingleFlightTests(unittest.TestCase):
+    def setUp(self):
+        graph_cache.clear()
+        self.addCleanup(graph_cache.clear)
+        self.release = threading.Event()
+        self.reads = []
+
+        def slow_read(**kwargs):
+            self.reads.append(kwargs["site_id"])
+            self.release.wait(5)
+            return _graph(kwargs["site_id"])
+
+        for target, value in {
+            "app.datasources.load_sheet": slow_read,
+            "app.datasources.sheet_revision": lambda *_: None,
+        }.items():
+            patcher = patch(target, side_effect=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_identical_concurrent_loads_read_the_sheet_once(self):
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            futures = [pool.submit(load_graph, source="sheet", sheet_id="sheet123", site_id="S1") for _ in range(5)]
+            other = pool.submit(load_graph, source="sheet", sheet_id="sheet123", site_id="S2")
+            while len(self.reads) < 2:
+                time.sleep(0.001)
+            time.sleep(0.02)
+            self.release.set()
+            graphs = [future.result() for future in futures]
+            other.result()
+
+        self.assertEqual(sorted(self.reads), ["S1", "S2"])
+        self.assertEqual({graph.site_id for graph in graphs}, {"S1"})
+        graphs[0].nodes[0].name = "mutated"
+        self.assertTrue(all(graph.nodes[0].name != "mutated" for graph in graphs[1:]))
+
+    def test_loads_after_a_save_do_not_join_an_older_read(self):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            before = pool.submit(load_graph, source="sheet", sheet_id="sheet123", site_id="S1")
+            while not self.reads:
+                time.sleep(0.001)
+            with patch("app.datasources.save_sheet"):
+                save_graph(source="sheet", graph=_graph("S1"), sheet_id="sheet123", site_id="S1")
+            after = pool.submit(load_graph, source="sheet", sheet_id="sheet123", site_id="S1")
+            while len(self.reads) < 2:
+                time.sleep(0.001)
+            self.release.set()
+            before.result(), after.result()
+        self.assertEqual(self.reads, ["S1", "S1"])
+
+    def test_async_loads_are_coalesced(self):
+        reads = []
+
+        async def read(**kwargs):
+            reads.append(kwargs["site_id"])
+            await asyncio.sleep(0.01)
+            return _graph(kwargs["site_id"])
+
+        async def scenario():
+            return await asyncio.gather(
+                *[load_graph_async(source="sheet", sheet_id="sheet123", site_id="S1") for _ in range(4)]
+            )
+
+        with patch("app.datasources.load_sheet_async", side_effect=read), \
+                patch("app.datasources.sheet_revision_async", return_value=None):
+            graphs = asyncio.run(scenario())
+        self.assertEqual(reads, ["S1"])
+        self.assertEqual(len({id(graph) for graph in graphs}), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Graph, Node
+from app.services.warmup import CacheWarmup, warmup_targets
+
+
+class WarmupTargetTests(unittest.TestCase):
+    def test_defaults_to_the_default_sheet_and_site(self):
+        with patch("app.config.settings.warmup_sites", ""), \
+                patch("app.config.settings.sheet_id_default", "sheet123"), \
+                patch("app.config.settings.site_id_filter_default", "S1"):
+            self.assertEqual(warmup_targets(), [("sheet123", "S1")])
+        with patch("app.config.settings.warmup_sites", ""), patch("app.config.settings.sheet_id_default", ""):
+            self.assertEqual(warmup_targets(), [])
+
+    def test_parses_configured_pairs(self):
+        with patch("app.config.settings.warmup_sites", "sheetA:S1, sheetA:S2 sheetB,sheetA:S1"):
+            self.assertEqual(warmup_targets(), [("sheetA", "S1"), ("sheetA", "S2"), ("sheetB", None)])
+        with patch("app.config.settings.warmup_sites", "none"), patch("app.config.settings.sheet_id_default", "x"):
+            self.assertEqual(warmup_targets(), [])
+
+    def test_nothing_is_warmed_while_the_graph_cache_is_disabled(self):
+        with patch("app.config.settings.warmup_sites", "sheetA:S1"), \
+                patch("app.services.graph_cache.graph_cache.ttl_s", 0):
+            self.assertEqual(warmup_targets(), [])
+
+    def test_other_sources_warm_their_single_configured_graph(self):
+        with patch("app.config.settings.warmup_sites", "sheetA:S1 sheetB"), \
+                patch("app.config.settings.data_source_default", "gcs_json"):
+            self.assertEqual(warmup_targets(), [("", None)])
+
+
+class CacheWarmupTests(unittest.TestCase):
+    def setUp(self):
+        for name, value in (("warmup_sites", "sheetA:S1,sheetA:BAD"), ("data_source_default", "sheet")):
+            patcher = patch(f"app.config.settings.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_loads_every_target_and_records_failures(self):
+        def load(**kwargs):
+            if kwargs["site_id"] == "BAD":
+                raise HTTPException(status_code=400, detail="site not found")
+            return Graph(nodes=[Node(id="N1")])
+
+        warmup = CacheWarmup()
+        with patch("app.datasources.load_graph", side_effect=load) as load_graph:
+            warmup.start()
+            self.assertTrue(warmup.wait(5))
+
+        self.assertEqual(load_graph.call_count, 2)
+        self.assertEqual(load_graph.call_args.kwargs["source"], "sheet")
+        status = warmup.status()
+        self.assertTrue(status["ready"])
+        self.assertEqual((status["results"]["sheetA:S1"]["nodes"], status["targets"]), (1, 2))
+        self.assertEqual(status["results"]["sheetA:BAD"]["error"], "400: site not found")
+
+    def test_loads_from_the_configured_source(self):
+        warmup = CacheWarmup()
+        with patch("app.config.settings.data_source_default", "bigquery"), \
+                patch("app.datasources.load_graph", return_value=Graph(nodes=[Node(id="N1")])) as load_graph:
+            warmup.start()
+            self.assertTrue(warmup.wait(5))
+
+        load_graph.assert_called_once_with(source="bigquery", sheet_id=None, site_id=None)
+        self.assertEqual(warmup.status()["results"]["bigquery"]["nodes"], 1)
+
+    def test_readiness_waits_for_warmup_then_liveness_is_unaffected(self):
+        release = threading.Event()
+        warmup = CacheWarmup()
+        client = TestClient(app)
+        with patch("app.main.cache_warmup", warmup), \
+                patch("app.datasources.load_graph", side_effect=lambda **_: release.wait(5) and Graph()), \
+                patch("app.config.settings.warmup_timeout_s", 0):
+            warmup.start()
+            not_ready = client.get("/readyz")
+            self.assertEqual((not_ready.status_code, not_ready.json()), (503, {"ready": False}))
+            self.assertEqual(client.get("/healthz").json(), {"ok": True, "ready": False})
+
+            release.set()
+            self.assertTrue(warmup.wait(5))
+            ready = client.get("/readyz")
+            self.assertEqual(ready.status_code, 200)
+            self.assertEqual(ready.json(), {"ready": True})
+
+    def test_timeout_releases_readiness(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        warmup = CacheWarmup()
+        with patch("app.datasources.load_graph", side_effect=lambda **_: release.wait(5)), \
+                patch("app.config.settings.warmup_timeout_s", 30), \
+                patch("app.services.warmup.time.monotonic", side_effect=[100.0, 110.0, 131.0]):
+            warmup.start()
+            self.assertFalse(warmup.ready())
+            self.assertTrue(warmup.ready())
+            self.assertFalse(warmup.finished)
+
+
+if __name__ == "__main__":
+    unittest.main()
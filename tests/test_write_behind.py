@@ -0,0 +1,188 @@
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Graph, Node
+from app.services import write_behind
+from app.services.cache_backend import DiskBackend
+from app.services.graph_cache import graph_cache
+from app.services.write_behind import WriteBehindQueue
+
+
+def _graph(name):
+    return Graph(site_id="S1", nodes=[Node(id="OUVRAGE-N1", name=name, gps_lat=48.0, gps_lon=2.0, branch_id="B-1")])
+
+
+class WriteBehindQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.writes = []
+        self.fail_with = None
+
+        def writer(*, graph, **kwargs):
+            if self.fail_with is not None:
+                raise self.fail_with
+            self.writes.append((kwargs["site_id"], graph.nodes[0].name))
+
+        # long window: only flush() triggers the writes, keeping the tests deterministic
+        self.queue = WriteBehindQueue(writer, window_s=30.0)
+        self.addCleanup(self.queue.flush)
+
+    def test_saves_within_window_collapse_to_last_writer(self):
+        ids = [self.queue.submit("doc-S1", _graph(f"v{i}"), site_id="S1") for i in range(3)]
+        other = self.queue.submit("doc-S2", _graph("other"), site_id="S2")
+        self.assertEqual({self.queue.status(i)["state"] for i in ids}, {"pending"})
+
+        self.queue.flush()
+
+        self.assertEqual(sorted(self.writes), [("S1", "v2"), ("S2", "other")])
+        self.assertEqual({self.queue.status(i)["state"] for i in ids + [other]}, {"durable"})
+        self.assertEqual(self.queue.stats()["submitted"], 4)
+        self.assertEqual(self.queue.stats()["writes"], 2)
+
+    def test_failed_write_is_reported_until_a_later_save_lands(self):
+        self.fail_with = HTTPException(status_code=502, detail="sheets down")
+        first = self.queue.submit("doc", _graph("v1"), site_id="S1")
+        self.queue.flush()
+        self.assertEqual(self.queue.status(first), {"write_id": first, "state": "failed", "error": "502: sheets down"})
+
+        self.fail_with = None
+        second = self.queue.submit("doc", _graph("v2"), site_id="S1")
+        self.queue.flush()
+        self.assertEqual(self.queue.status(first)["state"], "durable")
+        self.assertEqual(self.queue.status(second)["state"], "durable")
+
+    def test_save_queued_during_a_write_waits_for_the_next_window(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_writer(*, graph, **kwargs):
+            started.set()
+            release.wait(5)
+            self.writes.append(graph.nodes[0].name)
+
+        queue = WriteBehindQueue(slow_writer, window_s=0.01)
+        queue.submit("doc", _graph("v1"))
+        self.assertTrue(started.wait(5))
+        queue.submit("doc", _graph("v2"))
+        queue.submit("doc", _graph("v3"))
+        release.set()
+        queue.flush(timeout=5)
+        self.assertEqual(self.writes, ["v1", "v3"])
+
+    def test_latest_graph_is_served_until_its_write_completes(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_writer(*, graph, **kwargs):
+            started.set()
+            release.wait(5)
+
+        queue = WriteBehindQueue(slow_writer, window_s=0.01)
+        self.addCleanup(queue.flush, 5)
+        self.assertIsNone(queue.pending_graph("doc"))
+        queue.submit("doc", _graph("v1"))
+        self.assertTrue(started.wait(5))
+        # still served while being written
+        self.assertEqual(queue.pending_graph("doc").nodes[0].name, "v1")
+        queue.submit("doc", _graph("v2"))
+        release.set()
+        queue.flush(timeout=5)
+        self.assertIsNone(queue.pending_graph("doc"))
+
+    def test_write_ids_resolve_on_every_instance_sharing_the_backend(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        backends = [DiskBackend(directory.name) for _ in range(2)]
+        for backend in backends:
+            self.addCleanup(backend.close)
+        accepting, other = (WriteBehindQueue(lambda **kwargs: None, window_s=30.0, backend=b) for b in backends)
+        self.addCleanup(accepting.flush)
+
+        write_id = accepting.submit("doc", _graph("v1"), site_id="S1")
+        self.assertEqual(other.submit("doc", _graph("v2"), site_id="S1").split(".")[1], "1")
+        self.assertNotEqual(other.submit("doc", _graph("v3"))[:16], write_id[:16])
+        self.assertEqual(other.status(write_id)["state"], "pending")
+        accepting.flush()
+        self.assertEqual(other.status(write_id)["state"], "durable")
+        with self.assertRaises(HTTPException):
+            other.status(f"{write_id[:-1]}2")
+
+    def test_unknown_write_id(self):
+        self.queue.submit("doc", _graph("v1"), site_id="S1")
+        for write_id in ("nope.1", "bad", f"{self.queue.submit('doc', _graph('v2'), site_id='S1')[:-1]}9"):
+            with self.assertRaises(HTTPException) as ctx:
+                self.queue.status(write_id)
+            self.assertEqual(ctx.exception.status_code, 404)
+
+
+class WriteBehindEndpointTests(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.writes = []
+        queue = WriteBehindQueue(lambda **kwargs: self.writes.append(kwargs), window_s=30.0)
+        self.addCleanup(queue.flush)
+        for target, value in {
+            "app.services.write_behind._queue": queue,
+            "app.config.settings.write_behind_window_ms": 30000,
+            "app.config.settings.site_id_filter_default": "",
+        }.items():
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.queue = queue
+
+    def test_post_is_acknowledged_then_confirmed_durable(self):
+        payload = _graph("v1").model_dump(mode="json")
+        with patch("app.routers.api.save_graph") as sync_save:
+            first = self.client.post("/api/graph?sheet_id=sheet123&site_id=S1", json=payload)
+            second = self.client.post("/api/graph?sheet_id=sheet123&site_id=S1", json=payload)
+            sync_save.assert_not_called()
+
+        self.assertEqual(first.status_code, 202)
+        write_id = second.json()["write_id"]
+        self.assertEqual(self.client.get(f"/api/graph/writes/{write_id}").json()["state"], "pending")
+
+        self.queue.flush()
+        self.assertEqual(len(self.writes), 1)
+        self.assertEqual((self.writes[0]["sheet_id"], self.writes[0]["site_id"]), ("sheet123", "S1"))
+        self.assertEqual(self.writes[0]["graph"].site_id, "S1")
+        for resp in (first, second):
+            status = self.client.get(f"/api/graph/writes/{resp.json()['write_id']}")
+            self.assertEqual(status.json()["state"], "durable")
+
+    def test_get_after_the_202_returns_the_pending_graph(self):
+        graph_cache.clear()
+        self.addCleanup(graph_cache.clear)
+        stored = _graph("before")
+        with patch("app.datasources.load_sheet", return_value=stored) as load_sheet, \
+                patch("app.datasources.load_sheet_async", side_effect=AssertionError("async read")), \
+                patch("app.config.settings.async_datasources", False), \
+                patch("app.config.settings.sheets_revision_check", False):
+            self.client.post("/api/graph?sheet_id=sheet123&site_id=S1", json=_graph("after").model_dump(mode="json"))
+            pending = self.client.get("/api/graph?sheet_id=sheet123&site_id=S1")
+            self.assertEqual(pending.json()["nodes"][0]["name"], "after")
+            load_sheet.assert_not_called()
+
+            self.queue.flush()
+            landed = self.client.get("/api/graph?sheet_id=sheet123&site_id=S1")
+            self.assertEqual(landed.json()["nodes"][0]["name"], "before")
+            load_sheet.assert_called_once()
+
+    def test_invalid_graph_is_rejected_before_queueing(self):
+        payload = {"nodes": [{"id": "N1", "type": "OUVRAGE"}], "edges": [{"id": "E1", "from_id": "N1", "to_id": "N9"}]}
+        resp = self.client.post("/api/graph?sheet_id=sheet123&site_id=S1", json=payload)
+        self.assertEqual(resp.status_code, 422)
+        self.assertEqual(self.queue.stats()["submitted"], 0)
+
+    def test_non_sheet_sources_stay_synchronous(self):
+        with patch("app.routers.api.save_graph") as sync_save:
+            resp = self.client.post("/api/graph?source=gcs_json&gcs_uri=gs://b/g.json", json=_graph("v1").model_dump(mode="json"))
+        self.assertEqual((resp.status_code, resp.json()), (200, {"ok": True}))
+        sync_save.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -87,6 +87,8 @@ function buildParamsForSource(q: ParsedQuery): URLSearchParams {
 export async function getGraph(): Promise<Graph> {
   const q = parseSearch()
   const params = buildParamsForSource(q)
+  // read-only views may be answered from the snapshot of the last save
+  if(q.mode) params.set('mode', q.mode)
   const res = await fetch(`/api/graph?${params.toString()}`)
   if(!res.ok){
     const txt = await res.text().catch(() => '')
@@ -107,7 +109,9 @@ export async function getGraph(): Promise<Graph> {
   return data
 }
 
-export async function saveGraph(graph: Graph): Promise<{ ok: boolean }> {
+export type SaveResult = { ok: boolean, write_id?: string, durable?: boolean }
+
+export async function saveGraph(graph: Graph): Promise<SaveResult> {
   const q = parseSearch()
   const params = buildParamsForSource(q)
   const payload = sanitizeGraphPayload((graph || {}) as GraphInput)
@@ -123,6 +127,16 @@ export async function saveGraph(graph: Graph): Promise<{ ok: boolean }> {
   return res.json().catch(() => ({ ok: true }))
 }
 
+// Write-behind saves (WRITE_BEHIND_WINDOW_MS) answer with a write_id: poll it to know the save landed
+export async function getWriteStatus(writeId: string): Promise<{ write_id: string, state: 'pending' | 'durable' | 'failed', error?: string }> {
+  const res = await fetch(`/api/graph/writes/${encodeURIComponent(writeId)}`)
+  if(!res.ok){
+    const txt = await res.text().catch(() => '')
+    throw new Error(`GET /api/graph/writes ${res.status} ${txt}`)
+  }
+  return res.json()
+}
+
 export function getMode(): string {
   return parseSearch().mode || 'ro'
 }
@@ -68,6 +68,17 @@ test('getGraph coerces blank numeric fields to null', async () => {
   restoreGlobals()
 })
 
+test('getGraph forwards the view mode when present', async () => {
+  setLocationSearch('?sheet_id=S1&site_id=A&mode=ro')
+  globalThis.fetch = async (url: RequestInfo | URL) => {
+    assert.equal(String(url), '/api/graph?sheet_id=S1&site_id=A&mode=ro')
+    return { ok: true, async json(){ return { nodes: [], edges: [] } }, async text(){ return '' } } as unknown as Response
+  }
+
+  await getGraph()
+  restoreGlobals()
+})
+
 test('recomputeBranches skips network outside browser context', async () => {
   const originalWindow = globalThis.window
   // @ts-ignore set window undefined to simulate Node runtime